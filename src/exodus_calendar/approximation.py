@@ -0,0 +1,142 @@
+from functools import lru_cache
+
+import numpy as np
+
+from exodus_calendar.utils import (
+    EPOCH_UNIX_MS,
+    SOL_LENGTH,
+    SOLS_PER_CYCLE,
+    MS_PER_CYCLE,
+    YEAR_CYCLE,
+    YEAR_START_SOLS,
+    MONTH_START_SOLS,
+)
+from exodus_calendar.vectorized import earth_ms_to_solar_longitude_angle
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Solar longitude is fitted with one Chebyshev series per calendar month
+# (55-56 sols), so every Mars year is covered by twelve pieces
+SEGMENTS_PER_YEAR = 12
+SEGMENTS_PER_CYCLE = SEGMENTS_PER_YEAR*len(YEAR_CYCLE)
+CHEBYSHEV_DEGREE = 7
+CHEBYSHEV_NODES = CHEBYSHEV_DEGREE + 1
+
+# Guaranteed maximum difference from get_solar_longitude_angle, in degrees
+# (measured error is below 1e-8 degrees for years -10000 to 10000)
+APPROXIMATION_MAX_ERROR = 1e-6
+
+# Chebyshev nodes on [-1, 1] and the matrix mapping values at these nodes
+# to series coefficients (discrete cosine transform)
+NODE_X = np.cos(np.pi*(np.arange(CHEBYSHEV_NODES)+0.5)/CHEBYSHEV_NODES)
+NODES_TO_COEFFICIENTS = np.cos(
+    np.pi*np.outer(np.arange(CHEBYSHEV_NODES)+0.5, np.arange(CHEBYSHEV_NODES))
+    / CHEBYSHEV_NODES
+) * 2/CHEBYSHEV_NODES
+NODES_TO_COEFFICIENTS[:, 0] /= 2
+
+# Per-sol lookup table covering one 22-year cycle: (year index in cycle,
+# month index, segment start in ms since cycle start, 2/segment length in ms)
+CYCLE_SEGMENTS = []
+for i in range(0, len(YEAR_CYCLE), 1):
+    month_starts = MONTH_START_SOLS[YEAR_CYCLE[i]]
+    for j in range(0, SEGMENTS_PER_YEAR, 1):
+        month_length = month_starts[j+1] - month_starts[j]
+        start_ms = (YEAR_START_SOLS[i] + month_starts[j])*SOL_LENGTH
+        scale = 2/(month_length*SOL_LENGTH)
+        CYCLE_SEGMENTS += [(i, j, start_ms, scale)]*month_length
+
+# Same as arrays: segment number within cycle, start and scale
+CYCLE_SEGMENT = np.array(
+    [x[0]*SEGMENTS_PER_YEAR + x[1] for x in CYCLE_SEGMENTS], dtype=np.int64
+)
+CYCLE_SEGMENT_START = np.array([x[2] for x in CYCLE_SEGMENTS], dtype=np.float64)
+CYCLE_SEGMENT_SCALE = np.array([x[3] for x in CYCLE_SEGMENTS], dtype=np.float64)
+
+# Number of 22-year cycles of fitted coefficients kept for array evaluation
+# (about 17 kB each)
+CYCLE_CACHE_SIZE = 256
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def fit_segment_coefficients(p_segments):
+    # Fits Chebyshev series for given segments counted from calendar epoch
+    # (segment 0 is month 1 of year 1, segment -1 is month 12 of year -1),
+    # returns an array shaped (segments, CHEBYSHEV_NODES)
+    segment = np.asarray(p_segments, dtype=np.int64)
+    total_cycles, segment_in_cycle = np.divmod(segment, SEGMENTS_PER_CYCLE)
+    year_index, month_index = np.divmod(segment_in_cycle, SEGMENTS_PER_YEAR)
+    month_starts = np.array(
+        [MONTH_START_SOLS[x] for x in YEAR_CYCLE], dtype=np.int64
+    )
+    start_sol = total_cycles*SOLS_PER_CYCLE \
+        + np.array(YEAR_START_SOLS, dtype=np.int64)[year_index] \
+        + month_starts[year_index, month_index]
+    length_sols = month_starts[year_index, month_index+1] \
+        - month_starts[year_index, month_index]
+    half_ms = (length_sols*SOL_LENGTH/2)[:, None]
+    middle_ms = (start_sol*SOL_LENGTH + EPOCH_UNIX_MS)[:, None] + half_ms
+    Ls = earth_ms_to_solar_longitude_angle(middle_ms + half_ms*NODE_X)
+    # unwrap 360 -> 0 transitions within a segment
+    reference = Ls[:, :1]
+    Ls = reference + (Ls - reference + 180) % 360 - 180
+    return Ls @ NODES_TO_COEFFICIENTS
+
+
+@lru_cache(maxsize=CYCLE_CACHE_SIZE)
+def get_cycle_coefficients(p_cycle):
+    # Chebyshev coefficients for all segments of given 22-year cycle (cycle 0
+    # starts with year 1), one row per degree so that each step of the
+    # recurrence gathers from a contiguous array
+    first_segment = p_cycle*SEGMENTS_PER_CYCLE
+    coefficients = fit_segment_coefficients(
+        np.arange(first_segment, first_segment + SEGMENTS_PER_CYCLE)
+    )
+    table = np.ascontiguousarray(coefficients.T)
+    table.flags.writeable = False
+    return table
+
+
+def coefficient_cache_info():
+    # hits, misses, maxsize, currsize of the per-cycle coefficient cache
+    return get_cycle_coefficients.cache_info()
+
+
+def earth_ms_to_solar_longitude_angle_approx(p_unix_ms):
+    # Same as vectorized.earth_ms_to_solar_longitude_angle, within
+    # APPROXIMATION_MAX_ERROR degrees. There is no scalar counterpart: for a
+    # single value the exact utils.get_solar_longitude_angle is as fast as
+    # any pure Python evaluation of the series
+    unix_ms = np.asarray(p_unix_ms, dtype=np.float64)
+    if unix_ms.size==0:
+        return np.zeros(unix_ms.shape)
+    delta_ms = unix_ms - EPOCH_UNIX_MS
+    # whole sols and cycles are exact in float64 for any realistic date
+    total_sols = np.floor(delta_ms/SOL_LENGTH)
+    total_cycles = np.floor(total_sols/SOLS_PER_CYCLE)
+    sol_in_cycle = (total_sols - total_cycles*SOLS_PER_CYCLE).astype(np.intp)
+    x = (delta_ms - total_cycles*MS_PER_CYCLE - CYCLE_SEGMENT_START[sol_in_cycle]) \
+        * CYCLE_SEGMENT_SCALE[sol_in_cycle] - 1
+    # coefficients of cycles present in input, fitted once and reused
+    cycle = total_cycles.astype(np.int64)
+    first_cycle = int(cycle.min())
+    if first_cycle==int(cycle.max()):
+        table = get_cycle_coefficients(first_cycle)
+        row = CYCLE_SEGMENT[sol_in_cycle]
+    else:
+        cycles, index = np.unique(cycle.ravel(), return_inverse=True)
+        table = np.concatenate(
+            [get_cycle_coefficients(x) for x in cycles.tolist()], axis=1
+        )
+        row = index.reshape(cycle.shape)*SEGMENTS_PER_CYCLE + CYCLE_SEGMENT[sol_in_cycle]
+    # Clenshaw recurrence, highest degree first
+    x2 = 2*x
+    b1 = table[CHEBYSHEV_DEGREE][row]
+    b2 = np.zeros_like(x)
+    for k in range(CHEBYSHEV_DEGREE-1, 0, -1):
+        b1, b2 = table[k][row] + x2*b1 - b2, b1
+    return (table[0][row] + x*b1 - b2) % 360
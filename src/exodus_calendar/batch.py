@@ -0,0 +1,243 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from exodus_calendar.utils import earth_datetime_to_mars_datetime, EPOCH_DATETIME, RESOLUTION_MS
+from exodus_calendar.parsing import parse_mars_datetime
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Errors raised by conversions on malformed input
+CONVERSION_ERRORS = (ValueError, IndexError, TypeError, OverflowError)
+
+# Output lines collected before each write in stream mode
+CHUNK_SIZE = 1000
+
+# Input bytes per task in parallel mode (rounded up to a line end)
+CHUNK_BYTES = 1 << 22
+
+# Tasks queued per worker process in parallel mode, bounds memory use
+TASKS_PER_WORKER = 2
+
+OUTPUT_FORMATS = ["plain", "csv", "json"]
+CSV_HEADER = "line,input,output,error\n"
+CSV_SPECIAL_CHARACTERS = ',"\r\n'
+
+STR_LINE_ERROR = "line %d: %s: %s"
+STR_THROUGHPUT = "Converted %d lines (%.1f MB, %d errors) in %.2f s with %d workers: %.0f lines/s, %.1f MB/s"
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def convert_earth_line(p_text, mars_sec_on):
+    # Earth datetime in ISO format (UTC if no offset given) to Mars one,
+    # rounded to whole milliseconds on the integer path
+    input_date = datetime.fromisoformat(p_text)
+    if input_date.tzinfo is None:
+        input_date = input_date.replace(tzinfo=timezone.utc)
+    mars_date = earth_datetime_to_mars_datetime(input_date, mars_sec_on, resolution=RESOLUTION_MS)
+    return f"{mars_date[0]} {mars_date[1]}"
+
+
+def convert_mars_line(p_text, mars_sec_on):
+    # validating parser, rejects dates that do not exist in the calendar
+    out_ms = parse_mars_datetime(p_text, mars_sec_on)
+    out_dt = EPOCH_DATETIME + timedelta(milliseconds=out_ms)
+    return out_dt.isoformat(" ", "milliseconds")[:23]
+
+
+# Conversion mode: converter and mars_sec_on flag
+BATCH_MODES = {
+    "utc_to_mtc": (convert_earth_line, True),
+    "mtc_to_utc": (convert_mars_line, True),
+    "utc_to_raw": (convert_earth_line, False),
+    "raw_to_utc": (convert_mars_line, False),
+}
+
+
+def format_csv_fields(p_text, p_output, p_error):
+    # csv record after the line number field
+    fields = [p_text, p_output or "", p_error or ""]
+    # fields without separators or quotes are written as they are
+    if not any(c in x for x in fields for c in CSV_SPECIAL_CHARACTERS):
+        return "%s,%s,%s\n" % (fields[0], fields[1], fields[2])
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(fields)
+    return buffer.getvalue()
+
+
+def format_json_fields(p_text, p_output, p_error):
+    # json record after the line number member
+    record = {"input": p_text}
+    if p_error is None:
+        record["output"] = p_output
+    else:
+        record["error"] = p_error
+    return json.dumps(record)[1:] + "\n"
+
+
+# Output format: formatter of the fields after the line number, and pattern
+# joining line number and fields into a record
+RECORD_FORMATS = {
+    "csv": (format_csv_fields, "%d,%s"),
+    "json": (format_json_fields, '{"line": %d, %s'),
+}
+
+
+def convert_lines(p_lines, p_mode, output_format="plain", first_line=1):
+    # Yields (line number, input text, record, error) for each input line,
+    # blank lines are skipped. Plain records are output lines (None for failed
+    # lines), csv and json records are the fields after the line number and
+    # carry the error in place of the output.
+    convert, mars_sec_on = BATCH_MODES[p_mode]
+    format_fields = RECORD_FORMATS[output_format][0] if output_format in RECORD_FORMATS else None
+    line_number = first_line - 1
+    for line in p_lines:
+        line_number = line_number + 1
+        text = line.strip()
+        if not text:
+            continue
+        try:
+            result, error = convert(text, mars_sec_on), None
+        except CONVERSION_ERRORS as e:
+            result, error = None, "%s: %s" % (type(e).__name__, e)
+        if format_fields is not None:
+            record = format_fields(text, result, error)
+        elif error is None:
+            record = result + "\n"
+        else:
+            record = None
+        yield (line_number, text, record, error)
+
+
+def convert_records(p_lines, p_mode, output_format="plain", first_line=1):
+    # Yields (output record, error message) for each input line, blank lines
+    # are skipped. Record is None for failed lines in plain format, csv and
+    # json records carry the error in place of the output.
+    pattern = RECORD_FORMATS[output_format][1] if output_format in RECORD_FORMATS else None
+    for line_number, text, record, error in convert_lines(p_lines, p_mode, output_format, first_line):
+        if pattern is not None:
+            record = pattern % (line_number, record)
+        if error is not None:
+            error = STR_LINE_ERROR % (line_number, text, error)
+        yield (record, error)
+
+
+def stream_convert(p_lines, p_mode, p_output, output_format="plain", chunk_size=CHUNK_SIZE):
+    # Converts one timestamp per line, writing results in chunks and errors
+    # to stderr as they happen. Returns error count.
+    if output_format=="csv":
+        p_output.write(CSV_HEADER)
+    errors = 0
+    chunk = []
+    for record, error in convert_records(p_lines, p_mode, output_format):
+        if error is not None:
+            errors = errors + 1
+            sys.stderr.write(error + "\n")
+        if record is not None:
+            chunk.append(record)
+        if len(chunk)>=chunk_size:
+            p_output.write("".join(chunk))
+            p_output.flush()
+            chunk = []
+    p_output.write("".join(chunk))
+    p_output.flush()
+    return errors
+
+
+def split_file_chunks(p_path, chunk_bytes=CHUNK_BYTES):
+    # Yields (start, end) byte ranges of about chunk_bytes, each ending after
+    # a newline (or at end of file); only the line at each boundary is read
+    with open(p_path, "rb") as input_file:
+        size = os.fstat(input_file.fileno()).st_size
+        start = 0
+        while start<size:
+            end = min(start + chunk_bytes, size)
+            if end<size:
+                # extend to the end of current line
+                input_file.seek(end - 1)
+                end = end - 1 + len(input_file.readline())
+            yield (start, end)
+            start = end
+
+
+def convert_file_range(p_path, p_start, p_end, p_mode, output_format="plain"):
+    # Worker task: converts lines within a byte range of input file, line
+    # numbers are counted from range start as the lines before it are not
+    # known yet. Returns (output text for plain format or list of (line
+    # number, record fields) otherwise, list of (line number, input text,
+    # error), line count, byte count)
+    with open(p_path, "rb") as input_file:
+        input_file.seek(p_start)
+        data = input_file.read(p_end-p_start)
+    # same line breaks as found by split_file_chunks
+    lines = data.decode("utf-8").split("\n")
+    if lines[-1]=="":
+        lines.pop()
+    records = []
+    errors = []
+    for line_number, text, record, error in convert_lines(lines, p_mode, output_format):
+        if record is not None:
+            records.append(record if output_format=="plain" else (line_number, record))
+        if error is not None:
+            errors.append((line_number, text, error))
+    if output_format=="plain":
+        records = "".join(records)
+    return (records, errors, len(lines), len(data))
+
+
+def parallel_convert_file(p_path, p_mode, p_output, output_format="plain",
+        workers=None, chunk_bytes=CHUNK_BYTES, report=sys.stderr):
+    # Converts a file in byte range chunks on a pool of processes. Results are
+    # written in input order and errors to stderr; a throughput line is
+    # written to report (None to skip). Returns (lines, bytes, errors).
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if output_format=="csv":
+        p_output.write(CSV_HEADER)
+    lines = 0
+    total_bytes = 0
+    errors = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        chunks = split_file_chunks(p_path, chunk_bytes)
+        while True:
+            # keep a bounded number of tasks in flight, in input order
+            for start, end in chunks:
+                pending.append(executor.submit(
+                    convert_file_range, p_path, start, end, p_mode, output_format
+                ))
+                if len(pending)>=workers*TASKS_PER_WORKER:
+                    break
+            if not pending:
+                break
+            records, chunk_errors, chunk_lines, chunk_bytes_read = pending.popleft().result()
+            # line numbers from chunk start, shifted by the lines before it
+            for line_number, text, error in chunk_errors:
+                sys.stderr.write(STR_LINE_ERROR % (lines + line_number, text, error) + "\n")
+            if output_format=="plain":
+                p_output.write(records)
+            else:
+                pattern = RECORD_FORMATS[output_format][1]
+                p_output.write("".join([pattern % (lines + x[0], x[1]) for x in records]))
+            lines = lines + chunk_lines
+            total_bytes = total_bytes + chunk_bytes_read
+            errors = errors + len(chunk_errors)
+    p_output.flush()
+    elapsed = time.perf_counter() - started
+    if report is not None:
+        report.write(STR_THROUGHPUT % (
+            lines, total_bytes/1e6, errors, elapsed, workers,
+            lines/elapsed if elapsed>0 else 0, total_bytes/1e6/elapsed if elapsed>0 else 0
+        ) + "\n")
+        report.flush()
+    return (lines, total_bytes, errors)
@@ -0,0 +1,134 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from exodus_calendar.vectorized import earth_ms_to_mars_columns, MARS_COLUMNS
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Prefix of appended column names: mars_year, mars_month, mars_sol...
+COLUMN_PREFIX = "mars_"
+
+# Rows per record batch read from Parquet files
+BATCH_SIZE = 1 << 16
+
+# Arrow types of appended columns
+MARS_COLUMN_TYPES = {
+    "year": pa.int32(),
+    "month": pa.uint8(),
+    "sol": pa.uint8(),
+    "time": pa.string(),
+    "weekday": pa.uint8(),
+    "ls": pa.float64(),
+}
+
+# Milliseconds per timestamp unit: multiplier for seconds, divisor otherwise
+TIMESTAMP_MS_MULTIPLIER = {"s": 1000, "ms": 1}
+TIMESTAMP_MS_DIVISOR = {"us": 1000, "ns": 1000000}
+
+STR_NOT_TIMESTAMP = "Column '%s' is %s, not a timestamp"
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def timestamp_array_to_unix_ms(p_array):
+    # Arrow timestamp array (values are UTC whatever the time zone) to int64
+    # milliseconds since Unix epoch, rounded down, and a mask of null values
+    values = p_array.cast(pa.int64()).fill_null(0).to_numpy()
+    unit = p_array.type.unit
+    if unit in TIMESTAMP_MS_MULTIPLIER:
+        unix_ms = values*TIMESTAMP_MS_MULTIPLIER[unit]
+    else:
+        unix_ms = values // TIMESTAMP_MS_DIVISOR[unit]
+    nulls = p_array.is_null().to_numpy(zero_copy_only=False)
+    return (unix_ms, nulls)
+
+
+def fixed_width_string_array(p_strings):
+    # NumPy S array to Arrow string array sharing one data buffer, without
+    # creating Python string objects
+    count = len(p_strings)
+    width = p_strings.dtype.itemsize
+    offsets = np.arange(0, (count+1)*width, width, dtype=np.int32)
+    return pa.StringArray.from_buffers(
+        count, pa.py_buffer(offsets), pa.py_buffer(np.ascontiguousarray(p_strings))
+    )
+
+
+def mars_chunk_arrays(p_array, mars_sec_on=False):
+    # Arrow timestamp array to dictionary of Arrow arrays keyed by
+    # MARS_COLUMNS, null where input is null
+    unix_ms, nulls = timestamp_array_to_unix_ms(p_array)
+    columns = earth_ms_to_mars_columns(unix_ms, mars_sec_on)
+    mask = nulls if nulls.any() else None
+    arrays = {}
+    for name in MARS_COLUMNS:
+        if name=="time":
+            array = fixed_width_string_array(columns[name])
+            if mask is not None:
+                array = pc.if_else(pa.array(mask), pa.scalar(None, pa.string()), array)
+        else:
+            array = pa.array(columns[name], type=MARS_COLUMN_TYPES[name], mask=mask)
+        arrays[name] = array
+    return arrays
+
+
+def mars_column_arrays(p_array, mars_sec_on=False):
+    # Same as above for an array or a chunked array, the latter is converted
+    # chunk by chunk into chunked arrays of the same layout
+    if not isinstance(p_array, pa.ChunkedArray):
+        return mars_chunk_arrays(p_array, mars_sec_on)
+    chunks = [mars_chunk_arrays(x, mars_sec_on) for x in p_array.chunks]
+    return {
+        name: pa.chunked_array([x[name] for x in chunks], type=MARS_COLUMN_TYPES[name])
+        for name in MARS_COLUMNS
+    }
+
+
+def add_mars_columns(p_table, p_column, mars_sec_on=False, prefix=COLUMN_PREFIX):
+    # Returns Arrow table or record batch with Mars date columns (year, month,
+    # sol, time, weekday, Ls) computed from given timestamp column appended
+    column = p_table.column(p_column)
+    if not pa.types.is_timestamp(column.type):
+        raise TypeError(STR_NOT_TIMESTAMP % (p_column, column.type))
+    arrays = mars_column_arrays(column, mars_sec_on)
+    for name in MARS_COLUMNS:
+        p_table = p_table.append_column(prefix + name, arrays[name])
+    return p_table
+
+
+def add_mars_columns_to_batches(p_batches, p_column, mars_sec_on=False, prefix=COLUMN_PREFIX):
+    # Generator version of the above over an iterable of record batches, so
+    # large datasets are converted one batch at a time
+    for batch in p_batches:
+        yield add_mars_columns(batch, p_column, mars_sec_on, prefix)
+
+
+def convert_parquet_file(p_input_path, p_output_path, p_column,
+        mars_sec_on=False, prefix=COLUMN_PREFIX, batch_size=BATCH_SIZE):
+    # Copies a Parquet file with Mars date columns appended, reading and
+    # writing one record batch at a time. Returns number of rows.
+    input_file = pq.ParquetFile(p_input_path)
+    rows = 0
+    writer = None
+    try:
+        batches = input_file.iter_batches(batch_size=batch_size)
+        for batch in add_mars_columns_to_batches(batches, p_column, mars_sec_on, prefix):
+            if writer is None:
+                writer = pq.ParquetWriter(p_output_path, batch.schema)
+            writer.write_batch(batch)
+            rows = rows + batch.num_rows
+        if writer is None:
+            # no batches in input, write schema only
+            schema = input_file.schema_arrow
+            for name in MARS_COLUMNS:
+                schema = schema.append(pa.field(prefix + name, MARS_COLUMN_TYPES[name]))
+            writer = pq.ParquetWriter(p_output_path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from exodus_calendar.utils import EPOCH_UNIX_MS
+from exodus_calendar.vectorized import (
+    earth_ms_to_mars_columns,
+    earth_ms_to_mars_records,
+    earth_ms_to_solar_longitude_angle,
+    format_mars_datetime_pattern,
+    format_mars_time_array,
+    parse_mars_datetime_array,
+    MARS_COLUMNS,
+)
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Prefix of columns appended to data frames: mars_year, mars_month...
+COLUMN_PREFIX = "mars_"
+
+# pandas nullable types of integer columns, used when input has NaT values
+NULLABLE_TYPES = {
+    "year": "Int32", "month": "UInt8", "sol": "UInt8", "weekday": "UInt8",
+    "ms_of_sol": "UInt32",
+}
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def datetimes_to_unix_ms(p_values):
+    # DatetimeIndex, datetime Series or array (naive values taken as UTC) to
+    # int64 milliseconds since Unix epoch, rounded down, and a mask of NaT
+    index = pd.DatetimeIndex(p_values)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    values = index.values.astype("datetime64[ms]")
+    nulls = np.isnat(values)
+    unix_ms = np.where(nulls, 0, values.view(np.int64))
+    return (unix_ms, nulls)
+
+
+def column_with_missing(p_name, p_values, p_nulls):
+    # Computed column as pandas array, missing where input is NaT: NaN for
+    # Ls, NA otherwise (integer columns then use nullable types)
+    if p_name=="time":
+        p_values = pd.array(np.char.decode(p_values, "ascii"), dtype="string")
+        if p_nulls.any():
+            p_values[p_nulls] = pd.NA
+    elif p_name=="ls":
+        if p_nulls.any():
+            p_values = np.where(p_nulls, np.nan, p_values)
+    elif p_nulls.any():
+        p_values = pd.array(p_values, dtype=NULLABLE_TYPES[p_name])
+        p_values[p_nulls] = pd.NA
+    return p_values
+
+
+def mars_column_values(p_values, mars_sec_on=False):
+    # Dictionary of pandas arrays keyed by MARS_COLUMNS
+    unix_ms, nulls = datetimes_to_unix_ms(p_values)
+    columns = earth_ms_to_mars_columns(unix_ms, mars_sec_on)
+    return {x: column_with_missing(x, columns[x], nulls) for x in MARS_COLUMNS}
+
+
+def mars_fields_frame(p_index, mars_sec_on=False):
+    # DataFrame of Mars year, month, sol, time, weekday and Ls with one row
+    # for each value of given DatetimeIndex (which becomes its index)
+    index = pd.DatetimeIndex(p_index)
+    return pd.DataFrame(mars_column_values(index, mars_sec_on), index=index)
+
+
+def add_mars_columns(p_frame, p_column=None, mars_sec_on=False, prefix=COLUMN_PREFIX):
+    # Returns a copy of DataFrame with Mars date columns computed from given
+    # datetime column (or DatetimeIndex if no column given) appended
+    if p_column is None:
+        values = p_frame.index
+    else:
+        values = p_frame[p_column]
+    columns = mars_column_values(values, mars_sec_on)
+    return p_frame.assign(**{prefix + name: columns[name] for name in MARS_COLUMNS})
+
+
+###############################################################################
+############################### SERIES ACCESSOR ###############################
+###############################################################################
+
+@pd.api.extensions.register_series_accessor("mars")
+class MarsAccessor:
+    # Mars calendar fields of datetime Series (naive values taken as UTC), as
+    # series.mars.year, series.mars.strftime(...) etc. computed column-wise;
+    # to_earth() converts Series of Mars timestamp strings the other way.
+    # Registered when exodus_calendar.frames is imported.
+
+    def __init__(self, p_series):
+        self._series = p_series
+
+    def _wrap(self, p_values):
+        return pd.Series(p_values, index=self._series.index, name=self._series.name)
+
+    def _record_field(self, p_name):
+        unix_ms, nulls = datetimes_to_unix_ms(self._series)
+        values = np.ascontiguousarray(earth_ms_to_mars_records(unix_ms)[p_name])
+        return self._wrap(column_with_missing(p_name, values, nulls))
+
+    @property
+    def year(self):
+        return self._record_field("year")
+
+    @property
+    def month(self):
+        return self._record_field("month")
+
+    @property
+    def sol(self):
+        return self._record_field("sol")
+
+    @property
+    def weekday(self):
+        # Monday is 0, as in Series.dt.weekday
+        return self._record_field("weekday")
+
+    @property
+    def ms_of_sol(self):
+        return self._record_field("ms_of_sol")
+
+    @property
+    def ls(self):
+        unix_ms, nulls = datetimes_to_unix_ms(self._series)
+        values = earth_ms_to_solar_longitude_angle(unix_ms)
+        return self._wrap(column_with_missing("ls", values, nulls))
+
+    def time(self, mars_sec_on=False):
+        unix_ms, nulls = datetimes_to_unix_ms(self._series)
+        ms_of_sol = earth_ms_to_mars_records(unix_ms)["ms_of_sol"]
+        values = format_mars_time_array(ms_of_sol, mars_sec_on)
+        return self._wrap(column_with_missing("time", values, nulls))
+
+    def strftime(self, p_format, mars_sec_on=False):
+        # same directives as MarsDateTime.strftime
+        unix_ms, nulls = datetimes_to_unix_ms(self._series)
+        values = format_mars_datetime_pattern(unix_ms - EPOCH_UNIX_MS, p_format, mars_sec_on)
+        values = pd.array(np.char.decode(values, "utf-8"), dtype="string")
+        if nulls.any():
+            values[nulls] = pd.NA
+        return self._wrap(values)
+
+    def fields(self, mars_sec_on=False):
+        # DataFrame of all MARS_COLUMNS, with index of the Series
+        columns = mars_column_values(self._series, mars_sec_on)
+        return pd.DataFrame(columns, index=self._series.index)
+
+    def to_earth(self, mars_sec_on=False):
+        # Series of Mars timestamp strings to UTC datetimes (millisecond
+        # unit), missing values become NaT, invalid ones raise ValueError
+        missing = self._series.isna().to_numpy()
+        texts = self._series[~missing].astype(str).to_numpy()
+        values = np.full(len(missing), np.datetime64("NaT"), dtype="datetime64[ms]")
+        unix_ms = parse_mars_datetime_array(texts, mars_sec_on) + EPOCH_UNIX_MS
+        values[~missing] = unix_ms.astype("datetime64[ms]")
+        return self._wrap(values).dt.tz_localize("UTC")
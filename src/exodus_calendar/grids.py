@@ -0,0 +1,77 @@
+from datetime import timedelta
+from functools import lru_cache
+
+from exodus_calendar.utils import (
+    get_solar_longitude_angle,
+    get_year_info,
+    martian_time_to_ticks,
+)
+from exodus_calendar.utils import SOL_LENGTH, MONTHS, MONTH_LENGTH, EPOCH_DATETIME, EPOCH_UNIX_MS
+from exodus_calendar.parsing import STR_INVALID_YEAR, STR_INVALID_MONTH
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Every month is laid out as eight Monday to Sunday weeks, sols missing in
+# shorter months are left empty (None)
+WEEKS_PER_MONTH = 8
+SOLS_PER_WEEK = 7
+
+# Earth date and Ls of a cell are given for this time of sol, read on the
+# clock selected by mars_sec_on: mean solar noon with Mars seconds, about
+# 19m48s (Earth) before it with Earth seconds
+GRID_TIME_OF_SOL = "12:00:00"
+
+# Number of year grids kept in cache, keyed on (year, mars_sec_on)
+GRID_CACHE_SIZE = 64
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def build_year_grid(p_year, p_mars_sec_on):
+    # Twelve month grids of given Mars year, each is eight weeks of seven
+    # cells, a cell is (sol, weekday, Earth datetime in UTC, Ls) or None.
+    # Computed in one pass over the year, all values are immutable.
+    start_sol, start_ms, year_length, month_starts = get_year_info(p_year)
+    noon_ms = start_ms + martian_time_to_ticks(GRID_TIME_OF_SOL, p_mars_sec_on)
+    earth_dt = EPOCH_DATETIME + timedelta(milliseconds=noon_ms)
+    unix_ms = EPOCH_UNIX_MS + noon_ms
+    sol_length = timedelta(milliseconds=SOL_LENGTH)
+    months = []
+    for month_length in MONTH_LENGTH[year_length]:
+        cells = []
+        for i in range(0, WEEKS_PER_MONTH*SOLS_PER_WEEK, 1):
+            if i<month_length:
+                Ls = round(get_solar_longitude_angle(unix_ms), 3)
+                cells.append((i+1, i % SOLS_PER_WEEK, earth_dt, Ls))
+                earth_dt = earth_dt + sol_length
+                unix_ms = unix_ms + SOL_LENGTH
+            else:
+                cells.append(None)
+        months.append(tuple(
+            tuple(cells[i:i+SOLS_PER_WEEK])
+            for i in range(0, len(cells), SOLS_PER_WEEK)
+        ))
+    return tuple(months)
+
+
+def get_year_grid(p_year, mars_sec_on=False):
+    # cache is keyed on positional arguments only, so that keyword and
+    # positional calls share grids
+    if p_year==0:
+        raise ValueError(STR_INVALID_YEAR % p_year)
+    return build_year_grid(p_year, bool(mars_sec_on))
+
+
+def get_month_grid(p_year, p_month, mars_sec_on=False):
+    if p_month<1 or p_month>len(MONTHS):
+        raise ValueError(STR_INVALID_MONTH % p_month)
+    return get_year_grid(p_year, mars_sec_on)[p_month-1]
+
+
+def grid_cache_info():
+    # hits, misses, maxsize, currsize of the year grid cache
+    return build_year_grid.cache_info()
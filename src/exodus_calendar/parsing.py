@@ -0,0 +1,116 @@
+import re
+
+from exodus_calendar.utils import (
+    get_mars_zone,
+    get_year_info,
+    mars_clock_to_ticks,
+    martian_time_to_ticks,
+    split_zone_suffix,
+)
+from exodus_calendar.utils import SOL_LENGTH, MONTHS, MONTH_LENGTH, RESOLUTION_MS
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Canonical form, as printed by the library: [-]YYYY-MM-DD HH:MM:SS.mmm
+CANONICAL_PATTERN = re.compile(
+    r"(-?\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\.(\d{3})", re.ASCII
+)
+
+# Values of canonical form fields by their text, dictionary lookups are
+# cheaper than int() calls (minutes and seconds above 59 are missing)
+TWO_DIGITS = {"%02d" % x: x for x in range(0, 100, 1)}
+HOURS_MS = {"%02d" % x: x*3600000 for x in range(0, 100, 1)}
+MINUTES_MS = {"%02d" % x: x*60000 for x in range(0, 60, 1)}
+SECONDS_MS = {"%02d" % x: x*1000 for x in range(0, 60, 1)}
+MILLISECONDS = {"%03d" % x: x for x in range(0, 1000, 1)}
+
+# Any other accepted form: shorter or longer fields, 'T' separator, no
+# fraction or a fraction of up to 6 digits
+GENERAL_PATTERN = re.compile(
+    r"(-?\d+)-(\d{1,2})-(\d{1,2})[ T](\d{1,2}:[0-5]?\d:[0-5]?\d(?:\.\d{1,6})?)",
+    re.ASCII
+)
+
+# Parsed dates (start of sol in milliseconds since epoch), the cache is
+# emptied once it grows to given size
+DATE_CACHE = {}
+DATE_CACHE_SIZE = 4096
+
+STR_INVALID_FORMAT = "Invalid Mars datetime '%s'"
+STR_INVALID_YEAR = "Invalid year %d (there is no year 0)"
+STR_INVALID_MONTH = "Invalid month %d"
+STR_INVALID_SOL = "Invalid sol %d of month %d in year %d (%d sols)"
+STR_INVALID_TIME = "Time of sol out of range in '%s'"
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def date_fields_to_sol_start(p_year, p_month, p_sol):
+    # validated date to milliseconds since epoch at the start of that sol
+    if p_year==0:
+        raise ValueError(STR_INVALID_YEAR % p_year)
+    if p_month<1 or p_month>len(MONTHS):
+        raise ValueError(STR_INVALID_MONTH % p_month)
+    start_sol, start_ms, year_length, month_starts = get_year_info(p_year)
+    month_length = MONTH_LENGTH[year_length][p_month-1]
+    if p_sol<1 or p_sol>month_length:
+        raise ValueError(STR_INVALID_SOL % (p_sol, p_month, p_year, month_length))
+    return (start_sol + month_starts[p_month-1] + p_sol - 1)*SOL_LENGTH
+
+
+def parse_general_mars_datetime(p_text, mars_sec_on=False, zone=None):
+    # also takes a zone suffix ("... Gale"), which takes precedence over zone
+    text, suffix_zone = split_zone_suffix(p_text.strip())
+    zone = suffix_zone or zone
+    match = GENERAL_PATTERN.fullmatch(text)
+    if match is None:
+        raise ValueError(STR_INVALID_FORMAT % p_text)
+    start_ms = date_fields_to_sol_start(int(match[1]), int(match[2]), int(match[3]))
+    ms_of_sol = martian_time_to_ticks(match[4], mars_sec_on, RESOLUTION_MS)
+    if ms_of_sol>=SOL_LENGTH:
+        raise ValueError(STR_INVALID_TIME % p_text)
+    if zone is not None:
+        return start_ms + ms_of_sol - get_mars_zone(zone).offset_ms
+    return start_ms + ms_of_sol
+
+
+def parse_mars_datetime(p_text, mars_sec_on=False, zone=None):
+    # Mars datetime string to integer milliseconds since epoch, same value as
+    # mars_datetime_to_earth_datetime_as_ms(..., resolution=RESOLUTION_MS),
+    # dates and times out of range raise ValueError. Text is local time of
+    # given zone, or of its zone suffix as printed by MarsDateTime.isoformat
+    match = CANONICAL_PATTERN.fullmatch(p_text)
+    if match is None:
+        return parse_general_mars_datetime(p_text, mars_sec_on, zone)
+    year, month, sol, hh, mi, ss, ms = match.groups()
+    try:
+        ms_of_sol = HOURS_MS[hh] + MINUTES_MS[mi] + SECONDS_MS[ss] + MILLISECONDS[ms]
+    except KeyError:
+        raise ValueError(STR_INVALID_TIME % p_text)
+    if mars_sec_on:
+        ticks, remainder = divmod(mars_clock_to_ticks(ms_of_sol*1000), 1000)
+        ms_of_sol = ticks + 1 if 2*remainder>=1000 else ticks
+    if ms_of_sol>=SOL_LENGTH:
+        raise ValueError(STR_INVALID_TIME % p_text)
+    # date part is the same for many consecutive timestamps
+    date = p_text[:-13]
+    start_ms = DATE_CACHE.get(date)
+    if start_ms is None:
+        start_ms = date_fields_to_sol_start(int(year), TWO_DIGITS[month], TWO_DIGITS[sol])
+        if len(DATE_CACHE)>=DATE_CACHE_SIZE:
+            DATE_CACHE.clear()
+        DATE_CACHE[date] = start_ms
+    if zone is not None:
+        return start_ms + ms_of_sol - get_mars_zone(zone).offset_ms
+    return start_ms + ms_of_sol
+
+
+def parse_mars_datetimes(p_texts, mars_sec_on=False, zone=None):
+    # bulk version of the above for any iterable of strings, returns a list
+    parse = parse_mars_datetime
+    if zone is not None:
+        zone = get_mars_zone(zone)
+    return [parse(x, mars_sec_on, zone) for x in p_texts]
@@ -0,0 +1,122 @@
+from exodus_calendar.utils import (
+    get_year_info,
+    MarsDateTime,
+)
+from exodus_calendar.utils import SOL_LENGTH, MONTHS, MONTH_LENGTH
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+SOLS_PER_WEEK = 7
+
+STR_INVALID_STEP = "step must be a positive integer"
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+# All iterators take MarsDateTime start and (exclusive) end values, or no end
+# to iterate indefinitely, and yield MarsDateTime values with calendar fields
+# already set. Calendar position is advanced one month or year at a time,
+# dates are never decoded from milliseconds after the start. Values keep the
+# zone of start, calendar boundaries are those of its local time.
+
+def check_step(p_step):
+    if not isinstance(p_step, int) or p_step<1:
+        raise ValueError(STR_INVALID_STEP)
+
+
+def zone_offset_ms(p_value):
+    zone = p_value.zone
+    return 0 if zone is None else zone.offset_ms
+
+
+def next_year(p_year):
+    # years before epoch are negative, there is no year 'zero'
+    return p_year + 1 if p_year!=-1 else 1
+
+
+def iter_sols(p_start, p_end=None, step=1):
+    # start, start + step sols, ... (time of sol is kept)
+    check_step(step)
+    yyyy, mm, dd, ms_of_sol = p_start.year, p_start.month, p_start.sol, p_start.ms_of_sol
+    milliseconds = p_start.milliseconds
+    zone = p_start.zone
+    end_ms = p_end.milliseconds if p_end is not None else None
+    month_length = MONTH_LENGTH[get_year_info(yyyy)[2]]
+    step_ms = step*SOL_LENGTH
+    while end_ms is None or milliseconds<end_ms:
+        yield MarsDateTime._from_decoded(milliseconds, (yyyy, mm, dd, ms_of_sol), zone)
+        milliseconds = milliseconds + step_ms
+        dd = dd + step
+        while dd>month_length[mm-1]:
+            dd = dd - month_length[mm-1]
+            mm = mm + 1
+            if mm>len(MONTHS):
+                mm = 1
+                yyyy = next_year(yyyy)
+                month_length = MONTH_LENGTH[get_year_info(yyyy)[2]]
+
+
+def iter_weeks(p_start, p_end=None, step=1):
+    # first sols of weeks (sols 1, 8, ... 50 of every month, all Mondays),
+    # starting with the week that contains start; last week of a month is
+    # shorter if month has less than 56 sols
+    check_step(step)
+    yyyy, mm, dd = p_start.year, p_start.month, p_start.sol
+    dd = dd - (dd-1) % SOLS_PER_WEEK
+    start_sol, start_ms, year_length, month_starts = get_year_info(yyyy)
+    month_length = MONTH_LENGTH[year_length]
+    zone = p_start.zone
+    milliseconds = start_ms + (month_starts[mm-1] + dd - 1)*SOL_LENGTH - zone_offset_ms(p_start)
+    end_ms = p_end.milliseconds if p_end is not None else None
+    while end_ms is None or milliseconds<end_ms:
+        yield MarsDateTime._from_decoded(milliseconds, (yyyy, mm, dd, 0), zone)
+        for i in range(0, step, 1):
+            sols = min(SOLS_PER_WEEK, month_length[mm-1] - dd + 1)
+            milliseconds = milliseconds + sols*SOL_LENGTH
+            dd = dd + sols
+            if dd>month_length[mm-1]:
+                dd = 1
+                mm = mm + 1
+                if mm>len(MONTHS):
+                    mm = 1
+                    yyyy = next_year(yyyy)
+                    month_length = MONTH_LENGTH[get_year_info(yyyy)[2]]
+
+
+def iter_months(p_start, p_end=None, step=1):
+    # first sols of months, starting with the month that contains start
+    check_step(step)
+    yyyy, mm = p_start.year, p_start.month
+    start_sol, start_ms, year_length, month_starts = get_year_info(yyyy)
+    month_length = MONTH_LENGTH[year_length]
+    zone = p_start.zone
+    milliseconds = start_ms + month_starts[mm-1]*SOL_LENGTH - zone_offset_ms(p_start)
+    end_ms = p_end.milliseconds if p_end is not None else None
+    while end_ms is None or milliseconds<end_ms:
+        yield MarsDateTime._from_decoded(milliseconds, (yyyy, mm, 1, 0), zone)
+        for i in range(0, step, 1):
+            milliseconds = milliseconds + month_length[mm-1]*SOL_LENGTH
+            mm = mm + 1
+            if mm>len(MONTHS):
+                mm = 1
+                yyyy = next_year(yyyy)
+                month_length = MONTH_LENGTH[get_year_info(yyyy)[2]]
+
+
+def iter_years(p_start, p_end=None, step=1):
+    # first sols of years, starting with the year that contains start
+    check_step(step)
+    yyyy = p_start.year
+    start_sol, start_ms, year_length, month_starts = get_year_info(yyyy)
+    zone = p_start.zone
+    milliseconds = start_ms - zone_offset_ms(p_start)
+    end_ms = p_end.milliseconds if p_end is not None else None
+    while end_ms is None or milliseconds<end_ms:
+        yield MarsDateTime._from_decoded(milliseconds, (yyyy, 1, 1, 0), zone)
+        for i in range(0, step, 1):
+            milliseconds = milliseconds + year_length*SOL_LENGTH
+            yyyy = next_year(yyyy)
+            year_length = get_year_info(yyyy)[2]
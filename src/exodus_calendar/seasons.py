@@ -0,0 +1,207 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+from exodus_calendar.utils import (
+    get_solar_longitude_angle,
+    get_solar_longitude_rate,
+    get_year_info,
+    MarsDateTime,
+)
+from exodus_calendar.utils import DAY_LENGTH, SOL_LENGTH, EPOCH_DATETIME, EPOCH_UNIX_MS
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Mean advance of solar longitude, degrees per day
+MEAN_LS_RATE = 0.52403840
+
+# Solver search window around the initial guess (covers the equation of
+# center, which is at most ~11 degrees or ~25 days), in days
+SOLVER_BRACKET_DAYS = 60
+
+# Solver stops once the step is below this value, in milliseconds
+SOLVER_TOLERANCE_MS = 0.5
+SOLVER_MAX_ITERATIONS = 50
+
+# Ls values at which seasons (in the sense of the readme table) start
+SEASON_BOUNDARIES = [0, 30, 60, 90, 120, 150, 180, 210, 240, 270, 300, 330]
+SEASON_WIDTH = 30
+SEASON_LS_RANGES = [(x, x + SEASON_WIDTH) for x in SEASON_BOUNDARIES]
+
+# Longest time between two season boundaries (~66 sols) with a margin, in days
+MAX_SEASON_DAYS = 80
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def ls_difference(p_ls, p_target):
+    # signed angular distance from target, in (-180, 180]
+    return (p_ls - p_target + 180) % 360 - 180
+
+
+def find_solar_longitude_after_ms(p_unix_ms, p_ls):
+    # First instant at or after p_unix_ms at which solar longitude equals
+    # p_ls, both in milliseconds since Unix epoch.
+    start_ms = p_unix_ms
+    start_ls = get_solar_longitude_angle(start_ms)
+    advance = (p_ls - start_ls) % 360
+    guess = start_ms + advance/MEAN_LS_RATE*DAY_LENGTH
+    # bracketed Newton iterations, Ls is strictly increasing in time
+    lower = max(start_ms, guess - SOLVER_BRACKET_DAYS*DAY_LENGTH)
+    upper = guess + SOLVER_BRACKET_DAYS*DAY_LENGTH
+    t_ms = guess
+    for i in range(0, SOLVER_MAX_ITERATIONS, 1):
+        diff = ls_difference(get_solar_longitude_angle(t_ms), p_ls)
+        if diff<0:
+            lower = t_ms
+        else:
+            upper = t_ms
+        step = diff/get_solar_longitude_rate(t_ms)*DAY_LENGTH
+        if abs(step)<SOLVER_TOLERANCE_MS:
+            return t_ms - step
+        t_next = t_ms - step
+        # fall back to bisection if Newton step leaves the bracket
+        if t_next<=lower or t_next>=upper:
+            t_next = (lower + upper)/2
+        t_ms = t_next
+    return t_ms
+
+
+def find_year_first_season_ms(p_year):
+    # (bucket, start) of the first of the twelve seasons of Mars year p_year:
+    # the one in effect at the start of the year, or the next one if it
+    # begins closer to the year start (vernal equinox, except for years tens
+    # of thousands of years away)
+    year_start_ms = EPOCH_UNIX_MS + get_year_info(p_year)[1]
+    bucket, start_ms = find_season_start_ms(year_start_ms)
+    next_bucket = (bucket + 1) % len(SEASON_BOUNDARIES)
+    next_ms = find_solar_longitude_after_ms(year_start_ms, SEASON_BOUNDARIES[next_bucket])
+    if next_ms - year_start_ms < year_start_ms - start_ms:
+        return (next_bucket, next_ms)
+    return (bucket, start_ms)
+
+
+def find_year_seasons_ms(p_year):
+    # (bucket, start) of the twelve seasons of Mars year p_year in time order,
+    # stepping forward from the first one
+    bucket, start_ms = find_year_first_season_ms(p_year)
+    seasons = [(bucket, start_ms)]
+    for i in range(1, len(SEASON_BOUNDARIES), 1):
+        bucket = (bucket + 1) % len(SEASON_BOUNDARIES)
+        start_ms = find_solar_longitude_after_ms(start_ms, SEASON_BOUNDARIES[bucket])
+        seasons.append((bucket, start_ms))
+    return seasons
+
+
+def find_solar_longitude_ms(p_year, p_ls):
+    # Instant within the twelve seasons of Mars year p_year (see above) at
+    # which solar longitude equals p_ls, in milliseconds since Unix epoch.
+    first_bucket, first_ms = find_year_first_season_ms(p_year)
+    bucket = int(p_ls % 360 // SEASON_WIDTH)
+    # start of the season containing p_ls, then p_ls within it
+    if bucket==first_bucket:
+        start_ms = first_ms
+    else:
+        start_ms = find_solar_longitude_after_ms(first_ms, SEASON_BOUNDARIES[bucket])
+    if p_ls % 360==SEASON_BOUNDARIES[bucket]:
+        return start_ms
+    return find_solar_longitude_after_ms(start_ms, p_ls)
+
+
+def unix_ms_to_datetimes(p_unix_ms):
+    delta_ms = round(p_unix_ms - EPOCH_UNIX_MS)
+    earth_dt = EPOCH_DATETIME + timedelta(milliseconds=delta_ms)
+    return (MarsDateTime(delta_ms), earth_dt)
+
+
+def find_solar_longitude(p_year, p_ls):
+    return unix_ms_to_datetimes(find_solar_longitude_ms(p_year, p_ls))
+
+
+def find_season_boundaries(p_year):
+    # (MarsDateTime, Earth datetime) of the twelve season starts of Mars year
+    # p_year in time order, from the vernal equinox nearest its first sol
+    return [unix_ms_to_datetimes(x) for bucket, x in find_year_seasons_ms(p_year)]
+
+
+def find_season_start_ms(p_unix_ms):
+    # season bucket of given instant and the time it began
+    bucket = int(get_solar_longitude_angle(p_unix_ms) // SEASON_WIDTH)
+    earliest_ms = p_unix_ms - MAX_SEASON_DAYS*DAY_LENGTH
+    start_ms = find_solar_longitude_after_ms(earliest_ms, SEASON_BOUNDARIES[bucket])
+    # instant may be a hair before the boundary due to rounding
+    if start_ms>p_unix_ms:
+        bucket = (bucket - 1) % len(SEASON_BOUNDARIES)
+        start_ms = find_solar_longitude_after_ms(earliest_ms, SEASON_BOUNDARIES[bucket])
+    return (bucket, start_ms)
+
+
+def season_of(p_unix_ms):
+    # direct computation: (bucket, (Ls from, Ls to), sol of season)
+    bucket, start_ms = find_season_start_ms(p_unix_ms)
+    sol_of_season = int((p_unix_ms - start_ms) // SOL_LENGTH) + 1
+    return (bucket, SEASON_LS_RANGES[bucket], sol_of_season)
+
+
+###############################################################################
+################################# SEASON INDEX ################################
+###############################################################################
+
+class SeasonIndex:
+    # Season boundary crossing times over a range of Mars years, sorted, for
+    # O(log n) season lookups. Instants outside are computed directly.
+    __slots__ = ("first_year", "last_year", "crossings", "buckets")
+
+    def __init__(self, first_year, last_year, crossings, buckets):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.crossings = crossings
+        self.buckets = buckets
+
+    def season_of(self, p_unix_ms):
+        crossings = self.crossings
+        i = bisect_right(crossings, p_unix_ms) - 1
+        if i<0 or i>=len(crossings)-1:
+            return season_of(p_unix_ms)
+        bucket = self.buckets[i]
+        sol_of_season = int((p_unix_ms - crossings[i]) // SOL_LENGTH) + 1
+        return (bucket, SEASON_LS_RANGES[bucket], sol_of_season)
+
+    def covers(self, p_unix_ms):
+        return self.crossings[0]<=p_unix_ms<self.crossings[-1]
+
+    def to_dict(self):
+        return {
+            "first_year": self.first_year,
+            "last_year": self.last_year,
+            "crossings": list(self.crossings),
+            "buckets": list(self.buckets),
+        }
+
+    @classmethod
+    def from_dict(cls, p_data):
+        return cls(
+            p_data["first_year"],
+            p_data["last_year"],
+            list(p_data["crossings"]),
+            list(p_data["buckets"])
+        )
+
+
+def build_season_index(p_first_year, p_last_year):
+    start_ms = EPOCH_UNIX_MS + get_year_info(p_first_year)[1]
+    # years before epoch are negative, there is no year 'zero'
+    next_year = p_last_year + 1 if p_last_year!=-1 else 1
+    end_ms = EPOCH_UNIX_MS + get_year_info(next_year)[1]
+    # start from the season in progress at the start of first year
+    bucket, crossing_ms = find_season_start_ms(start_ms)
+    crossings = [crossing_ms]
+    buckets = [bucket]
+    while crossing_ms<=end_ms:
+        bucket = (bucket + 1) % len(SEASON_BOUNDARIES)
+        crossing_ms = find_solar_longitude_after_ms(crossing_ms, SEASON_BOUNDARIES[bucket])
+        crossings.append(crossing_ms)
+        buckets.append(bucket)
+    return SeasonIndex(p_first_year, p_last_year, crossings, buckets)
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import time
+from functools import lru_cache
+
+from exodus_calendar.utils import (
+    get_mars_zone,
+    get_solar_longitude_angle,
+    get_year_info,
+    milliseconds_to_date_fields,
+    MarsDateTime,
+)
+from exodus_calendar.utils import SOL_LENGTH, MONTHS, MONTH_LENGTH, WEEKDAYS, EPOCH_UNIX_MS
+from exodus_calendar.seasons import (
+    find_season_start_ms,
+    find_solar_longitude_after_ms,
+    SEASON_BOUNDARIES,
+)
+from exodus_calendar.ranges import next_year
+from exodus_calendar.batch import BATCH_MODES, CONVERSION_ERRORS
+from exodus_calendar.service_defaults import DEFAULT_HOST, DEFAULT_PORT, TICK_MS
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Longest sleep of the ticker between rollover checks, in milliseconds, so
+# that system clock changes are noticed
+TICKER_MAX_SLEEP_MS = 1000
+
+# Jumps of the clock larger than this (or backwards) reset the state without
+# sending the rollover events in between, in sols
+MAX_CATCH_UP_SOLS = 10
+
+# Answers of convert queries kept in cache
+CONVERT_CACHE_SIZE = 4096
+
+# Subscribers with more unsent data than this are disconnected, in bytes
+SUBSCRIBER_BUFFER_LIMIT = 1 << 16
+
+# Events pushed to subscribers, in the order they happen at a sol boundary
+EVENTS = ["year", "month", "sol", "season"]
+
+STR_UNKNOWN_COMMAND = "Unknown command '%s' (now, convert, subscribe, unsubscribe, quit)"
+STR_UNKNOWN_MODE = "Unknown conversion mode '%s' (%s)"
+STR_UNKNOWN_EVENT = "Unknown event '%s' (%s)"
+STR_MISSING_INPUT = "convert needs a mode and a timestamp"
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def time_unix_ms():
+    return time.time_ns() // 1000000
+
+
+def next_sol_fields(p_year, p_month, p_sol):
+    # (year, month, sol) of the following sol
+    month_length = MONTH_LENGTH[get_year_info(p_year)[2]]
+    if p_sol<month_length[p_month-1]:
+        return (p_year, p_month, p_sol+1)
+    if p_month<len(MONTHS):
+        return (p_year, p_month+1, 1)
+    return (next_year(p_year), 1, 1)
+
+
+def encode_record(p_record):
+    return (json.dumps(p_record) + "\n").encode("utf-8")
+
+
+@lru_cache(maxsize=CONVERT_CACHE_SIZE)
+def convert_record(p_mode, p_text):
+    # JSON line answering a convert query, conversions do not depend on
+    # current time so answers are cached across ticks
+    convert, mars_sec_on = BATCH_MODES[p_mode]
+    try:
+        record = {"input": p_text, "output": convert(p_text, mars_sec_on)}
+    except CONVERSION_ERRORS as e:
+        record = {"input": p_text, "error": "%s: %s" % (type(e).__name__, e)}
+    return encode_record(record)
+
+
+class MarsClock:
+    # Current Mars date (MTC) advanced incrementally: calendar fields are
+    # decoded once and stepped sol by sol, time of sol follows from the
+    # start of current sol, next season boundary is solved for ahead of time.
+    # Answers are cached until the clock moves to another tick.
+    __slots__ = (
+        "unix_ms", "fields", "sol_start_ms", "next_sol_ms",
+        "season", "next_season_ms", "cache",
+    )
+
+    def __init__(self, p_unix_ms):
+        self.reset(p_unix_ms)
+
+    def reset(self, p_unix_ms):
+        delta_ms = p_unix_ms - EPOCH_UNIX_MS
+        yyyy, mm, dd, ms_of_sol = milliseconds_to_date_fields(delta_ms - delta_ms % SOL_LENGTH)
+        self.unix_ms = p_unix_ms
+        self.fields = (yyyy, mm, dd)
+        self.sol_start_ms = p_unix_ms - delta_ms % SOL_LENGTH
+        self.next_sol_ms = self.sol_start_ms + SOL_LENGTH
+        self.season = find_season_start_ms(p_unix_ms)[0]
+        self.next_season_ms = self.find_next_season_ms(p_unix_ms)
+        self.cache = {}
+
+    def find_next_season_ms(self, p_unix_ms):
+        next_bucket = (self.season + 1) % len(SEASON_BOUNDARIES)
+        return find_solar_longitude_after_ms(p_unix_ms, SEASON_BOUNDARIES[next_bucket])
+
+    def event_record(self, p_event, p_unix_ms):
+        yyyy, mm, dd = self.fields
+        delta_ms = round(p_unix_ms) - EPOCH_UNIX_MS
+        return {
+            "event": p_event,
+            "unix_ms": delta_ms + EPOCH_UNIX_MS,
+            "mars": MarsDateTime(delta_ms).isoformat(),
+            "year": yyyy, "month": mm, "sol": dd,
+            "season": self.season,
+        }
+
+    def advance(self, p_unix_ms):
+        # Moves the clock to given instant, returns list of (event, record)
+        # for sol, month, year and season boundaries passed, in time order
+        if p_unix_ms==self.unix_ms:
+            return []
+        if p_unix_ms<self.unix_ms or p_unix_ms-self.unix_ms>MAX_CATCH_UP_SOLS*SOL_LENGTH:
+            self.reset(p_unix_ms)
+            return []
+        events = []
+        while self.next_sol_ms<=p_unix_ms or self.next_season_ms<=p_unix_ms:
+            if self.next_season_ms<self.next_sol_ms:
+                self.season = (self.season + 1) % len(SEASON_BOUNDARIES)
+                events.append(("season", self.event_record("season", self.next_season_ms)))
+                self.next_season_ms = self.find_next_season_ms(self.next_season_ms)
+                continue
+            yyyy, mm, dd = self.fields
+            self.fields = next_sol_fields(yyyy, mm, dd)
+            self.sol_start_ms = self.next_sol_ms
+            self.next_sol_ms = self.next_sol_ms + SOL_LENGTH
+            for event, changed in zip(EVENTS, [self.fields[0]!=yyyy, self.fields[1]!=mm, True]):
+                if changed:
+                    events.append((event, self.event_record(event, self.sol_start_ms)))
+        self.unix_ms = p_unix_ms
+        self.cache = {}
+        return events
+
+    def now(self, zone=None):
+        # MarsDateTime of current tick, decoded from known fields for MTC
+        delta_ms = self.unix_ms - EPOCH_UNIX_MS
+        if zone is None:
+            fields = self.fields + (self.unix_ms - self.sol_start_ms,)
+            return MarsDateTime._from_decoded(delta_ms, fields)
+        return MarsDateTime(delta_ms, zone)
+
+    def now_record(self, zone=None):
+        # JSON line answering a now query, computed once per tick and zone
+        line = self.cache.get(zone)
+        if line is None:
+            value = self.now(zone)
+            record = {
+                "unix_ms": self.unix_ms,
+                "mars": value.isoformat(),
+                "mtc": value.isoformat(mars_sec_on=True),
+                "year": value.year, "month": value.month, "sol": value.sol,
+                "weekday": WEEKDAYS[(value.sol-1) % 7],
+                "ls": round(get_solar_longitude_angle(self.unix_ms), 4),
+                "season": self.season,
+            }
+            line = encode_record(record)
+            self.cache[zone] = line
+        return line
+
+
+class MarsClockService:
+    # Line protocol served over TCP or a Unix socket, one command per line,
+    # one JSON object per answer line:
+    #   now [zone]                   current Mars date and time
+    #   convert <mode> <timestamp>   same modes as batch conversions
+    #   subscribe [event ...]        pushes year, month, sol and season events
+    #   unsubscribe, quit
+    # All clients share one MarsClock, synced to time source at most once per
+    # tick; a ticker task wakes up at the next boundary to push events.
+    def __init__(self, time_source=time_unix_ms, tick_ms=TICK_MS):
+        self.time_source = time_source
+        self.tick_ms = tick_ms
+        self.clock = MarsClock(self.current_tick())
+        self.clients = set()
+        self.subscribers = {}
+        self.ticker = None
+
+    def current_tick(self):
+        unix_ms = self.time_source()
+        return unix_ms - unix_ms % self.tick_ms
+
+    def sync(self):
+        # advances shared clock to current tick, pushing events passed
+        clock = self.clock
+        tick = self.current_tick()
+        if tick!=clock.unix_ms:
+            self.publish(clock.advance(tick))
+        return clock
+
+    def publish(self, p_events):
+        for event, record in p_events:
+            line = encode_record(record)
+            for writer, events in list(self.subscribers.items()):
+                if event not in events:
+                    continue
+                if writer.is_closing() or \
+                        writer.transport.get_write_buffer_size()>SUBSCRIBER_BUFFER_LIMIT:
+                    # slow or gone, never let one client hold the others
+                    del self.subscribers[writer]
+                    writer.close()
+                    continue
+                writer.write(line)
+
+    async def run_ticker(self):
+        while True:
+            clock = self.sync()
+            next_ms = min(clock.next_sol_ms, clock.next_season_ms)
+            delay_ms = min(max(next_ms - self.time_source(), self.tick_ms), TICKER_MAX_SLEEP_MS)
+            await asyncio.sleep(delay_ms/1000)
+
+    def answer(self, p_writer, p_line):
+        # answer to one command line as bytes, None to close the connection
+        parts = p_line.split(None, 2)
+        command = parts[0].lower() if parts else ""
+        if command=="now":
+            try:
+                zone = get_mars_zone(parts[1]) if len(parts)>1 else None
+            except ValueError as e:
+                return encode_record({"error": str(e)})
+            return self.sync().now_record(zone)
+        if command=="convert":
+            if len(parts)<3:
+                return encode_record({"error": STR_MISSING_INPUT})
+            if parts[1] not in BATCH_MODES:
+                return encode_record({"error": STR_UNKNOWN_MODE % (parts[1], ", ".join(BATCH_MODES))})
+            return convert_record(parts[1], parts[2].strip())
+        if command=="subscribe":
+            events = p_line.split()[1:] or EVENTS
+            for event in events:
+                if event not in EVENTS:
+                    return encode_record({"error": STR_UNKNOWN_EVENT % (event, ", ".join(EVENTS))})
+            self.sync()
+            self.subscribers.setdefault(p_writer, set()).update(events)
+            return encode_record({"subscribed": sorted(self.subscribers[p_writer], key=EVENTS.index)})
+        if command=="unsubscribe":
+            self.subscribers.pop(p_writer, None)
+            return encode_record({"subscribed": []})
+        if command=="quit":
+            return None
+        return encode_record({"error": STR_UNKNOWN_COMMAND % command})
+
+    async def handle_client(self, p_reader, p_writer):
+        self.clients.add(p_writer)
+        try:
+            while True:
+                try:
+                    line = await p_reader.readline()
+                except ValueError:
+                    # line longer than stream limit
+                    break
+                if not line:
+                    break
+                text = line.decode("utf-8", "replace").strip()
+                if not text:
+                    continue
+                answer = self.answer(p_writer, text)
+                if answer is None:
+                    break
+                p_writer.write(answer)
+                await p_writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(p_writer)
+            self.subscribers.pop(p_writer, None)
+            p_writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        # starts listening (on Unix socket path if given) and the ticker,
+        # returns the asyncio server
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_client, path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        self.ticker = asyncio.ensure_future(self.run_ticker())
+        return server
+
+    async def stop(self, p_server):
+        p_server.close()
+        for writer in list(self.clients):
+            writer.close()
+        self.subscribers.clear()
+        if self.ticker is not None:
+            self.ticker.cancel()
+            try:
+                await self.ticker
+            except asyncio.CancelledError:
+                pass
+            self.ticker = None
+        await p_server.wait_closed()
+
+
+async def serve_mars_clock(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, tick_ms=TICK_MS):
+    # runs the clock service until cancelled
+    service = MarsClockService(tick_ms=tick_ms)
+    server = await service.start(host, port, path)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.stop(server)
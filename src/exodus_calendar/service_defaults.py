@@ -0,0 +1,12 @@
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Clock service defaults, kept apart from exodus_calendar.service so that
+# they can be read without loading asyncio (command line option defaults)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5219
+
+# Clock resolution: "now" answers are computed once per tick and shared by
+# all clients asking within it, in milliseconds
+TICK_MS = 1
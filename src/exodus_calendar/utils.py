@@ -1,4 +1,8 @@
 import time
+from bisect import bisect_right
+from functools import lru_cache
+from operator import itemgetter
+from itertools import accumulate
 from math import modf, ceil, floor, cos, sin, radians
 from datetime import datetime, timezone, timedelta
 from zoneinfo import ZoneInfo
@@ -35,6 +39,11 @@ EPOCH = "1955-04-11 19:21:51+00:00"
 
 EARTH_TIMEZONE = ZoneInfo("UTC")
 
+# Parsed epoch and its offset in milliseconds from Unix epoch
+EPOCH_DATETIME = datetime.fromisoformat(EPOCH)
+UNIX_EPOCH_DATETIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_UNIX_MS = (EPOCH_DATETIME - UNIX_EPOCH_DATETIME) // timedelta(milliseconds=1)
+
 # Martian sol length in milliseconds:
 # 24:39:35.244 seconds
 SOL_LENGTH = 88775244
@@ -48,6 +57,13 @@ DAY_LENGTH = 86400000
 MARS_YEAR_LENGTH = 668.5907
 MARS_MONTH_LENGTH = 56 # except December
 MARS_SECOND_LENGTH = 1027.49125
+# Martian second as exact fraction, in milliseconds
+MARS_SECOND_NUMERATOR = 102749125
+MARS_SECOND_DENOMINATOR = 100000
+
+# Integer mode resolutions, in ticks per millisecond
+RESOLUTION_MS = 1
+RESOLUTION_US = 1000
 
 # Gregorian year in days
 EARTH_YEAR_LENGTH = 365.2425
@@ -64,6 +80,7 @@ YEAR_CYCLE = [
     668, 669, 668, 669, 668, 669, 668, 669, 668, 669, 670
 ]
 
+SOLS_PER_CYCLE = sum(YEAR_CYCLE)
 MS_PER_CYCLE = sum(YEAR_CYCLE)*SOL_LENGTH
 MS_PER_MARS_YEAR = (sum(YEAR_CYCLE)*SOL_LENGTH)/len(YEAR_CYCLE)
 
@@ -80,28 +97,80 @@ MONTH_LENGTH = {
     670: [56, 56, 56, 56, 56, 56, 56, 56, 56, 56, 56, 54],
 }
 
+# Cumulative sol offsets of year starts within the 22-year cycle
+# (last entry is the cycle length)
+YEAR_START_SOLS = list(accumulate(YEAR_CYCLE, initial=0))
+
+# Cumulative sol offsets of month starts for each year length
+# (last entry is the year length)
+MONTH_START_SOLS = {
+    k: list(accumulate(v, initial=0)) for k, v in MONTH_LENGTH.items()
+}
+
+# Number of Mars years kept in year index cache
+YEAR_CACHE_SIZE = 1024
+
+# Number of compiled strftime patterns kept in cache
+FORMAT_CACHE_SIZE = 256
+
+# strftime directives: position in the list of values computed for each
+# date (see MarsFormat) and conversion used in output template
+FORMAT_DIRECTIVES = {
+    "Y": (0, "%s"),     # year, 4 digits and sign if negative
+    "m": (1, "%02d"),   # month
+    "d": (2, "%02d"),   # sol of month
+    "H": (3, "%02d"),   # hours
+    "M": (4, "%02d"),   # minutes
+    "S": (5, "%02d"),   # seconds
+    "f": (6, "%03d"),   # milliseconds
+    "j": (7, "%03d"),   # sol of year
+    "b": (8, "%s"),     # month name
+    "A": (9, "%s"),     # weekday name
+    "a": (10, "%s"),    # weekday name, 3 letters
+    "Z": (11, "%s"),    # Mars zone name (MTC unless zone is set)
+}
+
+# Named Mars zones: local mean solar time at east longitude (degrees) of
+# landing sites, more can be added with register_mars_zone()
+MARS_SITE_LONGITUDES = {
+    "MTC": 0.0,
+    "Meridiani": -5.5266,   # Opportunity
+    "Jezero": 77.4509,      # Perseverance
+    "Utopia": 109.925,      # Zhurong
+    "Elysium": 135.6234,    # InSight
+    "Gale": 137.4417,       # Curiosity
+    "Gusev": 175.4726,      # Spirit
+}
+
+# Number of fixed longitude zones kept in cache
+ZONE_CACHE_SIZE = 256
+
 WEEKDAYS = [
     "Monday", "Tuesday","Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 ]
 
+# Planetary perturbation constants for solar longitude calculation
+PBS_AMPLITUDE = [0.007, 0.006, 0.004, 0.004, 0.002, 0.002, 0.002] #deg
+PBS_PERIOD = [2.2353, 2.7543, 1.1177, 15.7866, 2.1354, 2.4694, 32.8493] #Jyr
+PBS_PHASE = [49.409, 168.173, 191.837, 21.736, 15.704, 95.528, 49.095] #deg
+# Only the first three terms are applied, which is what all published Ls
+# values (and tests) of version 1.0 are based on
+PBS_TERM_COUNT = 3
+PBS_TERMS = list(zip(PBS_AMPLITUDE, PBS_PERIOD, PBS_PHASE))[:PBS_TERM_COUNT]
+
 # STRING CONSTANTS
 STR_ANNUAL_ERROR = "Annual error for calendar year in seconds"
 STR_AVG_YEAR_LENGTH = "Calendar year length"
 STR_MARS_YEARS_TO_1SOL_ERROR = "Martian years to pass for 1 sol error"
 STR_EARTH_YEARS_TO_1SOL_ERROR = "Earth years to pass for 1 sol error"
+STR_UNKNOWN_ZONE = "Unknown Mars zone '%s'"
+STR_INVALID_ZONE_NAME = "Mars zone name must be a single word: '%s'"
 
 ###############################################################################
 ################################ IMPLEMENTATION ###############################
 ###############################################################################
 
 def get_solar_longitude_angle(p_milliseconds):
-    # Planetary perturbation constants
-    PX = {
-        "A":[0.007, 0.006, 0.004, 0.004, 0.002, 0.002, 0.002], #deg
-        "tau":[2.2353, 2.7543, 1.1177, 15.7866, 2.1354, 2.4694, 32.8493], #Jyr
-        "phi":[49.409, 168.173, 191.837, 21.736, 15.704, 95.528, 49.095] #deg
-    }
-    
     # calcuate julian date offset from January, 1st, 2000
     jd_ut = 2440587.5 + p_milliseconds/DAY_LENGTH
     jd_tt = jd_ut + 69.184/86400
@@ -113,9 +182,9 @@ def get_solar_longitude_angle(p_milliseconds):
     
     # calculate orbital perturbations parameter
     PBS = 0.0
-    for i in range(0, len(PX), 1):
-        angle = radians(0.98562*dT_J2000/PX["tau"][i]+PX["phi"][i])
-        PBS = PBS + PX["A"][i]*cos(angle)
+    for A, tau, phi in PBS_TERMS:
+        angle = radians(0.98562*dT_J2000/tau+phi)
+        PBS = PBS + A*cos(angle)
 
     # calculate angle
     Ls = alpha_fms + (10.691 + 3.0e-7*dT_J2000)*sin(M_rad) \
@@ -125,7 +194,67 @@ def get_solar_longitude_angle(p_milliseconds):
     return (Ls % 360)
 
 
-def format_raw_time(p_milliseconds, mars_second_on=False):
+def get_solar_longitude_rate(p_milliseconds):
+    # time derivative of solar longitude angle, in degrees per day
+    jd_ut = 2440587.5 + p_milliseconds/DAY_LENGTH
+    jd_tt = jd_ut + 69.184/86400
+    dT_J2000 = jd_tt - 2451545.0
+
+    M_rad = radians(19.3870 + 0.52402075*dT_J2000)
+    dM_rad = radians(0.52402075)
+
+    PBS_rate = 0.0
+    for A, tau, phi in PBS_TERMS:
+        angle = radians(0.98562*dT_J2000/tau+phi)
+        PBS_rate = PBS_rate - A*sin(angle)*radians(0.98562/tau)
+
+    Ls_rate = 0.52403840 + 3.0e-7*sin(M_rad) \
+        + (10.691 + 3.0e-7*dT_J2000)*cos(M_rad)*dM_rad \
+        + (2*0.623*cos(2*M_rad) + 3*0.050*cos(3*M_rad) \
+        + 4*0.005*cos(4*M_rad) + 5*0.0005*cos(5*M_rad))*dM_rad + PBS_rate
+
+    return Ls_rate
+
+
+def get_equation_of_time(p_milliseconds):
+    # local true minus local mean solar time, in degrees of hour angle (15
+    # per Martian hour), from the same orbital terms as solar longitude
+    # (Allison & McEwen, 2000)
+    jd_ut = 2440587.5 + p_milliseconds/DAY_LENGTH
+    jd_tt = jd_ut + 69.184/86400
+    dT_J2000 = jd_tt - 2451545.0
+    alpha_fms = 270.3863 + 0.52403840*dT_J2000
+    Ls = get_solar_longitude_angle(p_milliseconds)
+
+    # equation of center (true minus mean anomaly), with perturbations
+    equation_of_center = (Ls - alpha_fms + 180) % 360 - 180
+    Ls_rad = radians(Ls)
+    return 2.861*sin(2*Ls_rad) - 0.071*sin(4*Ls_rad) \
+        + 0.002*sin(6*Ls_rad) - equation_of_center
+
+
+def longitude_to_offset_ms(p_longitude):
+    # east longitude in degrees (west ones negative) to offset of local mean
+    # solar time from MTC in milliseconds, longitude taken within [-180, 180)
+    longitude = (p_longitude + 180) % 360 - 180
+    return round(longitude*SOL_LENGTH/360)
+
+
+def get_local_mean_solar_time(p_milliseconds, p_longitude):
+    # LMST at east longitude for milliseconds since Unix epoch, returned as
+    # milliseconds since calendar epoch: decoded (e.g. with MarsDateTime) it
+    # gives local date and time of sol; MTC is LMST at longitude 0
+    return p_milliseconds - EPOCH_UNIX_MS + longitude_to_offset_ms(p_longitude)
+
+
+def get_local_true_solar_time(p_milliseconds, p_longitude):
+    # LTST (apparent solar time, Sun is highest at 12:00 Martian clock), same
+    # form as above
+    offset_ms = round(get_equation_of_time(p_milliseconds)*SOL_LENGTH/360)
+    return get_local_mean_solar_time(p_milliseconds, p_longitude) + offset_ms
+
+
+def split_raw_time(p_milliseconds, mars_second_on=False):
     if mars_second_on:
         second_length = MARS_SECOND_LENGTH
     else:
@@ -138,14 +267,68 @@ def format_raw_time(p_milliseconds, mars_second_on=False):
     sec_frac, sec_int = modf(seconds)
     ms = round(sec_frac*1000)
     # todo - account for ms>1000 when martian second is used?
+    return (int(hours_int), int(minutes_int), int(sec_int), ms)
+
+
+def timedelta_to_ticks(p_delta, p_resolution=RESOLUTION_MS):
+    # exact integer count from timedelta days, seconds and microseconds
+    microseconds = (p_delta.days*86400 + p_delta.seconds)*1000000 + p_delta.microseconds
+    ticks, remainder = divmod(microseconds*p_resolution, 1000)
+    if 2*remainder>=1000:
+        ticks = ticks + 1
+    return ticks
+
+
+def ticks_to_mars_clock(p_ticks):
+    # scale to Martian clock ticks (1000 per Martian second), rounded
+    numerator = 2*p_ticks*1000*MARS_SECOND_DENOMINATOR + MARS_SECOND_NUMERATOR
+    return numerator // (2*MARS_SECOND_NUMERATOR)
+
+
+def mars_clock_to_ticks(p_clock_ticks):
+    numerator = 2*p_clock_ticks*MARS_SECOND_NUMERATOR + 1000*MARS_SECOND_DENOMINATOR
+    return numerator // (2*1000*MARS_SECOND_DENOMINATOR)
+
+
+def split_integer_time(p_ticks, mars_second_on=False, p_resolution=RESOLUTION_MS):
     if mars_second_on:
-        timestamp = "%02d:%02d:%02d.%03d" % (hours_int, minutes_int, sec_int, ms)
+        p_ticks = ticks_to_mars_clock(p_ticks)
+    total_seconds, fraction = divmod(p_ticks, 1000*p_resolution)
+    total_minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(total_minutes, 60)
+    return (hours, minutes, seconds, fraction)
+
+
+def format_raw_time(p_milliseconds, mars_second_on=False, resolution=None):
+    if resolution==RESOLUTION_US:
+        timestamp = "%02d:%02d:%02d.%06d" % split_integer_time(
+            p_milliseconds, mars_second_on, resolution
+        )
+    elif resolution==RESOLUTION_MS:
+        timestamp = "%02d:%02d:%02d.%03d" % split_integer_time(
+            p_milliseconds, mars_second_on, resolution
+        )
     else:
-        timestamp = "%02d:%02d:%02d.%03d" % (hours_int, minutes_int, sec_int, ms)
+        timestamp = "%02d:%02d:%02d.%03d" % split_raw_time(p_milliseconds, mars_second_on)
     return timestamp
 
 
-def martian_time_to_millisec(timestamp, mars_second_on=False):
+def martian_time_to_ticks(timestamp, mars_second_on=False, p_resolution=RESOLUTION_MS):
+    hours, minutes, seconds = timestamp.split(':')
+    seconds, _, fraction = seconds.partition('.')
+    clock_us = ((int(hours)*60 + int(minutes))*60 + int(seconds))*1000000 \
+        + int((fraction + "000000")[:6])
+    if mars_second_on:
+        clock_us = mars_clock_to_ticks(clock_us)
+    ticks, remainder = divmod(clock_us*p_resolution, 1000)
+    if 2*remainder>=1000:
+        ticks = ticks + 1
+    return ticks
+
+
+def martian_time_to_millisec(timestamp, mars_second_on=False, resolution=None):
+    if resolution is not None:
+        return martian_time_to_ticks(timestamp, mars_second_on, resolution)
     ts_s = [float(x) for x in timestamp.split(':')]
     # ts_s = [hours, minutes, seconds]
     if mars_second_on:
@@ -155,186 +338,159 @@ def martian_time_to_millisec(timestamp, mars_second_on=False):
     return round(milliseconds)
 
 
-# need to check the implementation again (suspect!)
+def milliseconds_to_date_fields(p_delta_ms, p_resolution=RESOLUTION_MS):
+    # split into whole sols since epoch and time of sol
+    total_sols, ms_of_sol = divmod(p_delta_ms, SOL_LENGTH*p_resolution)
+    # negative timestamps less than 0.5 ms before next sol are rounded up
+    if p_delta_ms<0 and round(SOL_LENGTH*p_resolution-ms_of_sol)==0:
+        total_sols = total_sols + 1
+        ms_of_sol = 0
+    # locate year within cycle and month within year by table lookup
+    total_sols = int(total_sols)
+    total_cycles, sol_in_cycle = divmod(total_sols, SOLS_PER_CYCLE)
+    year_index = bisect_right(YEAR_START_SOLS, sol_in_cycle) - 1
+    # years before epoch are negative, never year 'zero'
+    yyyy = total_cycles*len(YEAR_CYCLE) + year_index
+    if yyyy>=0:
+        yyyy = yyyy + 1
+    start_sol, start_ms, year_length, month_starts = get_year_info(yyyy)
+    sol_in_year = total_sols - start_sol
+    month_index = bisect_right(month_starts, sol_in_year) - 1
+    sol_in_month = sol_in_year - month_starts[month_index]
+    return (yyyy, month_index + 1, sol_in_month + 1, ms_of_sol)
+
+
+def format_raw_date(p_year, p_month, p_sol):
+    if p_year<0:
+        return "%05d-%02d-%02d" % (p_year, p_month, p_sol)
+    else:
+        return "%04d-%02d-%02d" % (p_year, p_month, p_sol)
+
+
+def format_date_fields(p_fields, mars_second_on=False, resolution=None):
+    yyyy, mm, dd, ms_of_sol = p_fields
+    date = format_raw_date(yyyy, mm, dd)
+    tt = format_raw_time(ms_of_sol, mars_second_on, resolution)
+    wd = WEEKDAYS[(dd-1) % 7]
+    return "%s %s, %s" % (date, tt, wd)
+
+
 def negative_milliseconds_to_date(p_delta_ms, mars_second_on=False):
-    absolute_milliseconds = abs(p_delta_ms)
-    total_cycles = absolute_milliseconds // MS_PER_CYCLE
-    # calculate total cycle years passed
-    full_cycle_years = total_cycles*len(YEAR_CYCLE)
-    ms_residual = absolute_milliseconds % MS_PER_CYCLE
-    years_accumulated = 0
-    for i in range(len(YEAR_CYCLE)-1, -1, -1):
-        if (ms_residual - YEAR_CYCLE[i]*SOL_LENGTH)<0:
-            break
-        else:
-            ms_residual = ms_residual - YEAR_CYCLE[i]*SOL_LENGTH
-            years_accumulated = years_accumulated + 1
-    # calculate current year duration
-    year_len = YEAR_CYCLE[len(YEAR_CYCLE)-years_accumulated-1]
-    # calculate months elapsed since start of year
-    months_accumulated = 0
-    for i in range(len(MONTH_LENGTH[year_len])-1, -1, -1):
-        if (ms_residual - MONTH_LENGTH[year_len][i]*SOL_LENGTH)<0:
-            break
-        else:
-            ms_residual = ms_residual - MONTH_LENGTH[year_len][i]*SOL_LENGTH
-            months_accumulated = months_accumulated + 1
-
-    months_accumulated = len(MONTH_LENGTH[year_len]) - months_accumulated
-    # calculate days elapsed
-    month_duration = MONTH_LENGTH[year_len][months_accumulated-1]
-    days_accumulated = 0
-    for i in range(month_duration-1, -1, -1):
-        if (ms_residual - SOL_LENGTH)<0:
-            break
-        else:
-            ms_residual = ms_residual - SOL_LENGTH
-            days_accumulated = days_accumulated + 1
-    days_accumulated = month_duration - days_accumulated
-    # calculate time
-    if round(ms_residual)>0:
-        tt = format_raw_time(SOL_LENGTH-ms_residual, mars_second_on)
+    fields = milliseconds_to_date_fields(-abs(p_delta_ms))
+    return format_date_fields(fields, mars_second_on)
+
+
+def positive_milliseconds_to_date(p_delta_ms, p_mars_second_on=False):
+    fields = milliseconds_to_date_fields(p_delta_ms)
+    return format_date_fields(fields, p_mars_second_on)
+
+
+def get_year_length(p_year):
+    # years before epoch are negative, there is no year 'zero'
+    if p_year>0:
+        return YEAR_CYCLE[(p_year-1) % len(YEAR_CYCLE)]
     else:
-        tt = format_raw_time(ms_residual, mars_second_on)
-        days_accumulated = days_accumulated + 1
-        if days_accumulated>month_duration:
-            months_accumulated = months_accumulated + 1
-            days_accumulated = 1
-        if months_accumulated>len(MONTHS):
-            months_accumulated = 1
-            years_accumulated = years_accumulated - 1
-        
-    yyyy = - full_cycle_years - years_accumulated - 1
-    mm = months_accumulated
-
-    dd= days_accumulated
-    wd = WEEKDAYS[(days_accumulated-1) % 7]
-    # never year 'zero'
-    if yyyy==0:
-        return("%04d-%02d-%02d %s, %s" % (yyyy+1, mm, dd, tt, wd))
+        return YEAR_CYCLE[p_year % len(YEAR_CYCLE)]
+
+
+@lru_cache(maxsize=YEAR_CACHE_SIZE)
+def get_year_info(p_year):
+    # years before epoch are negative, there is no year 'zero'
+    if p_year>0:
+        year_number = p_year - 1
     else:
-        return("%05d-%02d-%02d %s, %s" % (yyyy, mm, dd, tt, wd))
+        year_number = p_year
+    total_cycles, year_index = divmod(year_number, len(YEAR_CYCLE))
+    year_length = YEAR_CYCLE[year_index]
+    start_sol = total_cycles*SOLS_PER_CYCLE + YEAR_START_SOLS[year_index]
+    # (start sol since epoch, start ms since epoch, length, month start sols)
+    return (
+        start_sol,
+        start_sol*SOL_LENGTH,
+        year_length,
+        tuple(MONTH_START_SOLS[year_length])
+    )
 
 
-def positive_milliseconds_to_date(p_delta_ms, p_mars_second_on=False):
-    milliseconds_since_epoch = p_delta_ms
-    total_cycles = milliseconds_since_epoch // MS_PER_CYCLE
-    # calculate total cycle years passed
-    full_cycle_years = total_cycles*len(YEAR_CYCLE)
-    ms_residual = milliseconds_since_epoch % MS_PER_CYCLE
-    years_accumulated = 0
-    for i in range(0, len(YEAR_CYCLE), 1):
-        if (ms_residual - YEAR_CYCLE[i]*SOL_LENGTH)<0:
-            break
-        else:
-            ms_residual = ms_residual - YEAR_CYCLE[i]*SOL_LENGTH
-            years_accumulated = years_accumulated + 1
-    # calculate current year duration
-    year_length = YEAR_CYCLE[years_accumulated]
-    # calculate months elapsed since start of year
-    months_accumulated = 0
-    for i in range(0, len(MONTH_LENGTH[year_length]), 1):
-        if (ms_residual - MONTH_LENGTH[year_length][i]*SOL_LENGTH)<0:
-            break
-        else:
-            ms_residual = ms_residual - MONTH_LENGTH[year_length][i]*SOL_LENGTH
-            months_accumulated = months_accumulated + 1
-    # calculate days elapsed
-    days_accumulated = 0
-    month_duration = MONTH_LENGTH[year_length][months_accumulated]
-    for i in range(0, month_duration, 1):
-        if (ms_residual - SOL_LENGTH)<0:
-            break
-        else:
-            ms_residual = ms_residual - SOL_LENGTH
-            days_accumulated = days_accumulated + 1
-    # get time
-    tt = format_raw_time(ms_residual, p_mars_second_on)
-    # adds ones where necessary
-    yyyy = full_cycle_years + years_accumulated + 1
-    mm = months_accumulated + 1
-    dd = days_accumulated + 1
-    wd = WEEKDAYS[days_accumulated % 7]
-    return("%04d-%02d-%02d %s, %s" %(yyyy, mm, dd, tt, wd))
-
-
-def positive_dates_to_milliseconds(input_date, p_mars_second_on=False):
+def year_cache_info():
+    # hits, misses, maxsize, currsize of the year index cache
+    return get_year_info.cache_info()
+
+
+def date_fields_to_milliseconds(p_year, p_month, p_sol, p_ms_of_sol=0, p_resolution=RESOLUTION_MS):
+    start_sol, start_ms, year_length, month_starts = get_year_info(p_year)
+    total_sols = start_sol + month_starts[p_month-1] + p_sol - 1
+    return total_sols*SOL_LENGTH*p_resolution + p_ms_of_sol
+
+
+def positive_dates_to_milliseconds(input_date, p_mars_second_on=False, resolution=None):
     datetimes = input_date.split()
     date_split = [int(x) for x in datetimes[0].split('-')]
-    # calculate milliseconds elapsed
-    ms_total = 0
-    years_elapsed = date_split[0] - 1 
-    total_cycles_passed = years_elapsed // len(YEAR_CYCLE)
-    ms_total = ms_total + MS_PER_CYCLE*total_cycles_passed
-    # add full years
-    year_in_current_cycle = years_elapsed - total_cycles_passed*len(YEAR_CYCLE)
-    year_length = YEAR_CYCLE[year_in_current_cycle]
-    for i in range(0, year_in_current_cycle, 1):
-        ms_total = ms_total + YEAR_CYCLE[i]*SOL_LENGTH
-    months_elapsed = date_split[1] - 1 
-    for i in range(0, months_elapsed, 1):
-        ms_total = ms_total + MONTH_LENGTH[year_length][i]*SOL_LENGTH
-    days_elapsed = date_split[2] - 1
-    for i in range(0, days_elapsed, 1):
-        ms_total = ms_total + SOL_LENGTH
-    ms_total = ms_total + martian_time_to_millisec(datetimes[1], p_mars_second_on)
-    return ms_total
+    time_to_ms = martian_time_to_millisec(datetimes[1], p_mars_second_on, resolution)
+    return date_fields_to_milliseconds(
+        date_split[0], date_split[1], date_split[2], time_to_ms, resolution or RESOLUTION_MS
+    )
 
  
-def negative_dates_to_milliseconds(p_input_date, p_mars_second_on=False):
+def negative_dates_to_milliseconds(p_input_date, p_mars_second_on=False, resolution=None):
     datetimes = p_input_date.split()
     date_split = [int(x) for x in datetimes[0].split('-')]
-    # calculate milliseconds elapsed
-    ms_total = 0
-    years_elapsed = date_split[0] - 1
-    # calculate cycles passed 
-    total_cycles_passed = years_elapsed // len(YEAR_CYCLE)
-    ms_total = ms_total + MS_PER_CYCLE*total_cycles_passed
-    # calculate current year length
-    year_in_current_cycle = years_elapsed - total_cycles_passed*len(YEAR_CYCLE)
-    year_len = YEAR_CYCLE[len(YEAR_CYCLE) - year_in_current_cycle-1]
-    for i in range(0, year_in_current_cycle,1):
-        ms_total = ms_total + YEAR_CYCLE[len(YEAR_CYCLE)-i-1]*SOL_LENGTH
-    months_elapsed = len(MONTHS) - date_split[1]
-    for i in range(0, months_elapsed, 1):
-        ms_total = ms_total + MONTH_LENGTH[year_len][len(MONTHS)-i-1]*SOL_LENGTH
-    days_elapsed = MONTH_LENGTH[year_len][date_split[1]-1] - date_split[2]
-    for i in range(0, days_elapsed, 1):
-        ms_total = ms_total + SOL_LENGTH
-    time_to_ms = martian_time_to_millisec(datetimes[1],p_mars_second_on)
-    ms_total = ms_total + (SOL_LENGTH - time_to_ms)
-    return -ms_total
-
-
-def earth_datetime_to_mars_datetime(input_dt, mars_sec_on=False):
-    epoch_date = datetime.fromisoformat(EPOCH)
-    diff = input_dt - epoch_date
-    ms_since_epoch = diff.total_seconds()*1000.0
-    if (epoch_date<=input_dt):
-        mars_dt = positive_milliseconds_to_date(ms_since_epoch, mars_sec_on)
+    time_to_ms = martian_time_to_millisec(datetimes[1], p_mars_second_on, resolution)
+    return date_fields_to_milliseconds(
+        -date_split[0], date_split[1], date_split[2], time_to_ms, resolution or RESOLUTION_MS
+    )
+
+
+def earth_datetime_to_mars_datetime(input_dt, mars_sec_on=False, resolution=None, zone=None):
+    # zone (MarsZone, name or east longitude) gives local date and time
+    diff = input_dt - EPOCH_DATETIME
+    offset_ms = 0 if zone is None else get_mars_zone(zone).offset_ms
+    if resolution is None:
+        ms_since_epoch = diff.total_seconds()*1000.0 + offset_ms
+        fields = milliseconds_to_date_fields(ms_since_epoch)
     else:
-        mars_dt = negative_milliseconds_to_date(ms_since_epoch, mars_sec_on)
-    Ls = mars_datetime_to_solar_longitude_angle(mars_dt[:23], mars_sec_on)
-    date = mars_dt.split(',')[0].split(' ')[0]
-    time = mars_dt.split(',')[0].split(' ')[1]
-    weekday = mars_dt.split(',')[1].strip(' ')
+        ticks_since_epoch = timedelta_to_ticks(diff, resolution) + offset_ms*resolution
+        fields = milliseconds_to_date_fields(ticks_since_epoch, resolution)
+    yyyy, mm, dd, ms_of_sol = fields
+    # solar longitude is computed from the input instant directly
+    Ls = round(get_solar_longitude_angle(input_dt.timestamp()*1000), 3)
+    date = format_raw_date(yyyy, mm, dd)
+    time = format_raw_time(ms_of_sol, mars_sec_on, resolution)
+    weekday = WEEKDAYS[(dd-1) % 7]
     return (date, time, weekday, Ls)
 
 
-def mars_datetime_to_earth_datetime(input_dt, mars_sec_on=False):
-    out_ms = mars_datetime_to_earth_datetime_as_ms(input_dt, mars_sec_on)
-    out_dt = datetime.fromisoformat(EPOCH) + timedelta(milliseconds=out_ms)
+def mars_datetime_to_earth_datetime(input_dt, mars_sec_on=False, resolution=None):
+    out_ms = mars_datetime_to_earth_datetime_as_ms(input_dt, mars_sec_on, resolution)
+    if resolution==RESOLUTION_US:
+        out_dt = EPOCH_DATETIME + timedelta(microseconds=out_ms)
+    else:
+        out_dt = EPOCH_DATETIME + timedelta(milliseconds=out_ms)
     return out_dt
 
 
-def mars_datetime_to_earth_datetime_as_ms(input_dt, mars_sec_on=False):
-    if input_dt[0] == '-':
-        out_ms = negative_dates_to_milliseconds(input_dt[1:], mars_sec_on)
+def mars_datetime_to_earth_datetime_as_ms(input_dt, mars_sec_on=False, resolution=None):
+    if isinstance(input_dt, MarsDateTime):
+        out_ms = input_dt.milliseconds*(resolution or RESOLUTION_MS)
+    elif input_dt[0] == '-':
+        out_ms = negative_dates_to_milliseconds(input_dt[1:], mars_sec_on, resolution)
     else:
-        out_ms = positive_dates_to_milliseconds(input_dt, mars_sec_on)
+        out_ms = positive_dates_to_milliseconds(input_dt, mars_sec_on, resolution)
     return out_ms
 
 
+def unix_ms_to_mars(p_unix_ms, zone=None):
+    # integer fast path, no datetime objects involved
+    offset_ms = 0 if zone is None else get_mars_zone(zone).offset_ms
+    return milliseconds_to_date_fields(p_unix_ms - EPOCH_UNIX_MS + offset_ms)
+
+
+def mars_to_unix_ms(p_year, p_month, p_sol, p_ms_of_sol=0, zone=None):
+    offset_ms = 0 if zone is None else get_mars_zone(zone).offset_ms
+    return EPOCH_UNIX_MS - offset_ms \
+        + date_fields_to_milliseconds(p_year, p_month, p_sol, p_ms_of_sol)
+
+
 def mars_datetime_now(format="str", mars_sec_on=False):
     timedate = datetime.now(timezone.utc)
     m_d = earth_datetime_to_mars_datetime(timedate, mars_sec_on)
@@ -353,6 +509,8 @@ def compute_mars_timedelta(p_date_1, p_date_2, mars_sec_on=False):
 
 
 def add_timedelta_to_mars_date(p_date, p_milliseconds, mars_sec_on=False):
+    if isinstance(p_date, MarsDateTime):
+        return p_date + p_milliseconds
     start_ms = mars_datetime_to_earth_datetime_as_ms(p_date, mars_sec_on)
     total_ms = start_ms + p_milliseconds
     if total_ms>=0:
@@ -363,7 +521,361 @@ def add_timedelta_to_mars_date(p_date, p_milliseconds, mars_sec_on=False):
 
 def mars_datetime_to_solar_longitude_angle(p_mars_datetime, mars_sec_on=False):
     delta_ms = mars_datetime_to_earth_datetime_as_ms(p_mars_datetime, mars_sec_on)
-    start_dt = datetime.fromisoformat(EPOCH) + timedelta(milliseconds=delta_ms)
-    Ls = round(get_solar_longitude_angle(start_dt.timestamp()*1000),3)
+    Ls = round(get_solar_longitude_angle(EPOCH_UNIX_MS + delta_ms),3)
     return Ls
 
+
+###############################################################################
+############################### MARS TIME ZONES ###############################
+###############################################################################
+
+class MarsZone:
+    # Fixed offset Mars time zone: local mean solar time at east longitude
+    # (see get_local_mean_solar_time), offset from MTC computed once
+    __slots__ = ("name", "longitude", "offset_ms")
+
+    def __init__(self, name, longitude):
+        if len(name.split())!=1:
+            raise ValueError(STR_INVALID_ZONE_NAME % name)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "longitude", longitude)
+        object.__setattr__(self, "offset_ms", longitude_to_offset_ms(longitude))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MarsZone is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.name, self.longitude))
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (self.__class__.__name__, self.name, self.longitude)
+
+    def __str__(self):
+        return self.name
+
+    def __hash__(self):
+        return hash((self.name, self.offset_ms))
+
+    def __eq__(self, other):
+        if isinstance(other, MarsZone):
+            return (self.name, self.offset_ms) == (other.name, other.offset_ms)
+        return NotImplemented
+
+
+MARS_ZONES = {k: MarsZone(k, v) for k, v in MARS_SITE_LONGITUDES.items()}
+MTC_ZONE = MARS_ZONES["MTC"]
+
+
+@lru_cache(maxsize=ZONE_CACHE_SIZE)
+def get_fixed_mars_zone(p_longitude):
+    # zone named after its east longitude, e.g. "+137.442" (taken within
+    # [-180, 180), rounded to 3 decimals so the name gives same offset)
+    longitude = round((p_longitude + 180) % 360 - 180, 3)
+    return MarsZone("%+.3f" % longitude, longitude)
+
+
+def register_mars_zone(p_name, p_longitude):
+    zone = MarsZone(p_name, p_longitude)
+    MARS_ZONES[p_name] = zone
+    return zone
+
+
+def get_mars_zone(p_zone):
+    # MarsZone from zone itself, name of a registered zone, signed longitude
+    # string ("+137.442") or longitude number
+    if isinstance(p_zone, MarsZone):
+        return p_zone
+    if isinstance(p_zone, (int, float)):
+        return get_fixed_mars_zone(p_zone)
+    zone = MARS_ZONES.get(p_zone)
+    if zone is not None:
+        return zone
+    if p_zone[:1] in ("+", "-"):
+        try:
+            return get_fixed_mars_zone(float(p_zone))
+        except ValueError:
+            pass
+    raise ValueError(STR_UNKNOWN_ZONE % p_zone)
+
+
+def split_zone_suffix(p_text):
+    # "date time zone" to ("date time", MarsZone), or (p_text, None) if last
+    # word is not a registered zone name or a signed longitude
+    parts = p_text.rsplit(None, 1)
+    if len(parts)==2 and ':' not in parts[1]:
+        try:
+            return (parts[0], get_mars_zone(parts[1]))
+        except ValueError:
+            pass
+    return (p_text, None)
+
+
+###############################################################################
+############################# MARS DATETIME TYPE ##############################
+###############################################################################
+
+class MarsDateTime:
+    # Immutable Mars date and time, stored as integer milliseconds since epoch.
+    # Calendar fields are derived on first access and kept for reuse. With a
+    # zone set, fields are local time of that zone, while milliseconds,
+    # comparisons and Earth time still refer to the same instant.
+    __slots__ = ("_milliseconds", "_fields", "_zone")
+
+    def __init__(self, milliseconds=0, zone=None):
+        object.__setattr__(self, "_milliseconds", int(milliseconds))
+        object.__setattr__(self, "_fields", None)
+        object.__setattr__(self, "_zone", None if zone is None else get_mars_zone(zone))
+
+    @classmethod
+    def from_fields(cls, year, month, sol, ms_of_sol=0, zone=None):
+        # local date and time of sol in given zone
+        offset_ms = 0 if zone is None else get_mars_zone(zone).offset_ms
+        return cls(date_fields_to_milliseconds(year, month, sol, ms_of_sol) - offset_ms, zone)
+
+    @classmethod
+    def from_string(cls, input_dt, mars_sec_on=False, zone=None):
+        # zone suffix of the string, if any, takes precedence over zone
+        input_dt, suffix_zone = split_zone_suffix(input_dt)
+        zone = suffix_zone or zone
+        milliseconds = mars_datetime_to_earth_datetime_as_ms(input_dt, mars_sec_on)
+        if zone is None:
+            return cls(milliseconds)
+        zone = get_mars_zone(zone)
+        return cls(milliseconds - zone.offset_ms, zone)
+
+    @classmethod
+    def from_earth_datetime(cls, input_dt, zone=None):
+        return cls(timedelta_to_ticks(input_dt - EPOCH_DATETIME), zone)
+
+    @classmethod
+    def from_unix_ms(cls, unix_ms, zone=None):
+        return cls(unix_ms - EPOCH_UNIX_MS, zone)
+
+    @classmethod
+    def now(cls, zone=None):
+        return cls.from_earth_datetime(datetime.now(timezone.utc), zone)
+
+    @classmethod
+    def _from_decoded(cls, milliseconds, fields, zone=None):
+        # fields (year, month, sol, ms of sol) already known by the caller,
+        # used by calendar iterators to skip decoding
+        instance = cls(milliseconds, zone)
+        object.__setattr__(instance, "_fields", fields)
+        return instance
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MarsDateTime is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self._milliseconds, self._zone))
+
+    def _get_fields(self):
+        if self._fields is None:
+            if self._zone is None:
+                fields = milliseconds_to_date_fields(self._milliseconds)
+            else:
+                fields = milliseconds_to_date_fields(self._milliseconds + self._zone.offset_ms)
+            object.__setattr__(self, "_fields", fields)
+        return self._fields
+
+    @property
+    def milliseconds(self):
+        return self._milliseconds
+
+    @property
+    def zone(self):
+        # None for plain MTC values
+        return self._zone
+
+    def astimezone(self, zone):
+        # same instant in local time of another zone (None for plain MTC)
+        return self.__class__(self._milliseconds, zone)
+
+    @property
+    def year(self):
+        return self._get_fields()[0]
+
+    @property
+    def month(self):
+        return self._get_fields()[1]
+
+    @property
+    def sol(self):
+        return self._get_fields()[2]
+
+    @property
+    def ms_of_sol(self):
+        return self._get_fields()[3]
+
+    @property
+    def weekday(self):
+        # Monday is 0, as in datetime.weekday()
+        return (self.sol-1) % 7
+
+    @property
+    def sol_of_year(self):
+        year_length = get_year_length(self.year)
+        return MONTH_START_SOLS[year_length][self.month-1] + self.sol
+
+    def to_earth_datetime(self):
+        return EPOCH_DATETIME + timedelta(milliseconds=self._milliseconds)
+
+    def to_unix_ms(self):
+        return EPOCH_UNIX_MS + self._milliseconds
+
+    def solar_longitude_angle(self):
+        return get_solar_longitude_angle(EPOCH_UNIX_MS + self._milliseconds)
+
+    def strftime(self, p_format, mars_sec_on=False):
+        return compile_mars_format(p_format).format(self, mars_sec_on)
+
+    def isoformat(self, mars_sec_on=False):
+        # zone name is appended for values with a zone, as parsed back by
+        # from_string() and parsing.parse_mars_datetime()
+        if self._zone is None:
+            return ISO_FORMAT.format(self, mars_sec_on)
+        return ISO_ZONE_FORMAT.format(self, mars_sec_on)
+
+    def __str__(self):
+        return self.isoformat()
+
+    def __repr__(self):
+        if self._zone is None:
+            return "%s(%d)" % (self.__class__.__name__, self._milliseconds)
+        return "%s(%d, %r)" % (self.__class__.__name__, self._milliseconds, self._zone.name)
+
+    def __hash__(self):
+        return hash(self._milliseconds)
+
+    def __eq__(self, other):
+        if isinstance(other, MarsDateTime):
+            return self._milliseconds == other._milliseconds
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, MarsDateTime):
+            return self._milliseconds < other._milliseconds
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, MarsDateTime):
+            return self._milliseconds <= other._milliseconds
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, MarsDateTime):
+            return self._milliseconds > other._milliseconds
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, MarsDateTime):
+            return self._milliseconds >= other._milliseconds
+        return NotImplemented
+
+    def __add__(self, other):
+        # timedeltas or plain milliseconds, like add_timedelta_to_mars_date
+        if isinstance(other, timedelta):
+            return self.__class__(self._milliseconds + other // timedelta(milliseconds=1), self._zone)
+        if isinstance(other, (int, float)):
+            return self.__class__(self._milliseconds + round(other), self._zone)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, MarsDateTime):
+            return timedelta(milliseconds=self._milliseconds - other._milliseconds)
+        if isinstance(other, timedelta):
+            return self.__class__(self._milliseconds - other // timedelta(milliseconds=1), self._zone)
+        if isinstance(other, (int, float)):
+            return self.__class__(self._milliseconds - round(other), self._zone)
+        return NotImplemented
+
+
+###############################################################################
+############################# MARS DATETIME FORMAT ############################
+###############################################################################
+
+class MarsFormat:
+    # strftime-like pattern (directives as in FORMAT_DIRECTIVES, %% for a
+    # percent sign), parsed once into a %-template and list of values it uses;
+    # parts keeps (literal text, directive) pairs in order for other renderers
+    __slots__ = ("pattern", "template", "getter", "parts")
+
+    def __init__(self, p_format):
+        template = []
+        indices = []
+        parts = []
+        literal = []
+        i = 0
+        while i<len(p_format):
+            if p_format[i]=='%' and i+1<len(p_format):
+                code = p_format[i+1]
+                if code=='%':
+                    template.append("%%")
+                    literal.append('%')
+                elif code in FORMAT_DIRECTIVES:
+                    index, conversion = FORMAT_DIRECTIVES[code]
+                    template.append(conversion)
+                    indices.append(index)
+                    parts.append(("".join(literal), code))
+                    literal = []
+                else:
+                    raise ValueError("Invalid format directive '%%%s'" % code)
+                i = i + 2
+            else:
+                template.append("%%" if p_format[i]=='%' else p_format[i])
+                literal.append(p_format[i])
+                i = i + 1
+        if literal:
+            parts.append(("".join(literal), None))
+        self.pattern = p_format
+        self.template = "".join(template)
+        self.parts = parts
+        if len(indices)==1:
+            index = indices[0]
+            self.getter = lambda p_values: (p_values[index],)
+        else:
+            self.getter = itemgetter(*indices) if indices else lambda p_values: ()
+
+    def format_fields(self, p_fields, mars_sec_on=False, zone_name="MTC"):
+        # (year, month, sol, ms of sol) tuple, integer time of sol
+        yyyy, mm, dd, ms_of_sol = p_fields
+        hh, mi, ss, ms = split_integer_time(ms_of_sol, mars_sec_on)
+        weekday = WEEKDAYS[(dd-1) % 7]
+        values = (
+            "%05d" % yyyy if yyyy<0 else "%04d" % yyyy,
+            mm, dd, hh, mi, ss, ms,
+            MONTH_START_SOLS[get_year_info(yyyy)[2]][mm-1] + dd,
+            MONTHS[mm-1], weekday, weekday[:3], zone_name,
+        )
+        return self.template % self.getter(values)
+
+    def format(self, p_value, mars_sec_on=False, zone=None):
+        # MarsDateTime (in its own zone) or integer milliseconds since epoch
+        # (in given zone, MTC by default)
+        if isinstance(p_value, MarsDateTime):
+            fields = p_value._get_fields()
+            zone = p_value._zone
+        elif zone is None:
+            fields = milliseconds_to_date_fields(p_value)
+        else:
+            zone = get_mars_zone(zone)
+            fields = milliseconds_to_date_fields(p_value + zone.offset_ms)
+        return self.format_fields(fields, mars_sec_on, "MTC" if zone is None else zone.name)
+
+    def format_many(self, p_values, mars_sec_on=False, zone=None):
+        format_value = self.format
+        return [format_value(x, mars_sec_on, zone) for x in p_values]
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.pattern)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def compile_mars_format(p_format):
+    return MarsFormat(p_format)
+
+
+ISO_FORMAT = compile_mars_format("%Y-%m-%d %H:%M:%S.%f")
+ISO_ZONE_FORMAT = compile_mars_format("%Y-%m-%d %H:%M:%S.%f %Z")
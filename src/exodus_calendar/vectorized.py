@@ -0,0 +1,660 @@
+import os
+from math import gcd
+
+import numpy as np
+
+from exodus_calendar.utils import (
+    EPOCH_UNIX_MS,
+    MARS_SECOND_NUMERATOR,
+    MARS_SECOND_DENOMINATOR,
+    DAY_LENGTH,
+    SOL_LENGTH,
+    SOLS_PER_CYCLE,
+    MARS_SECOND_LENGTH,
+    YEAR_CYCLE,
+    MONTH_LENGTH,
+    YEAR_START_SOLS,
+    MONTH_START_SOLS,
+    MONTHS,
+    WEEKDAYS,
+    PBS_TERMS,
+    compile_mars_format,
+    get_mars_zone,
+)
+from exodus_calendar.seasons import (
+    MEAN_LS_RATE,
+    SOLVER_BRACKET_DAYS,
+    SOLVER_TOLERANCE_MS,
+    SOLVER_MAX_ITERATIONS,
+    SEASON_BOUNDARIES,
+    SEASON_WIDTH,
+    MAX_SEASON_DAYS,
+)
+from exodus_calendar.parsing import parse_mars_datetime, date_fields_to_sol_start
+
+###############################################################################
+################################## CONSTANTS ##################################
+###############################################################################
+
+# Record layout returned by batch conversions
+MARS_FIELDS_DTYPE = np.dtype([
+    ("year", np.int32),
+    ("month", np.uint8),
+    ("sol", np.uint8),
+    ("ms_of_sol", np.float64),
+    ("weekday", np.uint8),
+])
+
+# Packed little-endian record layout of memory-mapped conversions
+MARS_RECORD_DTYPE = np.dtype([
+    ("year", "<i4"),
+    ("month", "u1"),
+    ("sol", "u1"),
+    ("ms_of_sol", "<u4"),
+    ("weekday", "u1"),
+])
+
+# Input records converted at a time by convert_unix_ms_file
+MMAP_WINDOW = 1 << 20
+
+STR_INVALID_INPUT_SIZE = "Input file size %d is not a multiple of 8 bytes (int64 values)"
+
+# Per-sol lookup tables covering one 22-year cycle:
+# year index within cycle, month (1-12) and sol of month (1-56)
+CYCLE_YEAR_INDEX = np.repeat(np.arange(len(YEAR_CYCLE)), YEAR_CYCLE)
+CYCLE_MONTH = np.concatenate([
+    np.repeat(np.arange(1, 13), MONTH_LENGTH[x]) for x in YEAR_CYCLE
+]).astype(np.uint8)
+CYCLE_SOL = np.concatenate([
+    np.arange(1, m+1) for x in YEAR_CYCLE for m in MONTH_LENGTH[x]
+]).astype(np.uint8)
+CYCLE_WEEKDAY = (CYCLE_SOL-1) % 7
+
+# Per-year lookup tables for one 22-year cycle:
+# sol offset of year start and sol offsets of month starts
+CYCLE_YEAR_START = np.array(YEAR_START_SOLS[:-1], dtype=np.int64)
+CYCLE_MONTH_START = np.array(
+    [MONTH_START_SOLS[x][:-1] for x in YEAR_CYCLE], dtype=np.int64
+)
+
+# Planetary perturbation constants as arrays (amplitude, period, phase)
+PBS_AMPLITUDE, PBS_PERIOD, PBS_PHASE = np.array(PBS_TERMS, dtype=np.float64).T
+
+# Month lengths for each year of cycle
+CYCLE_MONTH_LENGTH = np.array([MONTH_LENGTH[x] for x in YEAR_CYCLE], dtype=np.int64)
+
+# Character layout of canonical "YYYY-MM-DD HH:MM:SS.mmm" timestamps (after
+# the sign of negative years): digit positions and separators
+CANONICAL_LENGTH = 23
+CANONICAL_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18, 20, 21, 22]
+CANONICAL_SEPARATORS = {4: b'-', 7: b'-', 10: b' ', 13: b':', 16: b':', 19: b'.'}
+CANONICAL_TEMPLATE = np.frombuffer(b"0000-00-00 00:00:00.000", dtype=np.uint8)
+
+# Character layout of "HH:MM:SS.mmm" time of sol
+TIME_TEMPLATE = np.frombuffer(b"00:00:00.000", dtype=np.uint8)
+TIME_DIGITS = [0, 1, 3, 4, 6, 7, 9, 10, 11]
+
+# Month and weekday names for pattern formatting
+MONTH_NAMES = np.array(MONTHS, dtype="S")
+WEEKDAY_NAMES = np.array(WEEKDAYS, dtype="S")
+WEEKDAY_SHORT_NAMES = np.array([x[:3] for x in WEEKDAYS], dtype="S")
+
+# Sol of year (1-670) for each sol of cycle
+CYCLE_SOL_OF_YEAR = np.concatenate([np.arange(1, x+1) for x in YEAR_CYCLE])
+
+# Columns computed by earth_ms_to_mars_columns
+MARS_COLUMNS = ["year", "month", "sol", "time", "weekday", "ls"]
+
+# Years with more digits are rendered one by one
+CANONICAL_MAX_YEAR = 9999
+
+STR_BUFFER_TOO_SMALL = "Output buffer too small: %d bytes needed, %d available"
+
+# Martian second length as a reduced fraction of 1000 Earth milliseconds,
+# small enough for exact int64 arithmetic on microsecond clock values
+MARS_CLOCK_GCD = gcd(MARS_SECOND_NUMERATOR, 1000*MARS_SECOND_DENOMINATOR)
+MARS_CLOCK_NUMERATOR = MARS_SECOND_NUMERATOR // MARS_CLOCK_GCD
+MARS_CLOCK_DENOMINATOR = 1000*MARS_SECOND_DENOMINATOR // MARS_CLOCK_GCD
+
+###############################################################################
+################################ IMPLEMENTATION ###############################
+###############################################################################
+
+def milliseconds_to_mars_fields(p_delta_ms):
+    delta_ms = np.asarray(p_delta_ms)
+    if not np.issubdtype(delta_ms.dtype, np.integer):
+        delta_ms = delta_ms.astype(np.float64)
+    total_sols, ms_of_sol = np.divmod(delta_ms, SOL_LENGTH)
+    total_sols = total_sols.astype(np.int64)
+    # negative timestamps less than 0.5 ms before next sol are rounded up
+    round_up = (delta_ms<0) & (np.round(SOL_LENGTH-ms_of_sol)==0)
+    total_sols = total_sols + round_up
+    ms_of_sol = np.where(round_up, 0, ms_of_sol)
+    total_cycles, sol_in_cycle = np.divmod(total_sols, SOLS_PER_CYCLE)
+    # years before epoch are negative, never year 'zero'
+    year = total_cycles*len(YEAR_CYCLE) + CYCLE_YEAR_INDEX[sol_in_cycle]
+    year = np.where(year>=0, year+1, year)
+    out = np.empty(delta_ms.shape, dtype=MARS_FIELDS_DTYPE)
+    out["year"] = year
+    out["month"] = CYCLE_MONTH[sol_in_cycle]
+    out["sol"] = CYCLE_SOL[sol_in_cycle]
+    out["ms_of_sol"] = ms_of_sol
+    out["weekday"] = (out["sol"]-1) % 7
+    return out
+
+
+def zone_shift_ms(p_zone):
+    # Milliseconds to add to Unix milliseconds for local milliseconds since
+    # epoch in given zone (None for MTC), one constant for the whole batch
+    if p_zone is None:
+        return -EPOCH_UNIX_MS
+    return get_mars_zone(p_zone).offset_ms - EPOCH_UNIX_MS
+
+
+def earth_ms_to_mars_fields(p_unix_ms, zone=None):
+    unix_ms = np.asarray(p_unix_ms)
+    return milliseconds_to_mars_fields(unix_ms + zone_shift_ms(zone))
+
+
+def earth_ms_to_mars_records(p_unix_ms, out=None, zone=None):
+    # Integer milliseconds since Unix epoch to packed records (see
+    # MARS_RECORD_DTYPE), written to out if given (any array of that dtype
+    # and same size, e.g. a memory-mapped window). With a zone, records are
+    # local date and time of that zone.
+    delta_ms = np.asarray(p_unix_ms, dtype=np.int64) + zone_shift_ms(zone)
+    total_sols, ms_of_sol = np.divmod(delta_ms, SOL_LENGTH)
+    total_cycles, sol_in_cycle = np.divmod(total_sols, SOLS_PER_CYCLE)
+    # years before epoch are negative, never year 'zero'
+    year = total_cycles*len(YEAR_CYCLE) + CYCLE_YEAR_INDEX[sol_in_cycle]
+    year += year>=0
+    if out is None:
+        out = np.empty(delta_ms.shape, dtype=MARS_RECORD_DTYPE)
+    out["year"] = year
+    out["month"] = CYCLE_MONTH[sol_in_cycle]
+    out["sol"] = CYCLE_SOL[sol_in_cycle]
+    out["ms_of_sol"] = ms_of_sol
+    out["weekday"] = CYCLE_WEEKDAY[sol_in_cycle]
+    return out
+
+
+def convert_unix_ms_file(p_input_path, p_output_path, window=MMAP_WINDOW):
+    # Converts a file of little-endian int64 milliseconds since Unix epoch to
+    # a file of packed MARS_RECORD_DTYPE records, both memory-mapped and
+    # processed in windows of given record count, so memory use does not
+    # depend on file size. Returns number of records.
+    size = os.path.getsize(p_input_path)
+    if size % 8!=0:
+        raise ValueError(STR_INVALID_INPUT_SIZE % size)
+    count = size // 8
+    if count==0:
+        # empty files can not be memory-mapped
+        open(p_output_path, "wb").close()
+        return 0
+    unix_ms = np.memmap(p_input_path, dtype="<i8", mode="r", shape=(count,))
+    out = np.memmap(p_output_path, dtype=MARS_RECORD_DTYPE, mode="w+", shape=(count,))
+    for start in range(0, count, window):
+        end = min(start+window, count)
+        earth_ms_to_mars_records(unix_ms[start:end], out[start:end])
+    out.flush()
+    del out, unix_ms
+    return count
+
+
+def mars_fields_to_milliseconds(p_year, p_month, p_sol, p_ms_of_sol=0, mars_sec_on=False):
+    year = np.asarray(p_year, dtype=np.int64)
+    month = np.asarray(p_month, dtype=np.int64)
+    sol = np.asarray(p_sol, dtype=np.int64)
+    ms_of_sol = np.asarray(p_ms_of_sol, dtype=np.float64)
+    if mars_sec_on:
+        ms_of_sol = (ms_of_sol/1000)*MARS_SECOND_LENGTH
+    # years before epoch are negative, there is no year 'zero'
+    year_number = np.where(year>0, year-1, year)
+    total_cycles, year_index = np.divmod(year_number, len(YEAR_CYCLE))
+    invalid = (year==0) | (month<1) | (month>12) | (sol<1) \
+        | (sol>CYCLE_MONTH_LENGTH[year_index, np.clip(month-1, 0, 11)])
+    if invalid.any():
+        # first invalid date raises the same error as the scalar parser
+        i = np.flatnonzero(invalid)[0]
+        fields = [np.broadcast_to(x, invalid.shape).ravel()[i] for x in (year, month, sol)]
+        date_fields_to_sol_start(*[int(x) for x in fields])
+    total_sols = total_cycles*SOLS_PER_CYCLE + CYCLE_YEAR_START[year_index] \
+        + CYCLE_MONTH_START[year_index, month-1] + sol - 1
+    return total_sols*SOL_LENGTH + np.round(ms_of_sol).astype(np.int64)
+
+
+def mars_fields_to_earth_ms(p_year, p_month, p_sol, p_ms_of_sol=0, mars_sec_on=False, zone=None):
+    delta_ms = mars_fields_to_milliseconds(
+        p_year, p_month, p_sol, p_ms_of_sol, mars_sec_on
+    )
+    return delta_ms - zone_shift_ms(zone)
+
+
+def earth_ms_to_solar_longitude_angle(p_unix_ms):
+    unix_ms = np.asarray(p_unix_ms, dtype=np.float64)
+    # calcuate julian date offset from January, 1st, 2000
+    jd_ut = 2440587.5 + unix_ms/DAY_LENGTH
+    jd_tt = jd_ut + 69.184/86400
+    dT_J2000 = jd_tt - 2451545.0
+
+    # calculate orbital elements data
+    M_rad = np.radians(19.3870 + 0.52402075*dT_J2000)
+    alpha_fms = 270.3863 + 0.52403840*dT_J2000
+
+    # calculate orbital perturbations parameter, one term at a time
+    PBS = np.zeros_like(dT_J2000)
+    for i in range(0, len(PBS_AMPLITUDE), 1):
+        angle = np.radians(0.98562*dT_J2000/PBS_PERIOD[i]+PBS_PHASE[i])
+        PBS += PBS_AMPLITUDE[i]*np.cos(angle)
+
+    # calculate angle
+    Ls = alpha_fms + (10.691 + 3.0e-7*dT_J2000)*np.sin(M_rad) \
+        + 0.623*np.sin(2*M_rad) + 0.050*np.sin(3*M_rad) \
+        + 0.005*np.sin(4*M_rad) + 0.0005*np.sin(5*M_rad) + PBS
+
+    return (Ls % 360)
+
+
+def earth_ms_to_solar_longitude_rate(p_unix_ms):
+    # time derivative of solar longitude angle, in degrees per day
+    unix_ms = np.asarray(p_unix_ms, dtype=np.float64)
+    jd_ut = 2440587.5 + unix_ms/DAY_LENGTH
+    jd_tt = jd_ut + 69.184/86400
+    dT_J2000 = jd_tt - 2451545.0
+
+    M_rad = np.radians(19.3870 + 0.52402075*dT_J2000)
+    dM_rad = np.radians(0.52402075)
+
+    PBS_rate = np.zeros_like(dT_J2000)
+    for i in range(0, len(PBS_AMPLITUDE), 1):
+        angle = np.radians(0.98562*dT_J2000/PBS_PERIOD[i]+PBS_PHASE[i])
+        PBS_rate -= PBS_AMPLITUDE[i]*np.sin(angle)*np.radians(0.98562/PBS_PERIOD[i])
+
+    Ls_rate = 0.52403840 + 3.0e-7*np.sin(M_rad) \
+        + (10.691 + 3.0e-7*dT_J2000)*np.cos(M_rad)*dM_rad \
+        + (2*0.623*np.cos(2*M_rad) + 3*0.050*np.cos(3*M_rad) \
+        + 4*0.005*np.cos(4*M_rad) + 5*0.0005*np.cos(5*M_rad))*dM_rad + PBS_rate
+
+    return Ls_rate
+
+
+def earth_ms_to_equation_of_time(p_unix_ms):
+    # same as utils.get_equation_of_time, in degrees
+    unix_ms = np.asarray(p_unix_ms, dtype=np.float64)
+    jd_ut = 2440587.5 + unix_ms/DAY_LENGTH
+    jd_tt = jd_ut + 69.184/86400
+    dT_J2000 = jd_tt - 2451545.0
+    alpha_fms = 270.3863 + 0.52403840*dT_J2000
+    Ls = earth_ms_to_solar_longitude_angle(unix_ms)
+
+    equation_of_center = (Ls - alpha_fms + 180) % 360 - 180
+    Ls_rad = np.radians(Ls)
+    return 2.861*np.sin(2*Ls_rad) - 0.071*np.sin(4*Ls_rad) \
+        + 0.002*np.sin(6*Ls_rad) - equation_of_center
+
+
+def longitude_to_offset_ms_array(p_longitude):
+    # same as utils.longitude_to_offset_ms, int64 array
+    longitude = (np.asarray(p_longitude, dtype=np.float64) + 180) % 360 - 180
+    return np.round(longitude*SOL_LENGTH/360).astype(np.int64)
+
+
+def earth_ms_to_local_mean_solar_time(p_unix_ms, p_longitude):
+    # LMST as int64 milliseconds since calendar epoch (decode with
+    # milliseconds_to_mars_fields), instants and east longitudes broadcast
+    # against each other: e.g. shape (n, 1) and (m,) give (n, m)
+    delta_ms = np.asarray(p_unix_ms, dtype=np.int64) - EPOCH_UNIX_MS
+    return delta_ms + longitude_to_offset_ms_array(p_longitude)
+
+
+def earth_ms_to_local_true_solar_time(p_unix_ms, p_longitude):
+    # LTST, same form as above; equation of time is computed once per
+    # instant, not per longitude
+    unix_ms = np.asarray(p_unix_ms, dtype=np.int64)
+    equation_of_time = earth_ms_to_equation_of_time(unix_ms)
+    offset_ms = np.round(equation_of_time*SOL_LENGTH/360).astype(np.int64)
+    return earth_ms_to_local_mean_solar_time(unix_ms, p_longitude) + offset_ms
+
+
+def find_solar_longitude_after_batch(p_start_ms, p_ls):
+    # Same as seasons.find_solar_longitude_after_ms, broadcast over start
+    # instants and Ls values, returns milliseconds since Unix epoch as float64
+    start_ms, target_ls = np.broadcast_arrays(
+        np.asarray(p_start_ms, dtype=np.float64), np.asarray(p_ls, dtype=np.float64)
+    )
+    start_ls = earth_ms_to_solar_longitude_angle(start_ms)
+    advance = (target_ls - start_ls) % 360
+    guess = start_ms + advance/MEAN_LS_RATE*DAY_LENGTH
+    # bracketed Newton iterations, Ls is strictly increasing in time
+    lower = np.maximum(start_ms, guess - SOLVER_BRACKET_DAYS*DAY_LENGTH)
+    upper = guess + SOLVER_BRACKET_DAYS*DAY_LENGTH
+    t_ms = guess
+    for i in range(0, SOLVER_MAX_ITERATIONS, 1):
+        Ls = earth_ms_to_solar_longitude_angle(t_ms)
+        diff = (Ls - target_ls + 180) % 360 - 180
+        lower = np.where(diff<0, t_ms, lower)
+        upper = np.where(diff<0, upper, t_ms)
+        step = diff/earth_ms_to_solar_longitude_rate(t_ms)*DAY_LENGTH
+        converged = np.abs(step)<SOLVER_TOLERANCE_MS
+        t_next = t_ms - step
+        # fall back to bisection if Newton step leaves the bracket
+        outside = ~converged & ((t_next<=lower) | (t_next>=upper))
+        t_ms = np.where(outside, (lower + upper)/2, t_next)
+        if np.all(converged):
+            break
+    return t_ms
+
+
+def find_year_first_season_batch(p_years):
+    # Same as seasons.find_year_first_season_ms for an array of years,
+    # returns (bucket, start in milliseconds since Unix epoch) arrays
+    boundaries = np.array(SEASON_BOUNDARIES, dtype=np.float64)
+    count = len(SEASON_BOUNDARIES)
+    year_start_ms = mars_fields_to_earth_ms(p_years, 1, 1).astype(np.float64)
+    start_ls = earth_ms_to_solar_longitude_angle(year_start_ms)
+    bucket = (start_ls // SEASON_WIDTH).astype(np.int64) % count
+    earliest_ms = year_start_ms - MAX_SEASON_DAYS*DAY_LENGTH
+    start_ms = find_solar_longitude_after_batch(earliest_ms, boundaries[bucket])
+    # year start may be a hair before the boundary due to rounding
+    early = start_ms>year_start_ms
+    if np.any(early):
+        bucket = np.where(early, (bucket - 1) % count, bucket)
+        start_ms = np.where(
+            early, find_solar_longitude_after_batch(earliest_ms, boundaries[bucket]), start_ms
+        )
+    next_bucket = (bucket + 1) % count
+    next_ms = find_solar_longitude_after_batch(year_start_ms, boundaries[next_bucket])
+    closer = next_ms - year_start_ms < year_start_ms - start_ms
+    return (np.where(closer, next_bucket, bucket), np.where(closer, next_ms, start_ms))
+
+
+def find_solar_longitude_batch(p_years, p_ls):
+    # Same as seasons.find_solar_longitude_ms, broadcast over years and Ls
+    # values, returns milliseconds since Unix epoch as float64
+    boundaries = np.array(SEASON_BOUNDARIES, dtype=np.float64)
+    # first season is found once per year, not per Ls value
+    first_bucket, first_ms = find_year_first_season_batch(np.asarray(p_years, dtype=np.int64))
+    first_bucket, first_ms, target_ls = np.broadcast_arrays(
+        first_bucket, first_ms, np.asarray(p_ls, dtype=np.float64) % 360
+    )
+    # start of the season containing target, then target within it
+    bucket = (target_ls // SEASON_WIDTH).astype(np.int64)
+    start_ms = np.where(
+        bucket==first_bucket, first_ms,
+        find_solar_longitude_after_batch(first_ms, boundaries[bucket])
+    )
+    return np.where(
+        target_ls==boundaries[bucket], start_ms,
+        find_solar_longitude_after_batch(start_ms, target_ls)
+    )
+
+
+def find_season_boundaries_batch(p_first_year, p_last_year):
+    # season start times (milliseconds since Unix epoch) for every year of
+    # the range, one row per year, one column per SEASON_BOUNDARIES entry;
+    # rows are in time order (vernal equinox first) as long as years start
+    # closest to it, i.e. within several thousand years of the epoch
+    years = np.arange(p_first_year, p_last_year+1, dtype=np.int64)
+    years = years[years!=0]
+    boundaries = np.array(SEASON_BOUNDARIES, dtype=np.float64)
+    unix_ms = find_solar_longitude_batch(years[:, None], boundaries[None, :])
+    return (years, unix_ms)
+
+
+def parse_mars_datetime_array(p_strings, mars_sec_on=False, zone=None):
+    # Bulk parse of Mars datetime strings (list or array of str or bytes) to
+    # int64 milliseconds since epoch, same values as parsing.parse_mars_datetime.
+    # Canonical "[-]YYYY-MM-DD HH:MM:SS.mmm" rows are decoded as a character
+    # matrix, any other rows (zone suffixes included) are passed to the
+    # scalar parser.
+    originals = np.asarray(p_strings)
+    shape = originals.shape
+    originals = originals.ravel()
+    strings = originals
+    if strings.dtype.kind=='U':
+        strings = strings.astype('S')
+    elif strings.dtype.kind!='S':
+        strings = strings.astype('U').astype('S')
+    count = len(strings)
+    width = strings.dtype.itemsize
+    chars = np.zeros((count, max(width, CANONICAL_LENGTH+2)), dtype=np.uint8)
+    if count>0 and width>0:
+        chars[:, :width] = np.ascontiguousarray(strings).view(np.uint8).reshape(count, width)
+    # skip over the sign of negative years, one character past the end must
+    # be the terminating zero byte
+    negative = chars[:, 0]==ord('-')
+    columns = np.arange(CANONICAL_LENGTH+1)[None, :] + negative[:, None]
+    chars = np.take_along_axis(chars, columns, axis=1)
+    canonical = chars[:, CANONICAL_LENGTH]==0
+    for position, separator in CANONICAL_SEPARATORS.items():
+        canonical &= chars[:, position]==ord(separator)
+    digits = chars[:, CANONICAL_DIGITS].astype(np.int64) - ord('0')
+    canonical &= np.all((digits>=0) & (digits<=9), axis=1)
+    # minutes and seconds tens
+    canonical &= (digits[:, 10]<=5) & (digits[:, 12]<=5)
+    digits = np.where(canonical[:, None], digits, 0)
+    year = digits[:, 0]*1000 + digits[:, 1]*100 + digits[:, 2]*10 + digits[:, 3]
+    year = np.where(negative, -year, year)
+    month = digits[:, 4]*10 + digits[:, 5]
+    sol = digits[:, 6]*10 + digits[:, 7]
+    ms_of_sol = (((digits[:, 8]*10 + digits[:, 9])*60 \
+        + digits[:, 10]*10 + digits[:, 11])*60 \
+        + digits[:, 12]*10 + digits[:, 13])*1000 \
+        + digits[:, 14]*100 + digits[:, 15]*10 + digits[:, 16]
+    if mars_sec_on:
+        # same rounding as utils.martian_time_to_ticks
+        ticks_us = (2*ms_of_sol*1000*MARS_CLOCK_NUMERATOR + MARS_CLOCK_DENOMINATOR) \
+            // (2*MARS_CLOCK_DENOMINATOR)
+        ms_of_sol, remainder = np.divmod(ticks_us, 1000)
+        ms_of_sol = ms_of_sol + (2*remainder>=1000)
+    # validate ranges of canonical rows, invalid ones are re-parsed one by
+    # one to raise the same error as the scalar parser
+    year_number = np.where(year>0, year-1, year)
+    year_index = year_number % len(YEAR_CYCLE)
+    month_index = np.clip(month-1, 0, 11)
+    valid = (year!=0) & (month>=1) & (month<=12) & (sol>=1) \
+        & (sol<=CYCLE_MONTH_LENGTH[year_index, month_index]) \
+        & (ms_of_sol<SOL_LENGTH)
+    out = np.empty(count, dtype=np.int64)
+    rows = canonical & valid
+    out[rows] = mars_fields_to_milliseconds(
+        year[rows], month[rows], sol[rows], ms_of_sol[rows]
+    )
+    if zone is not None:
+        zone = get_mars_zone(zone)
+        out[rows] -= zone.offset_ms
+    for i in np.flatnonzero(~rows):
+        text = originals[i]
+        if isinstance(text, bytes):
+            text = text.decode()
+        out[i] = parse_mars_datetime(str(text), mars_sec_on, zone)
+    return out.reshape(shape)
+
+
+def format_mars_datetime_array(p_delta_ms, mars_sec_on=False, zone=None):
+    # Bulk rendering of integer milliseconds since epoch to canonical
+    # "[-]YYYY-MM-DD HH:MM:SS.mmm" byte strings, same text as
+    # MarsDateTime.isoformat (zone name appended when given). Digits are
+    # written into a character matrix, years beyond 4 digits are formatted
+    # one by one.
+    delta_ms = np.asarray(p_delta_ms).astype(np.int64)
+    shape = delta_ms.shape
+    delta_ms = delta_ms.ravel()
+    if zone is not None:
+        zone = get_mars_zone(zone)
+        delta_ms = delta_ms + zone.offset_ms
+    fields = milliseconds_to_mars_fields(delta_ms)
+    year = fields["year"].astype(np.int64)
+    ticks = fields["ms_of_sol"].astype(np.int64)
+    if mars_sec_on:
+        # same rounding as utils.ticks_to_mars_clock
+        ticks = (2*ticks*MARS_CLOCK_DENOMINATOR + MARS_CLOCK_NUMERATOR) \
+            // (2*MARS_CLOCK_NUMERATOR)
+    total_seconds, ms = np.divmod(ticks, 1000)
+    total_minutes, ss = np.divmod(total_seconds, 60)
+    hh, mi = np.divmod(total_minutes, 60)
+    year_abs = np.abs(year)
+    values = [
+        year_abs // 1000, year_abs // 100, year_abs // 10, year_abs,
+        fields["month"] // 10, fields["month"],
+        fields["sol"] // 10, fields["sol"],
+        hh // 10, hh, mi // 10, mi, ss // 10, ss,
+        ms // 100, ms // 10, ms,
+    ]
+    count = len(delta_ms)
+    chars = np.empty((count, CANONICAL_LENGTH), dtype=np.uint8)
+    chars[:] = CANONICAL_TEMPLATE
+    for column, value in zip(CANONICAL_DIGITS, values):
+        chars[:, column] += (value % 10).astype(np.uint8)
+    # negative years are shifted right by one character for the sign
+    negative = year<0
+    out = np.zeros((count, CANONICAL_LENGTH+1), dtype=np.uint8)
+    out[~negative, :CANONICAL_LENGTH] = chars[~negative]
+    out[negative, 1:] = chars[negative]
+    out[negative, 0] = ord('-')
+    out = out.view("S%d" % (CANONICAL_LENGTH+1)).ravel()
+    wide = np.flatnonzero(year_abs>CANONICAL_MAX_YEAR)
+    if len(wide)>0:
+        iso_format = compile_mars_format("%Y-%m-%d %H:%M:%S.%f")
+        texts = [
+            iso_format.format_fields(
+                (int(year[i]), int(fields["month"][i]), int(fields["sol"][i]),
+                int(fields["ms_of_sol"][i])), mars_sec_on
+            ).encode() for i in wide
+        ]
+        out = out.astype("S%d" % max(CANONICAL_LENGTH+1, max(map(len, texts))))
+        out[wide] = texts
+    if zone is not None:
+        out = np.char.add(out, (" " + zone.name).encode("utf-8"))
+    return out.reshape(shape)
+
+
+def format_mars_datetime_lines(p_delta_ms, mars_sec_on=False, out=None, zone=None):
+    # Same as above as newline terminated records in one bytes object, or
+    # written to the start of a writable buffer (bytearray, memoryview, numpy
+    # array...) when given, in which case the number of bytes is returned
+    strings = format_mars_datetime_array(p_delta_ms, mars_sec_on, zone).ravel()
+    count = len(strings)
+    width = strings.dtype.itemsize
+    chars = np.zeros((count, width+1), dtype=np.uint8)
+    chars[:, :width] = strings.view(np.uint8).reshape(count, width)
+    # canonical rows have no zero bytes before their end
+    lengths = np.argmin(chars, axis=1)
+    chars[np.arange(count), lengths] = ord('\n')
+    lines = chars[chars!=0]
+    if out is None:
+        return lines.tobytes()
+    buffer = np.frombuffer(out, dtype=np.uint8)
+    if len(lines)>len(buffer):
+        raise ValueError(STR_BUFFER_TOO_SMALL % (len(lines), len(buffer)))
+    buffer[:len(lines)] = lines
+    return len(lines)
+
+
+def format_mars_time_array(p_ms_of_sol, mars_sec_on=False):
+    # Integer milliseconds of sol to "HH:MM:SS.mmm" byte strings (S12 array),
+    # same text as utils.format_raw_time with RESOLUTION_MS
+    ticks = np.asarray(p_ms_of_sol).astype(np.int64)
+    shape = ticks.shape
+    ticks = ticks.ravel()
+    if mars_sec_on:
+        ticks = (2*ticks*MARS_CLOCK_DENOMINATOR + MARS_CLOCK_NUMERATOR) \
+            // (2*MARS_CLOCK_NUMERATOR)
+    total_seconds, ms = np.divmod(ticks, 1000)
+    total_minutes, ss = np.divmod(total_seconds, 60)
+    hh, mi = np.divmod(total_minutes, 60)
+    values = [hh // 10, hh, mi // 10, mi, ss // 10, ss, ms // 100, ms // 10, ms]
+    chars = np.empty((len(ticks), len(TIME_TEMPLATE)), dtype=np.uint8)
+    chars[:] = TIME_TEMPLATE
+    for column, value in zip(TIME_DIGITS, values):
+        chars[:, column] += (value % 10).astype(np.uint8)
+    return chars.view("S%d" % len(TIME_TEMPLATE)).reshape(shape)
+
+
+def earth_ms_to_mars_columns(p_unix_ms, mars_sec_on=False):
+    # Integer milliseconds since Unix epoch to a dictionary of contiguous
+    # column arrays keyed by MARS_COLUMNS: year, month, sol, time (S12 byte
+    # strings), weekday (0 for Monday) and solar longitude Ls in degrees
+    unix_ms = np.asarray(p_unix_ms, dtype=np.int64)
+    records = earth_ms_to_mars_records(unix_ms)
+    return {
+        "year": np.ascontiguousarray(records["year"]),
+        "month": np.ascontiguousarray(records["month"]),
+        "sol": np.ascontiguousarray(records["sol"]),
+        "time": format_mars_time_array(records["ms_of_sol"], mars_sec_on),
+        "weekday": np.ascontiguousarray(records["weekday"]),
+        "ls": earth_ms_to_solar_longitude_angle(unix_ms),
+    }
+
+
+def format_digits_array(p_values, p_width):
+    # Non-negative integers to zero-padded byte strings of given width
+    values = np.asarray(p_values, dtype=np.int64)
+    chars = np.empty((len(values), p_width), dtype=np.uint8)
+    for i in range(p_width-1, -1, -1):
+        values, digit = np.divmod(values, 10)
+        chars[:, i] = digit + ord('0')
+    return chars.view("S%d" % p_width).reshape(len(chars))
+
+
+def format_year_array(p_year):
+    # Years as in format_raw_date: 4 digits, '-' before negative ones
+    year = np.asarray(p_year, dtype=np.int64)
+    year_abs = np.abs(year)
+    out = format_digits_array(np.minimum(year_abs, CANONICAL_MAX_YEAR), 4)
+    out = np.where(year<0, np.char.add(b"-", out), out)
+    wide = np.flatnonzero(year_abs>CANONICAL_MAX_YEAR)
+    if len(wide)>0:
+        texts = [("%05d" % x if x<0 else "%04d" % x).encode() for x in year[wide].tolist()]
+        out = out.astype("S%d" % max(5, max(map(len, texts))))
+        out[wide] = texts
+    return out
+
+
+def format_mars_datetime_pattern(p_delta_ms, p_format, mars_sec_on=False, zone=None):
+    # Bulk version of MarsDateTime.strftime for integer milliseconds since
+    # epoch: each directive of the compiled pattern is rendered as a byte
+    # string array and pieces are concatenated, returns UTF-8 byte strings
+    compiled = compile_mars_format(p_format)
+    delta_ms = np.asarray(p_delta_ms).astype(np.int64)
+    shape = delta_ms.shape
+    delta_ms = delta_ms.ravel()
+    zone_name = "MTC"
+    if zone is not None:
+        zone = get_mars_zone(zone)
+        zone_name = zone.name
+        delta_ms = delta_ms + zone.offset_ms
+    total_sols, ms_of_sol = np.divmod(delta_ms, SOL_LENGTH)
+    total_cycles, sol_in_cycle = np.divmod(total_sols, SOLS_PER_CYCLE)
+    ticks = ms_of_sol
+    if mars_sec_on:
+        ticks = (2*ticks*MARS_CLOCK_DENOMINATOR + MARS_CLOCK_NUMERATOR) \
+            // (2*MARS_CLOCK_NUMERATOR)
+    total_seconds, ms = np.divmod(ticks, 1000)
+    total_minutes, ss = np.divmod(total_seconds, 60)
+    hh, mi = np.divmod(total_minutes, 60)
+    sol = CYCLE_SOL[sol_in_cycle]
+    weekday = (sol-1) % 7
+    renderers = {
+        "Y": lambda: format_year_array(
+            total_cycles*len(YEAR_CYCLE) + CYCLE_YEAR_INDEX[sol_in_cycle]
+            + (total_sols>=0)
+        ),
+        "m": lambda: format_digits_array(CYCLE_MONTH[sol_in_cycle], 2),
+        "d": lambda: format_digits_array(sol, 2),
+        "H": lambda: format_digits_array(hh, 2),
+        "M": lambda: format_digits_array(mi, 2),
+        "S": lambda: format_digits_array(ss, 2),
+        "f": lambda: format_digits_array(ms, 3),
+        "j": lambda: format_digits_array(CYCLE_SOL_OF_YEAR[sol_in_cycle], 3),
+        "b": lambda: MONTH_NAMES[CYCLE_MONTH[sol_in_cycle]-1],
+        "A": lambda: WEEKDAY_NAMES[weekday],
+        "a": lambda: WEEKDAY_SHORT_NAMES[weekday],
+        "Z": lambda: zone_name.encode("utf-8"),
+    }
+    out = np.zeros(len(delta_ms), dtype="S1")
+    for literal, code in compiled.parts:
+        if literal:
+            out = np.char.add(out, literal.encode("utf-8"))
+        if code is not None:
+            out = np.char.add(out, renderers[code]())
+    return out.reshape(shape)
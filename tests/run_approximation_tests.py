@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import os
+import sys
+import random
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import get_solar_longitude_angle, get_year_info
+from exodus_calendar.utils import SOL_LENGTH, MS_PER_CYCLE, EPOCH_UNIX_MS
+from exodus_calendar.vectorized import earth_ms_to_solar_longitude_angle
+from exodus_calendar.approximation import (
+    earth_ms_to_solar_longitude_angle_approx,
+    coefficient_cache_info,
+    get_cycle_coefficients,
+)
+from exodus_calendar.approximation import APPROXIMATION_MAX_ERROR
+
+SAMPLE_SIZE = 20000
+
+
+def angle_error(p_a, p_b):
+    # angles close to 0/360 may wrap differently
+    delta = np.abs(np.asarray(p_a) - np.asarray(p_b))
+    return np.minimum(delta, 360-delta)
+
+
+def run_random_instants():
+    random.seed(1955)
+    unix_ms = [
+        random.randint(-40*MS_PER_CYCLE, 40*MS_PER_CYCLE) + EPOCH_UNIX_MS
+        for i in range(0, SAMPLE_SIZE, 1)
+    ]
+    unix_ms.append(1757996838621)
+    exact = earth_ms_to_solar_longitude_angle(np.array(unix_ms, dtype=np.int64))
+    approx = earth_ms_to_solar_longitude_angle_approx(np.array(unix_ms, dtype=np.int64))
+    assert(angle_error(exact, approx).max()<APPROXIMATION_MAX_ERROR)
+    for i in range(0, len(unix_ms), 97):
+        Ls = earth_ms_to_solar_longitude_angle_approx(unix_ms[i])
+        assert(Ls.shape==())
+        assert(angle_error(Ls, get_solar_longitude_angle(unix_ms[i]))<APPROXIMATION_MAX_ERROR)
+        assert(angle_error(Ls, approx[i])<1e-9)
+
+
+def run_segment_edges():
+    # instants around month and year starts, where pieces are joined
+    unix_ms = []
+    for year in [-1000, -23, -2, -1, 1, 2, 22, 23, 38, 1000]:
+        start_sol, start_ms, year_length, month_starts = get_year_info(year)
+        for sol in month_starts:
+            for offset in [-1, -0.5, 0, 0.5, 1]:
+                unix_ms.append(EPOCH_UNIX_MS + (start_sol + sol)*SOL_LENGTH + offset)
+    exact = earth_ms_to_solar_longitude_angle(unix_ms)
+    approx = earth_ms_to_solar_longitude_angle_approx(unix_ms)
+    assert(angle_error(exact, approx).max()<APPROXIMATION_MAX_ERROR)
+
+
+def run_dense_year():
+    # hourly over whole year including Ls 360 -> 0 transition
+    start_ms = EPOCH_UNIX_MS + get_year_info(36)[1]
+    unix_ms = np.arange(start_ms, start_ms + 669*SOL_LENGTH, 3600000, dtype=np.int64)
+    unix_ms = unix_ms[:len(unix_ms)//4*4]
+    exact = earth_ms_to_solar_longitude_angle(unix_ms)
+    approx = earth_ms_to_solar_longitude_angle_approx(unix_ms.reshape(-1, 4))
+    assert(approx.shape==(len(unix_ms)//4, 4))
+    assert(angle_error(exact, approx.ravel()).max()<APPROXIMATION_MAX_ERROR)
+    assert(np.all((approx>=0) & (approx<360)))
+    assert(earth_ms_to_solar_longitude_angle_approx([]).shape==(0,))
+
+
+def run_coefficient_cache():
+    # far apart instants, cycles are fitted once whatever order they come in
+    get_cycle_coefficients.cache_clear()
+    unix_ms = np.array([1757996838621, 1757996838621 + 1000, -10**15, 10**15])
+    info = coefficient_cache_info()
+    first = earth_ms_to_solar_longitude_angle_approx(unix_ms)
+    second = earth_ms_to_solar_longitude_angle_approx(unix_ms[::-1])
+    assert(coefficient_cache_info().misses==info.misses+3)
+    assert(coefficient_cache_info().hits==info.hits+3)
+    assert(np.array_equal(first, second[::-1]))
+    exact = earth_ms_to_solar_longitude_angle(unix_ms)
+    assert(angle_error(exact, first).max()<APPROXIMATION_MAX_ERROR)
+    # streamed chunks overlapping only partly: every chunk after the first
+    # fits just the one cycle it adds
+    start_ms = 100*MS_PER_CYCLE + EPOCH_UNIX_MS
+    step_ms = 10*SOL_LENGTH + 12345
+    chunk = np.arange(0, 2*MS_PER_CYCLE, step_ms, dtype=np.int64)
+    info = coefficient_cache_info()
+    for i in range(0, 5, 1):
+        unix_ms = start_ms + i*MS_PER_CYCLE + chunk
+        approx = earth_ms_to_solar_longitude_angle_approx(unix_ms)
+        exact = earth_ms_to_solar_longitude_angle(unix_ms)
+        assert(angle_error(exact, approx).max()<APPROXIMATION_MAX_ERROR)
+    assert(coefficient_cache_info().misses==info.misses+6)
+    assert(coefficient_cache_info().hits==info.hits+4)
+
+
+def approximation_tests():
+    print("Running solar longitude approximation tests")
+    run_random_instants()
+    run_segment_edges()
+    run_dense_year()
+    run_coefficient_cache()
+    print("Finished solar longitude approximation tests")
+
+approximation_tests()
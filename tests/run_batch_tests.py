@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import io
+import os
+import sys
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.batch import split_file_chunks, stream_convert, parallel_convert_file, convert_earth_line
+from exodus_calendar.batch import BATCH_MODES, OUTPUT_FORMATS
+
+LINE_COUNT = 3000
+
+
+def write_input_file(p_mode):
+    random.seed(1955)
+    lines = []
+    for i in range(0, LINE_COUNT, 1):
+        if p_mode.startswith("utc"):
+            lines.append("%04d-%02d-%02d %02d:%02d:%02d+00:00" % (
+                random.randint(1900, 2100), random.randint(1, 12), random.randint(1, 28),
+                random.randint(0, 23), random.randint(0, 59), random.randint(0, 59)
+            ))
+        else:
+            lines.append("%04d-%02d-%02d 12:00:00.000" % (
+                random.randint(1, 99), random.randint(1, 12), random.randint(1, 50)
+            ))
+    # errors, blank lines and a field that needs csv quoting
+    lines[10] = "not, a \"date\""
+    lines[700] = ""
+    lines[2999] = "0001-01-01 99:00:00"
+    handle, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(handle, "w") as output:
+        output.write("\n".join(lines))
+    return path
+
+
+def capture_stderr():
+    sys.stderr = io.StringIO()
+    return sys.stderr
+
+
+def run_chunk_split():
+    path = write_input_file("mtc_to_utc")
+    with open(path, "rb") as input_file:
+        data = input_file.read()
+    for chunk_bytes in (1, 100, 1000, len(data), 10*len(data)):
+        chunks = list(split_file_chunks(path, chunk_bytes))
+        assert(chunks[0][0]==0 and chunks[-1][1]==len(data))
+        for i in range(0, len(chunks), 1):
+            start, end = chunks[i]
+            assert(end-start>=min(chunk_bytes, len(data)-start))
+            if i+1<len(chunks):
+                assert(chunks[i+1][0]==end and data[end-1:end]==b"\n")
+    os.remove(path)
+
+
+def run_parallel_against_stream():
+    for mode in BATCH_MODES:
+        path = write_input_file(mode)
+        for output_format in OUTPUT_FORMATS:
+            expected = io.StringIO()
+            expected_stderr = capture_stderr()
+            with open(path, encoding="utf-8") as input_file:
+                expected_errors = stream_convert(input_file, mode, expected, output_format)
+            for workers, chunk_bytes in ((1, 1 << 20), (2, 1000), (3, 1)):
+                output = io.StringIO()
+                report = io.StringIO()
+                stderr = capture_stderr()
+                lines, total_bytes, errors = parallel_convert_file(
+                    path, mode, output, output_format, workers, chunk_bytes, report
+                )
+                assert(output.getvalue()==expected.getvalue())
+                # error line numbers are counted across chunks
+                assert(stderr.getvalue()==expected_stderr.getvalue())
+                assert(stderr.getvalue().startswith("line 11: "))
+                assert((lines, total_bytes, errors)==(LINE_COUNT, os.path.getsize(path), 2))
+                assert(errors==expected_errors)
+                assert(report.getvalue().startswith("Converted %d lines" % LINE_COUNT))
+        os.remove(path)
+    sys.stderr = sys.__stderr__
+
+
+def run_millisecond_rounding():
+    # times rounding up to the next second carry over instead of ".1000"
+    assert(convert_earth_line("2025-08-02T20:22:44.430+00:00", True)=="0038-05-33 22:16:16.000")
+    assert(convert_earth_line("2026-10-31T16:09:50.613", True)=="0039-01-32 13:59:48.000")
+
+
+def batch_tests():
+    print("Running batch conversion tests")
+    run_millisecond_rounding()
+    run_chunk_split()
+    run_parallel_against_stream()
+    print("Finished batch conversion tests")
+
+batch_tests()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import subprocess
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import earth_datetime_to_mars_datetime
+from exodus_calendar.parsing import parse_mars_datetime
+from exodus_calendar.utils import EPOCH_DATETIME, RESOLUTION_MS
+from datetime import datetime, timedelta
+
+CLI_PATH = os.path.join(os.path.dirname(__file__), '..', 'tools', 'exodus.py')
+
+EARTH_INPUT = ["2025-01-01 00:00:01+00:00", "", "not a date", "2000-01-06T00:00:00"]
+MARS_INPUT = ["0030-03-51 12:26:45.556", "0030-13-51 12:26:45.556", "-0001-12-54 00:00:00.000"]
+
+
+def run_cli(p_args, p_lines):
+    return subprocess.run(
+        [sys.executable, CLI_PATH] + p_args,
+        input="\n".join(p_lines) + "\n", capture_output=True, text=True
+    )
+
+
+def run_plain_batch():
+    for mode, mars_sec_on in (("utc_to_mtc", True), ("utc_to_raw", False)):
+        out = run_cli(["-b", mode], EARTH_INPUT)
+        assert(out.returncode==1)
+        expected = []
+        for text in (EARTH_INPUT[0], "2000-01-06T00:00:00+00:00"):
+            mars_date = earth_datetime_to_mars_datetime(datetime.fromisoformat(text), mars_sec_on, RESOLUTION_MS)
+            expected.append("%s %s" % (mars_date[0], mars_date[1]))
+        assert(out.stdout.splitlines()==expected)
+        assert(out.stderr.startswith("line 3: not a date: ValueError"))
+
+
+def run_structured_batch():
+    out = run_cli(["-b", "mtc_to_utc", "-f", "json", "--chunk-size", "1"], MARS_INPUT)
+    records = [json.loads(x) for x in out.stdout.splitlines()]
+    assert([x["line"] for x in records]==[1, 2, 3])
+    assert("error" in records[1] and "output" not in records[1])
+    earth_dt = EPOCH_DATETIME + timedelta(milliseconds=parse_mars_datetime(MARS_INPUT[2], True))
+    assert(records[2]["output"]==earth_dt.isoformat(" ", "milliseconds")[:23])
+    out = run_cli(["-b", "raw_to_utc", "-f", "csv"], MARS_INPUT)
+    rows = out.stdout.splitlines()
+    assert(rows[0]=="line,input,output,error")
+    assert(len(rows)==4 and rows[2].startswith("2,0030-13-51") and "Invalid month" in rows[2])
+    assert(rows[1].endswith(","))
+
+
+def run_single_value():
+    out = run_cli(["-m", "0030-03-51 12:26:45.556"], [])
+    assert(out.stdout.startswith("Earth DateTime: 2010-04-11"))
+    out = run_cli(["-u", "garbage"], [])
+    assert(out.returncode==0 and out.stdout.startswith("Input date is not in the correct format!"))
+    # single values give the same answers as batch mode
+    for option, mode, text in (
+        ("-u", "utc_to_mtc", "2025-08-02T20:22:44.430+00:00"),
+        ("-u", "utc_to_mtc", "2025-08-02T20:22:44.430"),
+        ("-r", "utc_to_raw", "2025-01-01 00:00:01"),
+        ("-m", "mtc_to_utc", "0030-03-51 12:26:45.556"),
+        ("-x", "raw_to_utc", "0030-03-51 12:26:45.556"),
+    ):
+        single = run_cli([option, text], []).stdout.strip()
+        batch = run_cli(["-b", mode], [text]).stdout.strip()
+        assert(single==batch or single.startswith("Earth DateTime: %s, " % batch))
+    assert(run_cli(["-u", "2025-08-02T20:22:44.430"], []).stdout=="0038-05-33 22:16:16.000\n")
+    # dates rejected by batch mode are rejected here too
+    for option, text in (("-m", "0030-03-60 12:26:45.556"), ("-x", "0030-13-51 12:26:45.556")):
+        out = run_cli([option, text], [])
+        assert(out.stdout.startswith("Input date is not in the correct format!"))
+    # usage errors stay out of converted output
+    out = run_cli(["-b", "utc_to_mtc", "-w", "2"], [])
+    assert(out.returncode==2 and out.stdout=="" and "--input" in out.stderr)
+
+
+def run_binary_records():
+    import numpy as np
+    from exodus_calendar.vectorized import earth_ms_to_mars_records, MARS_RECORD_DTYPE
+    unix_ms = np.arange(-10**13, 10**13, 10**10, dtype="<i8")
+    directory = tempfile.mkdtemp()
+    input_path = os.path.join(directory, "input.bin")
+    output_path = os.path.join(directory, "output.bin")
+    unix_ms.tofile(input_path)
+    out = run_cli(["-i", input_path, "--to-records", output_path], [])
+    assert(out.returncode==0 and out.stdout.startswith("Converted %d records" % len(unix_ms)))
+    records = np.fromfile(output_path, dtype=MARS_RECORD_DTYPE)
+    assert(np.array_equal(records, earth_ms_to_mars_records(unix_ms)))
+    os.remove(input_path)
+    os.remove(output_path)
+    os.rmdir(directory)
+
+
+def cli_tests():
+    print("Running command line tool tests")
+    run_plain_batch()
+    run_structured_batch()
+    run_single_value()
+    run_binary_records()
+    print("Finished command line tool tests")
+
+cli_tests()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import earth_datetime_to_mars_datetime, get_solar_longitude_angle
+from exodus_calendar.utils import WEEKDAYS, RESOLUTION_MS
+from exodus_calendar.columnar import add_mars_columns, add_mars_columns_to_batches
+from exodus_calendar.columnar import convert_parquet_file, mars_column_arrays, MARS_COLUMN_TYPES
+
+SAMPLE_SIZE = 5000
+
+# instants before and after epoch, sub-millisecond values round down
+TEST_DATA_INSTANTS = [
+    datetime(1955, 4, 11, 19, 21, 51, tzinfo=timezone.utc),
+    datetime(1955, 4, 11, 19, 21, 50, 999600, tzinfo=timezone.utc),
+    datetime(1969, 12, 31, 23, 59, 59, 999500, tzinfo=timezone.utc),
+    datetime(2025, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+    datetime(1800, 6, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+]
+
+
+def random_instants(p_count):
+    rng = np.random.default_rng(1955)
+    return rng.integers(-5*10**12, 5*10**12, p_count)
+
+
+def check_row(p_unix_ms, p_row, mars_sec_on):
+    earth_dt = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(milliseconds=int(p_unix_ms))
+    date, time, weekday, Ls = earth_datetime_to_mars_datetime(earth_dt, mars_sec_on, RESOLUTION_MS)
+    year, month, sol = p_row["mars_year"], p_row["mars_month"], p_row["mars_sol"]
+    prefix = "%05d" % year if year<0 else "%04d" % year
+    assert(date=="%s-%02d-%02d" % (prefix, month, sol))
+    assert(time==p_row["mars_time"])
+    assert(weekday==WEEKDAYS[p_row["mars_weekday"]])
+    assert(abs(p_row["mars_ls"]-get_solar_longitude_angle(int(p_unix_ms)))<1e-9)
+
+
+def run_timestamp_units():
+    for unit, scale in (("s", 1), ("ms", 1000), ("us", 1000000), ("ns", 1000000000)):
+        for tz in (None, "UTC", "America/Toronto"):
+            values = [x.replace(tzinfo=None) for x in TEST_DATA_INSTANTS]
+            column = pa.array(values, type=pa.timestamp("us")).cast(pa.timestamp(unit, tz), safe=False)
+            table = add_mars_columns(pa.table({"t": column}), "t")
+            for i in range(0, len(values), 1):
+                unix_ms = column[i].cast(pa.int64()).as_py()*1000 // scale
+                check_row(unix_ms, table.slice(i, 1).to_pylist()[0], False)
+
+
+def run_batches_against_scalar():
+    unix_ms = random_instants(SAMPLE_SIZE)
+    table = pa.table({
+        "id": np.arange(SAMPLE_SIZE),
+        "t": pa.array(unix_ms, type=pa.timestamp("ms", "UTC")),
+    })
+    for mars_sec_on in (False, True):
+        batches = list(add_mars_columns_to_batches(table.to_batches(max_chunksize=999), "t", mars_sec_on))
+        assert(len(batches)==6)
+        out = pa.Table.from_batches(batches)
+        assert(out.column_names==["id", "t", "mars_year", "mars_month", "mars_sol", "mars_time", "mars_weekday", "mars_ls"])
+        assert(out.equals(add_mars_columns(table, "t", mars_sec_on)))
+        rows = out.to_pylist()
+        for i in range(0, SAMPLE_SIZE, 7):
+            check_row(unix_ms[i], rows[i], mars_sec_on)
+
+
+def run_chunked_column():
+    # chunks are converted one by one, output keeps the input chunk layout
+    unix_ms = random_instants(SAMPLE_SIZE)
+    lengths = [1000, 0, 2500, 1, SAMPLE_SIZE - 3501]
+    starts = np.cumsum([0] + lengths)
+    column = pa.chunked_array([
+        pa.array(unix_ms[starts[i]:starts[i+1]], type=pa.timestamp("ms"))
+        for i in range(0, len(lengths), 1)
+    ])
+    arrays = mars_column_arrays(column, True)
+    expected = mars_column_arrays(column.combine_chunks(), True)
+    for name, data_type in MARS_COLUMN_TYPES.items():
+        out = arrays[name]
+        assert(isinstance(out, pa.ChunkedArray) and out.type==data_type)
+        assert([len(x) for x in out.chunks]==lengths)
+        assert(out.equals(pa.chunked_array([expected[name]])))
+    empty = mars_column_arrays(pa.chunked_array([], type=pa.timestamp("ms")))
+    assert(all(x.num_chunks==0 and len(x)==0 for x in empty.values()))
+
+
+def run_nulls_and_errors():
+    column = pa.array([0, None, 86400000], type=pa.timestamp("ms"))
+    table = add_mars_columns(pa.table({"t": column}), "t", prefix="m_")
+    for name, data_type in MARS_COLUMN_TYPES.items():
+        out = table.column("m_" + name)
+        assert(out.type==data_type)
+        assert(out.null_count==1 and not out[1].is_valid and out[0].is_valid)
+    try:
+        add_mars_columns(pa.table({"t": [1, 2]}), "t")
+        assert(False)
+    except TypeError:
+        pass
+
+
+def run_parquet_file():
+    unix_ms = random_instants(SAMPLE_SIZE)
+    directory = tempfile.mkdtemp()
+    input_path = os.path.join(directory, "input.parquet")
+    output_path = os.path.join(directory, "output.parquet")
+    table = pa.table({"t": pa.array(unix_ms, type=pa.timestamp("us")), "x": unix_ms % 7})
+    pq.write_table(table, input_path, row_group_size=1000)
+    assert(convert_parquet_file(input_path, output_path, "t", batch_size=700)==SAMPLE_SIZE)
+    assert(pq.read_table(output_path).equals(add_mars_columns(table, "t")))
+    pq.write_table(table.slice(0, 0), input_path)
+    assert(convert_parquet_file(input_path, output_path, "t")==0)
+    assert(pq.read_table(output_path).schema.names[-1]=="mars_ls")
+    for path in (input_path, output_path):
+        os.remove(path)
+    os.rmdir(directory)
+
+
+def columnar_tests():
+    print("Running Arrow column tests")
+    run_timestamp_units()
+    run_batches_against_scalar()
+    run_chunked_column()
+    run_nulls_and_errors()
+    run_parquet_file()
+    print("Finished Arrow column tests")
+
+columnar_tests()
@@ -9,6 +9,7 @@ from zoneinfo import ZoneInfo
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from exodus_calendar.utils import compute_mars_timedelta, mars_datetime_to_earth_datetime, add_timedelta_to_mars_date, earth_datetime_to_mars_datetime
+from exodus_calendar.utils import mars_datetime_to_earth_datetime_as_ms, timedelta_to_ticks, RESOLUTION_MS, RESOLUTION_US
 from exodus_calendar.utils import DAY_LENGTH, SOL_LENGTH, EPOCH, JULIAN_YEAR_LENGTH, DAY_LENGTH, MS_PER_MARS_YEAR, MARS_MONTH_LENGTH, MS_PER_CYCLE, MARS_SECOND_LENGTH
 
 EARTH_TIMEZONE = ZoneInfo("UTC")
@@ -182,6 +183,29 @@ def run_delta_test(P_DATA, TEST_LETTER, TEST_INDEX, mars_second_on=False):
     assert(check_date_1[:len(P_DATA[1])]==P_DATA[1])
     assert(check_date_2[:len(P_DATA[0])]==P_DATA[0])
 
+def run_integer_delta_test(P_DATA, resolution, mars_second_on=False):
+    # integer mode has no rounding drift: deltas and round trips are exact
+    time_a = mars_datetime_to_earth_datetime_as_ms(P_DATA[0], mars_second_on, resolution)
+    time_b = mars_datetime_to_earth_datetime_as_ms(P_DATA[1], mars_second_on, resolution)
+    earth_date_1 = mars_datetime_to_earth_datetime(P_DATA[0], mars_second_on, resolution)
+    earth_date_2 = mars_datetime_to_earth_datetime(P_DATA[1], mars_second_on, resolution)
+    delta_ticks_E = timedelta_to_ticks(earth_date_2 - earth_date_1, resolution)
+    assert(time_b-time_a==delta_ticks_E)
+    assert(abs(P_DATA[2]*resolution-delta_ticks_E)<resolution)
+    mars_date_1 = earth_datetime_to_mars_datetime(earth_date_1, mars_second_on, resolution)
+    mars_date_2 = earth_datetime_to_mars_datetime(earth_date_2, mars_second_on, resolution)
+    # microsecond resolution adds three more digits
+    padding = "000" if resolution==RESOLUTION_US else ""
+    assert(P_DATA[0]+padding== f"{mars_date_1[0]} {mars_date_1[1]}")
+    assert(P_DATA[1]+padding== f"{mars_date_2[0]} {mars_date_2[1]}")
+
+def run_all_tests_integer():
+    for resolution in (RESOLUTION_MS, RESOLUTION_US):
+        for P_DATA in TEST_DATA_A_MTC_OFF + TEST_DATA_B_MTC_OFF + TEST_DATA_D_MTC_OFF:
+            run_integer_delta_test(P_DATA, resolution)
+        for P_DATA in TEST_DATA_C_MTC_ON + TEST_DATA_E_MTC_ON + TEST_DATA_F_MTC_ON:
+            run_integer_delta_test(P_DATA, resolution, True)
+
 def run_all_tests_mtc_off():
     for i in range(0, len(TEST_DATA_A_MTC_OFF),1):
         run_delta_test(TEST_DATA_A_MTC_OFF[i], "A", i)
@@ -204,6 +228,7 @@ def delta_tests():
     print("Running time delta tests")
     run_all_tests_mtc_off()
     run_all_tests_mtc_on()
+    run_all_tests_integer()
     print("Finished time delta tests")
 
 delta_tests()
\ No newline at end of file
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import os
+import sys
+import random
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import MarsDateTime, MarsFormat, compile_mars_format
+from exodus_calendar.utils import date_fields_to_milliseconds, MS_PER_CYCLE, SOL_LENGTH
+from exodus_calendar.vectorized import format_mars_datetime_array, format_mars_datetime_lines
+from exodus_calendar.parsing import parse_mars_datetime
+
+SAMPLE_SIZE = 20000
+
+# (fields, format, mars_sec_on, expected)
+TEST_DATA_PATTERNS = [
+    ((35, 7, 21, 49512345), "%Y-%m-%d %H:%M:%S.%f", False, "0035-07-21 13:45:12.345"),
+    ((35, 7, 21, 49512345), "%d %b %Y, %A (%a)", False, "21 JUL 0035, Sunday (Sun)"),
+    ((35, 7, 21, 49512345), "sol %j, 100%%", False, "sol 357, 100%"),
+    ((-1, 12, 54, 0), "%Y/%m/%d %H%M", False, "-0001/12/54 0000"),
+    ((-1, 12, 54, 0), "%j", False, "670"),
+    ((1, 1, 1, SOL_LENGTH-1), "%H:%M:%S.%f", True, "23:59:59.999"),
+    ((1, 1, 1, SOL_LENGTH-1), "%H:%M:%S.%f", False, "24:39:35.243"),
+    ((12345, 1, 2, 0), "%Y", False, "12345"),
+    ((1, 1, 1, 0), "no directives", False, "no directives"),
+    ((1, 1, 1, 0), "100%", False, "100%"),
+]
+
+TEST_DATA_INVALID = ["%Q", "%Y-%m-%x", "%%%y"]
+
+
+def run_patterns():
+    for fields, pattern, mars_sec_on, expected in TEST_DATA_PATTERNS:
+        value = MarsDateTime.from_fields(*fields)
+        assert(value.strftime(pattern, mars_sec_on)==expected)
+        compiled = compile_mars_format(pattern)
+        assert(compiled.format(value.milliseconds, mars_sec_on)==expected)
+        assert(compiled.format_many([value, value], mars_sec_on)==[expected]*2)
+    assert(compile_mars_format("%Y") is compile_mars_format("%Y"))
+    for pattern in TEST_DATA_INVALID:
+        try:
+            MarsFormat(pattern)
+            assert(False)
+        except ValueError:
+            pass
+
+
+def run_array_against_isoformat():
+    random.seed(1955)
+    values = [random.randint(-200*MS_PER_CYCLE, 200*MS_PER_CYCLE) for i in range(0, SAMPLE_SIZE, 1)]
+    # sol and year edges, years beyond 4 digits
+    for year in (-10000, -9999, -1, 1, 9999, 10000):
+        start = date_fields_to_milliseconds(year, 1, 1)
+        values.extend([start-1, start, start+1])
+    for mars_sec_on in (False, True):
+        expected = [MarsDateTime(x).isoformat(mars_sec_on) for x in values]
+        out = format_mars_datetime_array(values, mars_sec_on)
+        assert(out.dtype.kind=='S')
+        assert([x.decode() for x in out]==expected)
+        lines = format_mars_datetime_lines(values, mars_sec_on)
+        assert(lines.decode()=="".join(x + "\n" for x in expected))
+        # Martian clock milliseconds are longer, round trip is exact otherwise
+        if not mars_sec_on:
+            assert([parse_mars_datetime(x) for x in expected[:1000]]==values[:1000])
+
+
+def run_lines_buffer():
+    values = np.array([[0, -1], [SOL_LENGTH, 10**9]], dtype=np.int64)
+    assert(format_mars_datetime_array(values).shape==(2, 2))
+    expected = format_mars_datetime_lines(values)
+    assert(len(expected)==4*24+1)
+    buffer = bytearray(200)
+    count = format_mars_datetime_lines(values, out=buffer)
+    assert(bytes(buffer[:count])==expected)
+    view = memoryview(bytearray(count))
+    assert(format_mars_datetime_lines(values, out=view)==count)
+    try:
+        format_mars_datetime_lines(values, out=bytearray(count-1))
+        assert(False)
+    except ValueError:
+        pass
+    assert(format_mars_datetime_lines([])==b"")
+    assert(format_mars_datetime_array([]).shape==(0,))
+
+
+def formatting_tests():
+    print("Running formatting tests")
+    run_patterns()
+    run_array_against_isoformat()
+    run_lines_buffer()
+    print("Finished formatting tests")
+
+formatting_tests()
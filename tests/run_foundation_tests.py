@@ -11,7 +11,14 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 from exodus_calendar.utils import (
     earth_datetime_to_mars_datetime, 
     mars_datetime_to_earth_datetime, 
-    mars_datetime_to_earth_datetime_as_ms
+    mars_datetime_to_earth_datetime_as_ms,
+    unix_ms_to_mars,
+    mars_to_unix_ms,
+    get_year_info,
+    get_year_length,
+    year_cache_info,
+    format_raw_date,
+    format_raw_time,
 )
 
 from exodus_calendar.utils import (
@@ -20,7 +27,9 @@ from exodus_calendar.utils import (
     MS_PER_CYCLE, 
     DAY_LENGTH, 
     MS_PER_MARS_YEAR, 
-    MARS_MONTH_LENGTH
+    MARS_MONTH_LENGTH,
+    EPOCH_DATETIME,
+    EPOCH_UNIX_MS,
 )
 
 EARTH_TIMEZONE = ZoneInfo("UTC")
@@ -166,12 +175,52 @@ def utc_to_mars_time_test_now():
     # should never fail - write to file if does!
     assert(abs(time_diff_b.total_seconds()*1000)<1.0)
 
+def run_integer_fast_path():
+    assert(EPOCH_DATETIME==datetime.fromisoformat(EPOCH))
+    assert(EPOCH_UNIX_MS==EPOCH_DATETIME.timestamp()*1000)
+    for test_data in (TEST_DATA_A_MTC_OFF, TEST_DATA_С):
+        for i in range(0, len(test_data), 1):
+            if test_data[i][1]!=int(test_data[i][1]):
+                continue
+            unix_ms = EPOCH_UNIX_MS + int(test_data[i][1])
+            yyyy, mm, dd, ms_of_sol = unix_ms_to_mars(unix_ms)
+            assert(format_raw_date(yyyy, mm, dd)==test_data[i][0][0])
+            assert(format_raw_time(ms_of_sol)==test_data[i][0][1])
+            assert(mars_to_unix_ms(yyyy, mm, dd, ms_of_sol)==unix_ms)
+    for i in range(0, len(TEST_DATA_B_MTC_OFF), 1):
+        if TEST_DATA_B_MTC_OFF[i][1]!=int(TEST_DATA_B_MTC_OFF[i][1]):
+            continue
+        unix_ms = EPOCH_UNIX_MS - int(TEST_DATA_B_MTC_OFF[i][1])
+        yyyy, mm, dd, ms_of_sol = unix_ms_to_mars(unix_ms)
+        assert(format_raw_date(yyyy, mm, dd)==TEST_DATA_B_MTC_OFF[i][0][0])
+        assert(format_raw_time(ms_of_sol)==TEST_DATA_B_MTC_OFF[i][0][1])
+        assert(mars_to_unix_ms(yyyy, mm, dd, ms_of_sol)==unix_ms)
+
+def run_year_cache():
+    # consecutive years are contiguous, on both sides of epoch
+    for year in range(-50, 50, 1):
+        if year==0 or year==-1:
+            continue
+        start_sol, start_ms, year_length, month_starts = get_year_info(year)
+        next_start_sol = get_year_info(year+1)[0]
+        assert(next_start_sol-start_sol==year_length)
+        assert(year_length==get_year_length(year))
+        assert(start_ms==start_sol*SOL_LENGTH)
+        assert(month_starts[-1]==year_length)
+    assert(get_year_info(-1)[0]+get_year_info(-1)[2]==get_year_info(1)[0]==0)
+    hits = year_cache_info().hits
+    get_year_info(30)
+    get_year_info(30)
+    assert(year_cache_info().hits>=hits+2)
+
 def foundation_tests():
     print("Running foundational tests")
     run_positive_dates()
     run_negative_dates()
     run_long_intervals()
     utc_to_mars_time_test_now()
+    run_integer_fast_path()
+    run_year_cache()
     print("Finished foundational tests")
 
 foundation_tests()
\ No newline at end of file
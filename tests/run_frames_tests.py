@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import MarsDateTime, EPOCH_UNIX_MS
+from exodus_calendar.vectorized import earth_ms_to_mars_columns, MARS_COLUMNS
+from exodus_calendar.frames import mars_fields_frame, add_mars_columns, datetimes_to_unix_ms
+
+SAMPLE_SIZE = 5000
+
+
+def random_index(p_count):
+    rng = np.random.default_rng(1955)
+    unix_us = rng.integers(-5*10**15, 5*10**15, p_count)
+    return pd.DatetimeIndex(unix_us.astype("datetime64[us]"))
+
+
+def run_index_against_vectorized():
+    index = random_index(SAMPLE_SIZE)
+    unix_ms = np.floor_divide(index.values.astype(np.int64), 1000)
+    for mars_sec_on in (False, True):
+        expected = earth_ms_to_mars_columns(unix_ms, mars_sec_on)
+        frame = mars_fields_frame(index, mars_sec_on)
+        assert(list(frame.columns)==MARS_COLUMNS)
+        assert(frame.index.equals(index))
+        for name in MARS_COLUMNS:
+            if name=="time":
+                assert(list(frame[name])==[x.decode() for x in expected[name]])
+            else:
+                assert(np.array_equal(frame[name].to_numpy(), expected[name]))
+    # time zones only change how the same instants are shown
+    aware = index.tz_localize("UTC").tz_convert("Asia/Tokyo")
+    assert(mars_fields_frame(aware).reset_index(drop=True).equals(
+        mars_fields_frame(index).reset_index(drop=True)))
+
+
+def run_data_frame_columns():
+    index = random_index(100)
+    frame = pd.DataFrame({"when": index, "value": np.arange(100)})
+    out = add_mars_columns(frame, "when", True)
+    assert(list(out.columns)==["when", "value"] + ["mars_" + x for x in MARS_COLUMNS])
+    assert("mars_year" not in frame.columns)
+    by_index = add_mars_columns(frame.set_index("when"), mars_sec_on=True)
+    assert(np.array_equal(by_index["mars_ls"].to_numpy(), out["mars_ls"].to_numpy()))
+
+
+def run_missing_values():
+    index = pd.DatetimeIndex(["2025-01-01 00:00:00", None, "1955-04-11 19:21:51"])
+    unix_ms, nulls = datetimes_to_unix_ms(index)
+    assert(nulls.tolist()==[False, True, False])
+    frame = mars_fields_frame(index)
+    assert(frame.isna().sum().tolist()==[1]*len(MARS_COLUMNS))
+    assert(frame["year"].dtype=="Int32")
+    assert(frame.loc[index[2], "year"]==1 and frame.loc[index[2], "time"]=="00:00:00.000")
+
+
+def run_series_accessor():
+    index = random_index(SAMPLE_SIZE)
+    series = pd.Series(index, index=np.arange(SAMPLE_SIZE)*2, name="when")
+    unix_ms = np.floor_divide(index.values.astype(np.int64), 1000)
+    expected = earth_ms_to_mars_columns(unix_ms, True)
+    for name in ("year", "month", "sol", "weekday", "ls"):
+        out = getattr(series.mars, name)
+        assert(out.index.equals(series.index) and out.name=="when")
+        assert(np.array_equal(out.to_numpy(), expected[name]))
+    assert(list(series.mars.time(True))==[x.decode() for x in expected["time"]])
+    assert(series.mars.fields(True)["time"].equals(series.mars.time(True).rename("time")))
+    pattern = "%Y-%m-%d %H:%M:%S.%f %j %b %A %a %%"
+    for mars_sec_on in (False, True):
+        strings = series.mars.strftime(pattern, mars_sec_on)
+        for i in range(0, SAMPLE_SIZE, 11):
+            value = MarsDateTime(int(unix_ms[i]) - EPOCH_UNIX_MS)
+            assert(strings.iloc[i]==value.strftime(pattern, mars_sec_on))
+            assert(series.mars.ms_of_sol.iloc[i]==value.ms_of_sol)
+    # inverse conversion, exact with Earth seconds
+    texts = series.mars.strftime("%Y-%m-%d %H:%M:%S.%f")
+    earth = texts.mars.to_earth()
+    assert(str(earth.dt.tz)=="UTC" and earth.index.equals(series.index))
+    assert(np.array_equal(earth.dt.tz_localize(None).to_numpy().astype("datetime64[ms]"),
+        unix_ms.astype("datetime64[ms]")))
+
+
+def run_series_missing_values():
+    series = pd.Series(pd.DatetimeIndex([None, "2025-01-01 00:00:00"]).tz_localize("UTC"))
+    assert(series.mars.year.isna().tolist()==[True, False])
+    assert(series.mars.ls.isna().tolist()==[True, False])
+    assert(series.mars.strftime("%Y").tolist()[1]=="0038")
+    texts = pd.Series(["0038-01-49 19:12:46.000", None, np.nan])
+    earth = texts.mars.to_earth(True)
+    assert(earth.isna().tolist()==[False, True, True])
+    # printed (rounded) by exodus.py -u '2025-01-01 00:00:01+00:00'
+    assert(abs(earth.iloc[0]-pd.Timestamp("2025-01-01 00:00:01", tz="UTC"))<pd.Timedelta("1s"))
+    try:
+        pd.Series(["0038-13-49 19:12:46.000"]).mars.to_earth()
+        assert(False)
+    except ValueError:
+        pass
+
+
+def frames_tests():
+    print("Running pandas adapter tests")
+    run_index_against_vectorized()
+    run_data_frame_columns()
+    run_missing_values()
+    run_series_accessor()
+    run_series_missing_values()
+    print("Finished pandas adapter tests")
+
+frames_tests()
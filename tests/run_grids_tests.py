@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import earth_datetime_to_mars_datetime, get_year_length
+from exodus_calendar.utils import MONTH_LENGTH, WEEKDAYS, RESOLUTION_MS
+from exodus_calendar.grids import get_year_grid, get_month_grid, grid_cache_info, build_year_grid
+
+TEST_YEARS = [-23, -2, -1, 1, 2, 22, 38]
+
+
+def run_grid_layout():
+    for year in TEST_YEARS:
+        grid = get_year_grid(year)
+        assert(len(grid)==12)
+        month_length = MONTH_LENGTH[get_year_length(year)]
+        for i in range(0, 12, 1):
+            assert(len(grid[i])==8)
+            cells = [x for week in grid[i] for x in week]
+            assert(len(cells)==56)
+            sols = [x[0] for x in cells if x is not None]
+            assert(sols==list(range(1, month_length[i]+1)))
+            # missing sols are at the end of last week
+            assert(cells[month_length[i]:]==[None]*(56-month_length[i]))
+            for week in grid[i]:
+                for j in range(0, 7, 1):
+                    if week[j] is not None:
+                        assert(week[j][1]==j)
+
+
+def run_grid_against_conversion():
+    for mars_sec_on in (False, True):
+        for year in TEST_YEARS:
+            grid = get_year_grid(year, mars_sec_on)
+            for month in range(1, 13, 1):
+                for week in get_month_grid(year, month, mars_sec_on)[::3]:
+                    for cell in week:
+                        if cell is None:
+                            continue
+                        sol, weekday, earth_dt, Ls = cell
+                        date, time, wd, Ls_conv = earth_datetime_to_mars_datetime(
+                            earth_dt, mars_sec_on, RESOLUTION_MS
+                        )
+                        prefix = "%05d" % year if year<0 else "%04d" % year
+                        assert(date=="%s-%02d-%02d" % (prefix, month, sol))
+                        assert(time=="12:00:00.000")
+                        assert(wd==WEEKDAYS[weekday])
+                        assert(abs(Ls-Ls_conv)<=0.001 or abs(Ls-Ls_conv)>=359.999)
+
+
+def run_grid_cache():
+    build_year_grid.cache_clear()
+    first = get_month_grid(10, 3)
+    second = get_month_grid(10, 4)
+    assert(grid_cache_info().misses==1)
+    assert(grid_cache_info().hits==1)
+    assert(get_month_grid(10, 3) is first)
+    assert(get_month_grid(10, 3, True)!=first)
+    assert(grid_cache_info().misses==2)
+    # positional and keyword flags share the same grid
+    assert(get_year_grid(10, mars_sec_on=True) is get_year_grid(10, True))
+    assert(get_year_grid(10, mars_sec_on=1) is get_year_grid(10, True))
+    assert(get_year_grid(10, mars_sec_on=False) is get_year_grid(10))
+    assert(grid_cache_info().misses==2)
+
+
+def run_invalid_dates():
+    for year, month in ((0, 1), (38, 0), (38, -1), (38, 13), (0, 0)):
+        try:
+            get_month_grid(year, month)
+            assert(False)
+        except ValueError:
+            pass
+    try:
+        get_year_grid(0, True)
+        assert(False)
+    except ValueError:
+        pass
+    assert(get_month_grid(-1, 12)==get_year_grid(-1)[11])
+
+
+def grids_tests():
+    print("Running calendar grid tests")
+    run_grid_layout()
+    run_grid_against_conversion()
+    run_grid_cache()
+    run_invalid_dates()
+    print("Finished calendar grid tests")
+
+grids_tests()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import os
+import sys
+import random
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import (
+    get_equation_of_time,
+    get_local_mean_solar_time,
+    get_local_true_solar_time,
+    longitude_to_offset_ms,
+    MarsDateTime,
+)
+from exodus_calendar.utils import SOL_LENGTH, MS_PER_MARS_YEAR, EPOCH_UNIX_MS
+from exodus_calendar.vectorized import (
+    earth_ms_to_equation_of_time,
+    earth_ms_to_local_mean_solar_time,
+    earth_ms_to_local_true_solar_time,
+    format_mars_time_array,
+    milliseconds_to_mars_fields,
+)
+
+SAMPLE_SIZE = 2000
+
+# 2000-01-06 00:00:00 UTC, worked example of Allison & McEwen (2000):
+# EOT = -5.19 degrees (with all perturbation terms and TT-UTC of that date)
+TEST_DATA_EOT = [(947116800000, -5.19, 0.02)]
+
+# east longitude, LMST minus MTC as "HH:MM:SS.mmm" on Martian clock
+TEST_DATA_LONGITUDES = [
+    (0, "00:00:00.000"),
+    (90, "06:00:00.000"),
+    (-90, "18:00:00.000"),
+    (270, "18:00:00.000"),
+    (-180, "12:00:00.000"),
+    (180, "12:00:00.000"),
+    (137.4, "09:09:36.000"),
+]
+
+
+def run_equation_of_time():
+    for unix_ms, expected, tolerance in TEST_DATA_EOT:
+        assert(abs(get_equation_of_time(unix_ms)-expected)<tolerance)
+    # one Mars year sampled each sol: bounded and averages out
+    start = 946684800000
+    unix_ms = start + np.arange(0, MS_PER_MARS_YEAR, SOL_LENGTH).astype(np.int64)
+    eot = earth_ms_to_equation_of_time(unix_ms)
+    assert(eot.max()<13 and eot.min()>-13 and abs(eot.mean())<0.5)
+    for i in range(0, len(unix_ms), 37):
+        assert(abs(eot[i]-get_equation_of_time(int(unix_ms[i])))<1e-9)
+
+
+def run_mean_solar_time():
+    random.seed(1955)
+    for i in range(0, SAMPLE_SIZE, 1):
+        unix_ms = random.randint(-10**13, 10**13)
+        mtc = MarsDateTime.from_unix_ms(unix_ms)
+        assert(MarsDateTime(get_local_mean_solar_time(unix_ms, 0))==mtc)
+        longitude = random.uniform(-720, 720)
+        offset = get_local_mean_solar_time(unix_ms, longitude) - mtc.milliseconds
+        assert(offset==longitude_to_offset_ms(longitude))
+        assert(-SOL_LENGTH//2<=offset<SOL_LENGTH//2)
+    for longitude, expected in TEST_DATA_LONGITUDES:
+        offset = longitude_to_offset_ms(longitude) % SOL_LENGTH
+        assert(format_mars_time_array([offset], True)[0].decode()==expected)
+    # local date changes a half sol away from the prime meridian
+    midnight = EPOCH_UNIX_MS + 10*SOL_LENGTH
+    assert(MarsDateTime(get_local_mean_solar_time(midnight, -1)).sol==10)
+    assert(MarsDateTime(get_local_mean_solar_time(midnight, 1)).sol==11)
+
+
+def run_true_solar_time():
+    random.seed(1956)
+    for i in range(0, SAMPLE_SIZE, 1):
+        unix_ms = random.randint(-10**13, 10**13)
+        longitude = random.uniform(-180, 180)
+        difference = get_local_true_solar_time(unix_ms, longitude) \
+            - get_local_mean_solar_time(unix_ms, longitude)
+        assert(difference==round(get_equation_of_time(unix_ms)*SOL_LENGTH/360))
+
+
+def run_broadcasting():
+    rng = np.random.default_rng(1955)
+    unix_ms = rng.integers(-10**13, 10**13, 50)
+    longitudes = rng.uniform(-360, 360, 30)
+    for vector_function, scalar_function in (
+        (earth_ms_to_local_mean_solar_time, get_local_mean_solar_time),
+        (earth_ms_to_local_true_solar_time, get_local_true_solar_time),
+    ):
+        grid = vector_function(unix_ms[:, None], longitudes)
+        assert(grid.shape==(50, 30) and grid.dtype==np.int64)
+        for i in range(0, 50, 7):
+            for j in range(0, 30, 3):
+                assert(grid[i, j]==scalar_function(int(unix_ms[i]), float(longitudes[j])))
+        # one instant against many longitudes
+        row = vector_function(int(unix_ms[0]), longitudes)
+        assert(np.array_equal(row, grid[0]))
+    fields = milliseconds_to_mars_fields(earth_ms_to_local_true_solar_time(unix_ms, 0))
+    assert(fields.shape==(50,))
+
+
+def local_time_tests():
+    print("Running local solar time tests")
+    run_equation_of_time()
+    run_mean_solar_time()
+    run_true_solar_time()
+    run_broadcasting()
+    print("Finished local solar time tests")
+
+local_time_tests()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import os
+import sys
+import pickle
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import (
+    MarsDateTime,
+    add_timedelta_to_mars_date,
+    compute_mars_timedelta,
+    earth_datetime_to_mars_datetime,
+    mars_datetime_to_earth_datetime,
+    mars_datetime_to_earth_datetime_as_ms,
+    mars_datetime_to_solar_longitude_angle,
+)
+from exodus_calendar.utils import EPOCH, SOL_LENGTH, DAY_LENGTH, MS_PER_CYCLE
+
+# Mars timestamp, milliseconds since epoch
+TEST_DATA_A = [
+    ["0001-01-01 00:00:00.000", 0],
+    ["0001-01-02 00:00:00.000", SOL_LENGTH],
+    ["0001-01-31 04:12:22.680", DAY_LENGTH*31],
+    ["0023-01-01 00:00:00.000", MS_PER_CYCLE],
+    ["-0001-12-54 24:39:34.244", -1000],
+    ["-0001-12-54 00:00:00.000", -SOL_LENGTH],
+    ["-0001-01-01 00:00:00.000", -SOL_LENGTH*670],
+    ["-0022-01-01 00:00:00.000", -MS_PER_CYCLE],
+    ["-0638-01-01 00:00:00.000", -MS_PER_CYCLE*29],
+]
+
+# format, mars_sec_on, expected output for 0030-03-51 12:26:45.556
+TEST_DATA_B = [
+    ["%Y-%m-%d %H:%M:%S.%f", False, "0030-03-51 12:26:45.556"],
+    ["%A, %d %b %Y", False, "Tuesday, 51 MAR 0030"],
+    ["%a %j %%", False, "Tue 163 %"],
+    ["%H:%M:%S.%f", True, "12:06:46.752"],
+]
+
+
+def run_string_round_trip():
+    for i in range(0, len(TEST_DATA_A), 1):
+        m_dt = MarsDateTime.from_string(TEST_DATA_A[i][0])
+        assert(m_dt.milliseconds==TEST_DATA_A[i][1])
+        assert(str(m_dt)==TEST_DATA_A[i][0])
+        assert(MarsDateTime(TEST_DATA_A[i][1])==m_dt)
+        assert(MarsDateTime.from_fields(m_dt.year, m_dt.month, m_dt.sol, m_dt.ms_of_sol)==m_dt)
+
+
+def run_conversions():
+    for i in range(0, len(TEST_DATA_A), 1):
+        m_dt = MarsDateTime(TEST_DATA_A[i][1])
+        e_dt = mars_datetime_to_earth_datetime(TEST_DATA_A[i][0])
+        assert(mars_datetime_to_earth_datetime(m_dt)==e_dt)
+        assert(m_dt.to_earth_datetime()==e_dt)
+        assert(MarsDateTime.from_earth_datetime(e_dt)==m_dt)
+        assert(mars_datetime_to_earth_datetime_as_ms(m_dt)==TEST_DATA_A[i][1])
+        Ls = mars_datetime_to_solar_longitude_angle(TEST_DATA_A[i][0])
+        assert(mars_datetime_to_solar_longitude_angle(m_dt)==Ls)
+        date, time, weekday, Ls = earth_datetime_to_mars_datetime(e_dt)
+        assert(m_dt.strftime("%Y-%m-%d %H:%M:%S.%f")==f"{date} {time}")
+        assert(m_dt.strftime("%A")==weekday)
+
+
+def run_arithmetic():
+    m_dt_a = MarsDateTime.from_string("0001-01-31 04:12:22.680")
+    m_dt_b = MarsDateTime.from_string("-0001-12-24 20:27:12.564")
+    assert(m_dt_b < m_dt_a)
+    assert(sorted([m_dt_a, m_dt_b])==[m_dt_b, m_dt_a])
+    assert(m_dt_a - m_dt_b==timedelta(milliseconds=DAY_LENGTH*62))
+    assert(m_dt_b + timedelta(days=62)==m_dt_a)
+    assert(m_dt_a - timedelta(days=62)==m_dt_b)
+    assert(m_dt_b + DAY_LENGTH*62==m_dt_a)
+    assert(compute_mars_timedelta(m_dt_b, m_dt_a)==DAY_LENGTH*62)
+    assert(add_timedelta_to_mars_date(m_dt_b, DAY_LENGTH*62)==m_dt_a)
+    assert(len({m_dt_a, m_dt_b, MarsDateTime(m_dt_a.milliseconds)})==2)
+
+
+def run_value_semantics():
+    m_dt = MarsDateTime.from_string("0030-03-51 12:26:45.556")
+    try:
+        m_dt.year = 1
+        assert(False)
+    except AttributeError:
+        pass
+    assert(pickle.loads(pickle.dumps(m_dt))==m_dt)
+    assert(repr(m_dt)=="MarsDateTime(%d)" % m_dt.milliseconds)
+
+
+def run_strftime():
+    m_dt = MarsDateTime.from_string("0030-03-51 12:26:45.556")
+    for i in range(0, len(TEST_DATA_B), 1):
+        assert(m_dt.strftime(TEST_DATA_B[i][0], TEST_DATA_B[i][1])==TEST_DATA_B[i][2])
+    assert(MarsDateTime(-1000).strftime("%Y")=="-0001")
+
+
+def mars_datetime_tests():
+    print("Running MarsDateTime tests")
+    run_string_round_trip()
+    run_conversions()
+    run_arithmetic()
+    run_value_semantics()
+    run_strftime()
+    print("Finished MarsDateTime tests")
+
+mars_datetime_tests()
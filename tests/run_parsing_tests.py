@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import os
+import sys
+import random
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import mars_datetime_to_earth_datetime_as_ms, get_year_length
+from exodus_calendar.utils import MONTH_LENGTH, RESOLUTION_MS
+from exodus_calendar.parsing import parse_mars_datetime, parse_mars_datetimes
+from exodus_calendar.vectorized import parse_mars_datetime_array
+
+SAMPLE_SIZE = 20000
+
+# (input, mars_sec_on, same value as)
+TEST_DATA_FORMS = [
+    ("35-7-21 13:45:12.345", False, "0035-07-21 13:45:12.345"),
+    ("0035-07-21T13:45:12.345", False, "0035-07-21 13:45:12.345"),
+    ("0035-07-21 13:45:12", False, "0035-07-21 13:45:12.000"),
+    ("0035-07-21 13:45:12.3", False, "0035-07-21 13:45:12.300"),
+    ("0035-07-21 13:45:12.3456", False, "0035-07-21 13:45:12.346"),
+    ("  0035-07-21 13:45:12.345 ", False, "0035-07-21 13:45:12.345"),
+    ("-35-07-21 13:45:12.345", False, "-0035-07-21 13:45:12.345"),
+    ("12345-01-01 00:00:00.000", True, "12345-01-01 00:00:00.000"),
+    ("0001-01-01 24:39:35.243", False, "0001-01-01 24:39:35.243"),
+    ("0001-01-01 23:59:59.999", True, "0001-01-01 23:59:59.999"),
+]
+
+TEST_DATA_INVALID = [
+    ("0000-01-01 00:00:00.000", False),
+    ("0001-13-01 00:00:00.000", False),
+    ("0001-00-01 00:00:00.000", False),
+    ("0001-01-00 00:00:00.000", False),
+    ("0001-01-57 00:00:00.000", False),
+    # December has 53 sols in 669 sol years and 54 in 670 sol years
+    ("0001-12-54 00:00:00.000", False),
+    ("-0001-12-55 00:00:00.000", False),
+    ("0001-01-01 00:60:00.000", False),
+    ("0001-01-01 00:00:60.000", False),
+    ("0001-01-01 24:39:35.244", False),
+    ("0001-01-01 24:00:00.000", True),
+    ("0001-01-01", False),
+    ("0001-01-01 00:00:00.000 UTC", False),
+    ("0001-01-01 0a:00:00.000", False),
+    ("", False),
+]
+
+
+def random_timestamps(p_count):
+    timestamps = []
+    for i in range(0, p_count, 1):
+        year = random.choice([-1, 1])*random.randint(1, 9999)
+        month = random.randint(1, 12)
+        sol = random.randint(1, MONTH_LENGTH[get_year_length(year)][month-1])
+        ms = random.randint(0, 86399999)
+        tt = "%02d:%02d:%02d.%03d" % (ms//3600000, ms//60000 % 60, ms//1000 % 60, ms % 1000)
+        if year<0:
+            timestamps.append("%05d-%02d-%02d %s" % (year, month, sol, tt))
+        else:
+            timestamps.append("%04d-%02d-%02d %s" % (year, month, sol, tt))
+    return timestamps
+
+
+def run_against_reference():
+    random.seed(1955)
+    timestamps = random_timestamps(SAMPLE_SIZE)
+    for mars_sec_on in (False, True):
+        expected = [
+            mars_datetime_to_earth_datetime_as_ms(x, mars_sec_on, RESOLUTION_MS)
+            for x in timestamps
+        ]
+        assert([parse_mars_datetime(x, mars_sec_on) for x in timestamps]==expected)
+        assert(parse_mars_datetimes(timestamps, mars_sec_on)==expected)
+        out = parse_mars_datetime_array(timestamps, mars_sec_on)
+        assert(out.dtype==np.int64)
+        assert(out.tolist()==expected)
+
+
+def run_other_forms():
+    for mars_sec_on in (False, True):
+        test_data = [x for x in TEST_DATA_FORMS if x[1]==mars_sec_on]
+        out = parse_mars_datetime_array([x[0] for x in test_data], mars_sec_on)
+        for i in range(0, len(test_data), 1):
+            text, sec_on, same_as = test_data[i]
+            expected = parse_mars_datetime(same_as, mars_sec_on)
+            assert(parse_mars_datetime(text, mars_sec_on)==expected)
+            assert(out[i]==expected)
+
+
+def run_invalid_input():
+    for text, mars_sec_on in TEST_DATA_INVALID:
+        for parse in (parse_mars_datetime, lambda x, y: parse_mars_datetime_array([x], y)):
+            try:
+                parse(text, mars_sec_on)
+                assert(False)
+            except ValueError:
+                pass
+
+
+def run_array_input_types():
+    timestamps = ["0035-07-21 13:45:12.345", "-0002-12-53 01:02:03.004", "1-1-1 00:00:00"]
+    expected = parse_mars_datetimes(timestamps)
+    for value in [
+        np.array(timestamps),
+        np.array(timestamps, dtype='S'),
+        np.array(timestamps, dtype=object),
+        [x.encode() for x in timestamps],
+    ]:
+        assert(parse_mars_datetime_array(value).tolist()==expected)
+    grid = parse_mars_datetime_array(np.array(timestamps*2).reshape(2, 3))
+    assert(grid.shape==(2, 3))
+    assert(grid[1].tolist()==expected)
+    assert(parse_mars_datetime_array([]).shape==(0,))
+
+
+def parsing_tests():
+    print("Running parser tests")
+    run_against_reference()
+    run_other_forms()
+    run_invalid_input()
+    run_array_input_types()
+    print("Finished parser tests")
+
+parsing_tests()
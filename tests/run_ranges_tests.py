@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import os
+import sys
+from itertools import islice
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import MarsDateTime, SOL_LENGTH, get_year_length
+from exodus_calendar.ranges import iter_sols, iter_weeks, iter_months, iter_years
+
+
+def check_decoded(p_value):
+    # prefilled fields must match a fresh decode of milliseconds
+    decoded = MarsDateTime(p_value.milliseconds)
+    assert((p_value.year, p_value.month, p_value.sol, p_value.ms_of_sol)==
+        (decoded.year, decoded.month, decoded.sol, decoded.ms_of_sol))
+
+
+def run_sols_across_epoch():
+    start = MarsDateTime.from_fields(-3, 1, 1, 3600000)
+    end = MarsDateTime.from_fields(3, 1, 1)
+    sols = list(iter_sols(start, end))
+    assert(len(sols)==sum(get_year_length(x) for x in [-3, -2, -1, 1, 2]))
+    for x in sols:
+        check_decoded(x)
+        assert(x.ms_of_sol==3600000)
+    assert(sols[0]==start)
+    assert(sols[-1].year==2 and sols[-1].month==12)
+    for i in range(1, len(sols), 1):
+        assert(sols[i].milliseconds - sols[i-1].milliseconds==SOL_LENGTH)
+
+
+def run_sols_with_step():
+    start = MarsDateTime.from_fields(1, 1, 1)
+    end = MarsDateTime.from_fields(200, 1, 1)
+    for step in [3, 7, 55, 669, 1000]:
+        sols = list(iter_sols(start, end, step))
+        assert(len(sols)==-(-(end.milliseconds - start.milliseconds)//(step*SOL_LENGTH)))
+        for x in sols[::37]:
+            check_decoded(x)
+        check_decoded(sols[-1])
+    # open-ended
+    sols = list(islice(iter_sols(MarsDateTime.from_fields(-1, 12, 50), step=2), 10))
+    assert(sols[-1]==MarsDateTime.from_fields(1, 1, 14))
+
+
+def run_weeks():
+    start = MarsDateTime.from_fields(-2, 11, 20, 5000)
+    end = MarsDateTime.from_fields(2, 3, 1)
+    weeks = list(iter_weeks(start, end))
+    assert(weeks[0]==MarsDateTime.from_fields(-2, 11, 15))
+    for x in weeks:
+        check_decoded(x)
+        assert(x.weekday==0)
+    # 8 weeks in every month
+    assert(len(weeks)==6+8+24*8+2*8)
+    month_start = MarsDateTime.from_fields(-2, 12, 1)
+    assert(list(iter_weeks(month_start, end, 8))==list(iter_months(month_start, end)))
+
+
+def run_months_and_years():
+    start = MarsDateTime.from_fields(-30, 7, 20)
+    end = MarsDateTime.from_fields(30, 1, 1)
+    months = list(iter_months(start, end))
+    assert(len(months)==6+58*12)
+    for x in months:
+        check_decoded(x)
+        assert(x.sol==1 and x.ms_of_sol==0)
+    years = list(iter_years(start, end))
+    assert([x.year for x in years]==[x for x in range(-30, 30) if x!=0])
+    for x in years:
+        check_decoded(x)
+    assert(list(iter_months(years[1], end, 24))==years[1::2])
+    assert(list(iter_years(start, end, 5))==years[::5])
+    assert(list(iter_years(end, start))==[])
+
+
+def run_invalid_step():
+    start = MarsDateTime(0)
+    for step in [0, -1, 1.5]:
+        try:
+            next(iter_sols(start, step=step))
+            assert(False)
+        except ValueError:
+            pass
+
+
+def ranges_tests():
+    print("Running calendar range tests")
+    run_sols_across_epoch()
+    run_sols_with_step()
+    run_weeks()
+    run_months_and_years()
+    run_invalid_step()
+    print("Finished calendar range tests")
+
+ranges_tests()
@@ -2,23 +2,47 @@
 import os
 import sys
 import time
+import json
+import random
 from datetime import datetime, timezone, timedelta
 from math import modf, ceil, floor
 from zoneinfo import ZoneInfo
 
+import numpy as np
+
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from exodus_calendar.utils import (
     get_solar_longitude_angle, 
+    get_year_info,
     mars_datetime_to_solar_longitude_angle,
     mars_datetime_to_earth_datetime,
+    mars_datetime_to_earth_datetime_as_ms,
 )
 
 from exodus_calendar.utils import (
     DAY_LENGTH, 
     SOL_LENGTH, 
     EPOCH,
+    EPOCH_UNIX_MS,
+)
+from exodus_calendar.seasons import (
+    find_solar_longitude,
+    find_solar_longitude_ms,
+    find_season_boundaries,
+    build_season_index,
+    season_of,
+    SeasonIndex,
+    SEASON_BOUNDARIES,
 )
+from exodus_calendar.vectorized import find_season_boundaries_batch, mars_fields_to_earth_ms
+
+# Ls values in season tables are rounded to 3 decimals at minute precision
+SOLVER_TABLE_TOLERANCE_MS = 90000
+
+# Largest distance of vernal equinox from the start of calendar year within
+# 3000 years of epoch, in sols
+EQUINOX_DRIFT_SOLS = 8
 
 
 # First year
@@ -68,6 +92,75 @@ TEST_DATA_D = [
 ]
 
 
+def run_solver_against_tables():
+    for test_data in (TEST_DATA_A, TEST_DATA_B, TEST_DATA_D):
+        for i in range(0, len(test_data), 1):
+            # tables end with the vernal equinox that opens the next year
+            year = int(test_data[i][0][:4])
+            if test_data[i][2]==0.0:
+                year = year + 1
+            mars_dt, earth_dt = find_solar_longitude(year, test_data[i][2])
+            expected_dt = mars_datetime_to_earth_datetime(test_data[i][1], True)
+            delta_ms = abs((earth_dt - expected_dt).total_seconds()*1000)
+            assert(delta_ms<SOLVER_TABLE_TOLERANCE_MS)
+            assert(mars_dt.to_earth_datetime()==earth_dt)
+            Ls = get_solar_longitude_angle(find_solar_longitude_ms(year, test_data[i][2]))
+            assert(min(abs(Ls-test_data[i][2]), 360-abs(Ls-test_data[i][2]))<1e-6)
+
+
+def run_solver_batch():
+    years, unix_ms = find_season_boundaries_batch(-30, 30)
+    assert(0 not in years)
+    assert(unix_ms.shape==(60, len(SEASON_BOUNDARIES)))
+    for i in range(0, len(years), 1):
+        for j in range(0, len(SEASON_BOUNDARIES), 1):
+            expected_ms = find_solar_longitude_ms(int(years[i]), SEASON_BOUNDARIES[j])
+            assert(abs(unix_ms[i][j]-expected_ms)<1.0)
+    # seasons follow each other in time, from the equinox nearest the start
+    # of the year to the last season starting within it
+    for i in range(0, len(years), 1):
+        year = int(years[i])
+        boundaries = find_season_boundaries(year)
+        assert(len(boundaries)==len(SEASON_BOUNDARIES))
+        for j in range(0, len(boundaries), 1):
+            assert(abs(boundaries[j][0].milliseconds + EPOCH_UNIX_MS - unix_ms[i][j])<1.0)
+            if j>0:
+                assert(boundaries[j-1][0]<boundaries[j][0])
+                assert(boundaries[j][0].year==year)
+        year_start_ms = EPOCH_UNIX_MS + get_year_info(year)[1]
+        assert(abs(boundaries[0][0].milliseconds + EPOCH_UNIX_MS - year_start_ms)<EQUINOX_DRIFT_SOLS*SOL_LENGTH)
+    years, unix_ms = find_season_boundaries_batch(-3000, 3000)
+    assert(np.all(np.diff(unix_ms, axis=1)>0))
+    assert(np.all(unix_ms[1:, 0]>unix_ms[:-1, -1]))
+    year_start_ms = mars_fields_to_earth_ms(years, 1, 1)
+    assert(np.all(np.abs(unix_ms[:, 0] - year_start_ms)<EQUINOX_DRIFT_SOLS*SOL_LENGTH))
+    next_start_ms = mars_fields_to_earth_ms(np.where(years==-1, 1, years+1), 1, 1)
+    assert(np.all(unix_ms[:, -1]<next_start_ms))
+
+
+def run_season_index():
+    index = build_season_index(-3, 5)
+    # index covers all of its years
+    assert(index.covers(EPOCH_UNIX_MS + mars_datetime_to_earth_datetime_as_ms("-0003-01-01 00:00:00.000")))
+    assert(index.covers(EPOCH_UNIX_MS + mars_datetime_to_earth_datetime_as_ms("0005-12-53 24:39:35.000")))
+    # same result as direct calculation, both inside and outside of index
+    random.seed(2000)
+    for i in range(0, 2000, 1):
+        unix_ms = random.uniform(index.crossings[0] - 1e11, index.crossings[-1] + 1e11)
+        bucket, ls_range, sol_of_season = index.season_of(unix_ms)
+        assert((bucket, ls_range, sol_of_season)==season_of(unix_ms))
+        assert(ls_range[0]<=get_solar_longitude_angle(unix_ms)+1e-6<=ls_range[1]+2e-6)
+        assert(1<=sol_of_season<=67)
+    # first sol of each season
+    for i in range(0, len(index.crossings)-1, 1):
+        assert(index.season_of(index.crossings[i])[2]==1)
+    # serialized index gives same answers
+    restored = SeasonIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    for i in range(0, 100, 1):
+        unix_ms = random.uniform(index.crossings[0], index.crossings[-1])
+        assert(restored.season_of(unix_ms)==index.season_of(unix_ms))
+
+
 def seasons_test():
     print("Running season dates tests")
     for i in range(0, len(TEST_DATA_A),1):
@@ -86,6 +179,9 @@ def seasons_test():
 
     ms_since_unix_epoch = 1757996838621
     assert(get_solar_longitude_angle(ms_since_unix_epoch)==140.66896191469732)
+    run_solver_against_tables()
+    run_solver_batch()
+    run_season_index()
     print("Finished season dates tests")
 
 seasons_test()
\ No newline at end of file
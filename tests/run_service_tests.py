@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import asyncio
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import get_year_info, MarsDateTime
+from exodus_calendar.utils import SOL_LENGTH, MONTH_LENGTH, EPOCH_UNIX_MS
+from exodus_calendar.seasons import season_of
+from exodus_calendar.batch import convert_earth_line
+from exodus_calendar.service import MarsClock, MarsClockService, EVENTS
+
+# ticks per sol when stepping the clock
+STEPS_PER_SOL = 7
+
+CLIENT_COUNT = 200
+QUERIES_PER_CLIENT = 5
+
+
+def last_sol_unix_ms(p_year):
+    # start of the last sol of given year
+    month_length = MONTH_LENGTH[get_year_info(p_year)[2]]
+    start = MarsDateTime.from_fields(p_year, 12, month_length[11])
+    return start.milliseconds + EPOCH_UNIX_MS
+
+
+def run_clock_rollovers():
+    unix_ms = last_sol_unix_ms(38) + SOL_LENGTH - 1000
+    clock = MarsClock(unix_ms)
+    events = []
+    for i in range(0, 5*STEPS_PER_SOL, 1):
+        unix_ms = unix_ms + SOL_LENGTH // STEPS_PER_SOL
+        events = events + clock.advance(unix_ms)
+        expected = MarsDateTime(unix_ms - EPOCH_UNIX_MS)
+        assert(clock.now().isoformat()==expected.isoformat())
+        assert(clock.now("Gale").isoformat()==expected.astimezone("Gale").isoformat())
+    names = [x[0] for x in events if x[0]!="season"]
+    assert(names==["year", "month", "sol", "sol", "sol", "sol", "sol"])
+    for event, record in events:
+        value = MarsDateTime(record["unix_ms"] - EPOCH_UNIX_MS)
+        assert(record["mars"]==value.isoformat())
+        if event!="season":
+            assert(value.ms_of_sol==0)
+            assert((record["year"], record["month"], record["sol"])==(value.year, value.month, value.sol))
+    assert(events[0][1]["mars"]=="0039-01-01 00:00:00.000")
+    # clock going backwards is reset without events
+    assert(clock.advance(unix_ms - 10*SOL_LENGTH)==[])
+    assert(clock.now().isoformat()==MarsDateTime(unix_ms - 10*SOL_LENGTH - EPOCH_UNIX_MS).isoformat())
+
+
+def run_clock_seasons():
+    # one Mars year sol by sol: every sol boundary and 12 season boundaries
+    unix_ms = last_sol_unix_ms(39) + SOL_LENGTH // 2
+    clock = MarsClock(unix_ms)
+    year_length = get_year_info(40)[2]
+    events = []
+    for i in range(0, year_length, 1):
+        unix_ms = unix_ms + SOL_LENGTH
+        events = events + clock.advance(unix_ms)
+    names = [x[0] for x in events]
+    assert(names.count("sol")==year_length and names.count("month")==12)
+    assert(names.count("year")==1 and names.count("season")==12)
+    seasons = [x[1] for x in events if x[0]=="season"]
+    for record in seasons:
+        assert(season_of(record["unix_ms"] + 1)[0]==record["season"])
+        assert(season_of(record["unix_ms"] - 1)[0]==(record["season"] - 1) % 12)
+    times = [x[1]["unix_ms"] for x in events]
+    assert(times==sorted(times))
+
+
+async def read_record(p_reader):
+    return json.loads(await p_reader.readline())
+
+
+async def query(p_reader, p_writer, p_line):
+    p_writer.write((p_line + "\n").encode())
+    await p_writer.drain()
+    return await read_record(p_reader)
+
+
+async def run_client(p_port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", p_port)
+    answers = []
+    for i in range(0, QUERIES_PER_CLIENT, 1):
+        answers.append(await query(reader, writer, "now"))
+        answers.append(await query(reader, writer, "convert utc_to_raw 2025-01-01 00:00:01+00:00"))
+    writer.write(b"quit\n")
+    assert(await reader.read()==b"")
+    writer.close()
+    return answers
+
+
+async def run_service_queries():
+    # frozen time: all clients get the answer of the same tick
+    now_ms = [last_sol_unix_ms(38) + SOL_LENGTH - 500]
+    service = MarsClockService(time_source=lambda: now_ms[0])
+    server = await service.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    results = await asyncio.gather(*[run_client(port) for i in range(0, CLIENT_COUNT, 1)])
+    expected_now = MarsDateTime(now_ms[0] - EPOCH_UNIX_MS)
+    expected_convert = convert_earth_line("2025-01-01 00:00:01+00:00", False)
+    for answers in results:
+        for answer in answers[0::2]:
+            assert(answer==answers[0])
+            assert(answer["mars"]==expected_now.isoformat())
+            assert(answer["mtc"]==expected_now.isoformat(mars_sec_on=True))
+            assert(answer["unix_ms"]==now_ms[0])
+        for answer in answers[1::2]:
+            assert(answer["output"]==expected_convert)
+    # subscriptions: all events, sol only, season only
+    clients = [await asyncio.open_connection("127.0.0.1", port) for i in range(0, 3, 1)]
+    for (reader, writer), events in zip(clients, ["", " sol", " season"]):
+        record = await query(reader, writer, "subscribe" + events)
+        assert(record["subscribed"]==(events.split() or EVENTS))
+    reader, writer = clients[0]
+    assert("error" in await query(reader, writer, "subscribe moon"))
+    assert("error" in await query(reader, writer, "now Olympus_Mons"))
+    assert("error" in await query(reader, writer, "convert utc_to_mars 2025-01-01"))
+    assert("error" in await query(reader, writer, "later"))
+    now_ms[0] = now_ms[0] + 1000
+    service.sync()
+    records = [await read_record(reader) for i in range(0, 3, 1)]
+    assert([x["event"] for x in records]==["year", "month", "sol"])
+    assert(records[0]["mars"]=="0039-01-01 00:00:00.000")
+    reader, writer = clients[1]
+    record = await read_record(reader)
+    assert(record["event"]=="sol" and record["year"]==39)
+    # season subscriber gets nothing, next line is its own answer
+    reader, writer = clients[2]
+    record = await query(reader, writer, "now")
+    assert(record["year"]==39 and record["month"]==1 and record["sol"]==1)
+    reader, writer = clients[0]
+    assert(await query(reader, writer, "unsubscribe")=={"subscribed": []})
+    for reader, writer in clients:
+        writer.close()
+    await service.stop(server)
+
+
+async def run_unix_socket():
+    if not hasattr(asyncio, "start_unix_server"):
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mars_clock.sock")
+        service = MarsClockService()
+        server = await service.start(path=path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        record = await query(reader, writer, "now Jezero")
+        value = MarsDateTime.from_string(record["mars"])
+        assert(value.zone.name=="Jezero")
+        assert(value.milliseconds + EPOCH_UNIX_MS==record["unix_ms"])
+        writer.close()
+        await service.stop(server)
+
+
+def run_all_tests():
+    print("Running Mars clock service tests")
+    run_clock_rollovers()
+    run_clock_seasons()
+    asyncio.run(run_service_queries())
+    asyncio.run(run_unix_socket())
+    print("Finished Mars clock service tests")
+
+
+run_all_tests()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import os
+import sys
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import (
+    earth_datetime_to_mars_datetime,
+    get_solar_longitude_angle,
+    mars_datetime_to_earth_datetime_as_ms,
+    milliseconds_to_date_fields,
+)
+from exodus_calendar.utils import EPOCH, SOL_LENGTH, MS_PER_CYCLE, WEEKDAYS
+from exodus_calendar.vectorized import (
+    earth_ms_to_mars_fields,
+    milliseconds_to_mars_fields,
+    mars_fields_to_milliseconds,
+    mars_fields_to_earth_ms,
+    earth_ms_to_solar_longitude_angle,
+    earth_ms_to_mars_records,
+    convert_unix_ms_file,
+    EPOCH_UNIX_MS,
+    MARS_RECORD_DTYPE,
+)
+
+SAMPLE_SIZE = 20000
+
+# instants at and around sol, month, year and cycle boundaries
+TEST_DATA_EDGES = [
+    0, 1, -1, 0.3, -0.3, 0.5, -0.5, 0.7, -0.7,
+    SOL_LENGTH, -SOL_LENGTH, SOL_LENGTH-1, -SOL_LENGTH+1, -SOL_LENGTH-0.4,
+    SOL_LENGTH*668, SOL_LENGTH*669, -SOL_LENGTH*670, -SOL_LENGTH*671,
+    MS_PER_CYCLE, -MS_PER_CYCLE, MS_PER_CYCLE*29, -MS_PER_CYCLE*29,
+    MS_PER_CYCLE*29-0.25, -MS_PER_CYCLE*29+0.25,
+]
+
+
+def compare_with_scalar(p_delta_ms, p_fields):
+    for i in range(0, len(p_delta_ms), 1):
+        expected = milliseconds_to_date_fields(p_delta_ms[i])
+        assert(p_fields["year"][i]==expected[0])
+        assert(p_fields["month"][i]==expected[1])
+        assert(p_fields["sol"][i]==expected[2])
+        assert(p_fields["ms_of_sol"][i]==expected[3])
+        assert(p_fields["weekday"][i]==(expected[2]-1) % 7)
+
+
+def run_edge_cases():
+    delta_ms = np.array(TEST_DATA_EDGES, dtype=np.float64)
+    fields = milliseconds_to_mars_fields(delta_ms)
+    compare_with_scalar(TEST_DATA_EDGES, fields)
+
+
+def run_random_integer_ms():
+    random.seed(1955)
+    delta_ms = [
+        random.randint(-40*MS_PER_CYCLE, 40*MS_PER_CYCLE)
+        for i in range(0, SAMPLE_SIZE, 1)
+    ]
+    unix_ms = np.array(delta_ms, dtype=np.int64) + EPOCH_UNIX_MS
+    fields = earth_ms_to_mars_fields(unix_ms)
+    compare_with_scalar(delta_ms, fields)
+
+
+def run_against_datetime_api():
+    random.seed(2025)
+    epoch_date = datetime.fromisoformat(EPOCH)
+    for i in range(0, 200, 1):
+        delta_ms = random.randint(-5*MS_PER_CYCLE, 5*MS_PER_CYCLE)
+        input_dt = epoch_date + timedelta(milliseconds=delta_ms)
+        date, time, weekday, Ls = earth_datetime_to_mars_datetime(input_dt)
+        fields = earth_ms_to_mars_fields(np.array([delta_ms + EPOCH_UNIX_MS]))
+        yyyy, mm, dd = [int(x) for x in date.lstrip('-').split('-')]
+        if date[0]=='-':
+            yyyy = -yyyy
+        assert(fields["year"][0]==yyyy)
+        assert(fields["month"][0]==mm)
+        assert(fields["sol"][0]==dd)
+        assert(WEEKDAYS[fields["weekday"][0]]==weekday)
+
+
+def run_encoder_against_scalar():
+    random.seed(1982)
+    dates = []
+    for i in range(0, SAMPLE_SIZE, 1):
+        year = random.choice([-1, 1])*random.randint(1, 2000)
+        month = random.randint(1, 12)
+        sol = random.randint(1, 52)
+        ms_of_sol = random.randint(0, 86399999)
+        dates.append((year, month, sol, ms_of_sol))
+    fields = np.array(dates, dtype=np.int64).T
+    for mars_sec_on in (False, True):
+        delta_ms = mars_fields_to_milliseconds(*fields, mars_sec_on=mars_sec_on)
+        for i in range(0, len(dates), 1):
+            year, month, sol, ms_of_sol = dates[i]
+            tt = "%02d:%02d:%02d.%03d" % (
+                ms_of_sol // 3600000,
+                ms_of_sol // 60000 % 60,
+                ms_of_sol // 1000 % 60,
+                ms_of_sol % 1000
+            )
+            if year<0:
+                mars_dt = "%05d-%02d-%02d %s" % (year, month, sol, tt)
+            else:
+                mars_dt = "%04d-%02d-%02d %s" % (year, month, sol, tt)
+            expected = mars_datetime_to_earth_datetime_as_ms(mars_dt, mars_sec_on)
+            assert(delta_ms[i]==expected)
+
+
+def run_invalid_fields():
+    # same errors as the scalar parser, for the first invalid date
+    for fields, message in (
+        ((0, 1, 1), "Invalid year 0"),
+        ((1, 0, 1), "Invalid month 0"),
+        ((1, 13, 1), "Invalid month 13"),
+        ((1, 1, 0), "Invalid sol 0"),
+        ((1, 1, 57), "Invalid sol 57 of month 1 in year 1"),
+        (([1, 2, -1, 0], 1, [1, 1, 60, 1]), "Invalid sol 60 of month 1 in year -1"),
+    ):
+        try:
+            mars_fields_to_milliseconds(*fields)
+            assert(False)
+        except ValueError as e:
+            assert(str(e).startswith(message))
+        try:
+            mars_fields_to_earth_ms(*fields)
+            assert(False)
+        except ValueError:
+            pass
+    assert(mars_fields_to_milliseconds(1, 1, 56)==55*SOL_LENGTH)
+    assert(mars_fields_to_milliseconds(-1, 12, 1)<0)
+
+
+def run_round_trip():
+    random.seed(1983)
+    unix_ms = np.array([
+        random.randint(-40*MS_PER_CYCLE, 40*MS_PER_CYCLE) + EPOCH_UNIX_MS
+        for i in range(0, SAMPLE_SIZE, 1)
+    ], dtype=np.int64)
+    fields = earth_ms_to_mars_fields(unix_ms)
+    unix_ms_back = mars_fields_to_earth_ms(
+        fields["year"], fields["month"], fields["sol"], fields["ms_of_sol"]
+    )
+    assert(unix_ms_back.dtype==np.int64)
+    assert(np.array_equal(unix_ms, unix_ms_back))
+
+
+def run_solar_longitude():
+    random.seed(1984)
+    unix_ms = [
+        random.randint(-40*MS_PER_CYCLE, 40*MS_PER_CYCLE) + EPOCH_UNIX_MS
+        for i in range(0, SAMPLE_SIZE, 1)
+    ]
+    unix_ms.append(1757996838621)
+    Ls = earth_ms_to_solar_longitude_angle(np.array(unix_ms, dtype=np.int64))
+    for i in range(0, len(unix_ms), 1):
+        delta = abs(Ls[i]-get_solar_longitude_angle(unix_ms[i]))
+        # angles close to 0/360 may wrap differently
+        assert(min(delta, 360-delta)<1e-9)
+
+
+def run_memory_mapped_file():
+    rng = np.random.default_rng(1955)
+    unix_ms = rng.integers(-200*MS_PER_CYCLE, 200*MS_PER_CYCLE, SAMPLE_SIZE) + EPOCH_UNIX_MS
+    unix_ms[:len(TEST_DATA_EDGES)] = np.floor(TEST_DATA_EDGES).astype(np.int64) + EPOCH_UNIX_MS
+    assert(MARS_RECORD_DTYPE.itemsize==11)
+    fields = earth_ms_to_mars_fields(unix_ms)
+    records = earth_ms_to_mars_records(unix_ms)
+    for name in MARS_RECORD_DTYPE.names:
+        assert(np.array_equal(records[name], fields[name]))
+    directory = tempfile.mkdtemp()
+    input_path = os.path.join(directory, "input.bin")
+    output_path = os.path.join(directory, "output.bin")
+    unix_ms.astype("<i8").tofile(input_path)
+    # window size not dividing record count
+    assert(convert_unix_ms_file(input_path, output_path, 999)==SAMPLE_SIZE)
+    assert(os.path.getsize(output_path)==SAMPLE_SIZE*11)
+    assert(np.array_equal(np.fromfile(output_path, dtype=MARS_RECORD_DTYPE), records))
+    open(input_path, "wb").close()
+    assert(convert_unix_ms_file(input_path, output_path)==0)
+    assert(os.path.getsize(output_path)==0)
+    with open(input_path, "wb") as input_file:
+        input_file.write(b"1234567")
+    try:
+        convert_unix_ms_file(input_path, output_path)
+        assert(False)
+    except ValueError:
+        pass
+    os.remove(input_path)
+    os.remove(output_path)
+    os.rmdir(directory)
+
+
+def vectorized_tests():
+    print("Running vectorized conversion tests")
+    run_edge_cases()
+    run_random_integer_ms()
+    run_against_datetime_api()
+    run_encoder_against_scalar()
+    run_invalid_fields()
+    run_round_trip()
+    run_solar_longitude()
+    run_memory_mapped_file()
+    print("Finished vectorized conversion tests")
+
+vectorized_tests()
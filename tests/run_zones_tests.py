@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import os
+import sys
+import pickle
+import random
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import (
+    earth_datetime_to_mars_datetime,
+    get_local_mean_solar_time,
+    get_mars_zone,
+    mars_datetime_to_earth_datetime_as_ms,
+    mars_to_unix_ms,
+    register_mars_zone,
+    unix_ms_to_mars,
+    MarsDateTime,
+    MarsZone,
+)
+from exodus_calendar.utils import SOL_LENGTH, EPOCH_UNIX_MS, MARS_ZONES
+from exodus_calendar.parsing import parse_mars_datetime, parse_mars_datetimes
+from exodus_calendar.ranges import iter_sols, iter_months, iter_years
+from exodus_calendar.vectorized import (
+    earth_ms_to_mars_records,
+    format_mars_datetime_array,
+    format_mars_datetime_pattern,
+    mars_fields_to_earth_ms,
+    parse_mars_datetime_array,
+)
+
+SAMPLE_SIZE = 2000
+
+# zone, offset from MTC on Martian clock, name in formatted strings
+TEST_DATA_ZONES = [
+    (None, 0, "MTC"),
+    ("MTC", 0, "MTC"),
+    (90, SOL_LENGTH // 4, "+90.000"),
+    (-90, -(SOL_LENGTH // 4), "-90.000"),
+    (270, -(SOL_LENGTH // 4), "-90.000"),
+    ("+180", -(SOL_LENGTH // 2), "-180.000"),
+    ("Gale", round(137.4417*SOL_LENGTH/360), "Gale"),
+    ("Jezero", round(77.4509*SOL_LENGTH/360), "Jezero"),
+]
+
+TEST_DATA_INVALID_ZONES = ["Olympus", "", "1O", "+", "+x"]
+
+
+def run_zone_objects():
+    for zone, offset_ms, name in TEST_DATA_ZONES:
+        value = MarsDateTime(0, zone)
+        assert(value.strftime("%Z")==name)
+        if zone is not None:
+            assert(get_mars_zone(zone).offset_ms==offset_ms)
+            assert(get_mars_zone(zone) is get_mars_zone(zone))
+    for zone in TEST_DATA_INVALID_ZONES:
+        try:
+            get_mars_zone(zone)
+            assert(False)
+        except ValueError:
+            pass
+    # longitudes are normalized, names give the same zone back
+    zone = get_mars_zone(137.4417)
+    assert(zone==get_mars_zone(137.4417+360))
+    assert(get_mars_zone(zone.name)==zone)
+    assert(pickle.loads(pickle.dumps(zone))==zone)
+    site = register_mars_zone("Olympus", -133.8)
+    assert(get_mars_zone("Olympus") is site and MARS_ZONES["Olympus"] is site)
+    try:
+        MarsZone("Olympus Mons", -133.8)
+        assert(False)
+    except ValueError:
+        pass
+    try:
+        site.offset_ms = 0
+        assert(False)
+    except AttributeError:
+        pass
+
+
+def run_local_time():
+    # zone fields are local mean solar time at zone longitude
+    random.seed(1955)
+    zones = [get_mars_zone(x) for x in ["Gale", "Jezero", "Meridiani", -42.5]]
+    for i in range(0, SAMPLE_SIZE, 1):
+        unix_ms = random.randint(-10**13, 10**13)
+        zone = random.choice(zones)
+        value = MarsDateTime.from_unix_ms(unix_ms, zone=zone)
+        local = MarsDateTime(get_local_mean_solar_time(unix_ms, zone.longitude))
+        assert(value.milliseconds==unix_ms - EPOCH_UNIX_MS)
+        assert(value==MarsDateTime.from_unix_ms(unix_ms))
+        assert(value.isoformat()==local.isoformat() + " " + zone.name)
+        assert(unix_ms_to_mars(unix_ms, zone)==unix_ms_to_mars(unix_ms + zone.offset_ms))
+        fields = unix_ms_to_mars(unix_ms, zone)
+        assert(mars_to_unix_ms(*fields, zone=zone)==unix_ms)
+        assert(MarsDateTime.from_fields(*fields, zone=zone)==value)
+        assert(value.astimezone(None).isoformat()==MarsDateTime.from_unix_ms(unix_ms).isoformat())
+        assert((value + SOL_LENGTH).zone is zone)
+    # legacy conversion calls
+    earth_dt = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    mtc = earth_datetime_to_mars_datetime(earth_dt)
+    gale = earth_datetime_to_mars_datetime(earth_dt, zone="Gale")
+    assert(mtc[0]=="0038-01-49" and gale[0]=="0038-01-50" and mtc[3]==gale[3])
+    text = "%s %s" % gale[:2]
+    value = MarsDateTime.from_string(text + " Gale")
+    assert(value==MarsDateTime.from_string(text, zone="Gale"))
+    assert(abs(value.milliseconds + EPOCH_UNIX_MS - 1735689600000)<=1)
+    # legacy string API takes no zone suffix and ignores trailing words
+    assert(mars_datetime_to_earth_datetime_as_ms("0030-01-01 00:00:00 Monday")==1721263205916)
+    assert(MarsDateTime.from_string("0030-01-01 00:00:00 Monday").zone is None)
+    try:
+        parse_mars_datetime("0030-01-01 00:00:00.000 Monday")
+        assert(False)
+    except ValueError as e:
+        assert("zone" not in str(e))
+
+
+def run_round_trips():
+    random.seed(1955)
+    zones = [None, "Gale", "Utopia", -42.5, "Meridiani"]
+    for i in range(0, SAMPLE_SIZE, 1):
+        milliseconds = random.randint(-10**14, 10**14)
+        zone = random.choice(zones)
+        value = MarsDateTime(milliseconds, zone)
+        text = value.isoformat()
+        assert(MarsDateTime.from_string(text)==value)
+        assert(MarsDateTime.from_string(text).zone==value.zone)
+        assert(parse_mars_datetime(text)==milliseconds)
+        assert(pickle.loads(pickle.dumps(value)).isoformat()==text)
+        assert(eval(repr(value)).isoformat()==text)
+        if zone is not None:
+            # zone given separately to strings without suffix
+            plain = text.rsplit(" ", 1)[0]
+            assert(parse_mars_datetime(plain, zone=zone)==milliseconds)
+            assert(MarsDateTime.from_string(plain, zone=zone)==value)
+            # suffix takes precedence
+            assert(parse_mars_datetime(text, zone="Gusev")==milliseconds)
+
+
+def run_batch():
+    random.seed(1955)
+    unix_ms = np.array([random.randint(-10**13, 10**13) for i in range(0, SAMPLE_SIZE, 1)])
+    delta_ms = unix_ms - EPOCH_UNIX_MS
+    for zone in ["Gale", -42.5, get_mars_zone("Jezero")]:
+        records = earth_ms_to_mars_records(unix_ms, zone=zone)
+        for i in range(0, SAMPLE_SIZE, 97):
+            fields = unix_ms_to_mars(int(unix_ms[i]), zone)
+            assert(tuple(int(records[x][i]) for x in ["year", "month", "sol", "ms_of_sol"])==fields)
+        back = mars_fields_to_earth_ms(
+            records["year"], records["month"], records["sol"], records["ms_of_sol"], zone=zone
+        )
+        assert(np.array_equal(back, unix_ms))
+        texts = format_mars_datetime_array(delta_ms, zone=zone)
+        expected = [MarsDateTime(x, zone).isoformat() for x in delta_ms.tolist()]
+        assert(texts.astype("U").tolist()==expected)
+        assert(np.array_equal(parse_mars_datetime_array(texts), delta_ms))
+        plain = [x.rsplit(" ", 1)[0] for x in expected]
+        assert(np.array_equal(parse_mars_datetime_array(plain, zone=zone), delta_ms))
+        assert(parse_mars_datetimes(plain, zone=zone)==delta_ms.tolist())
+        pattern = "%Y-%m-%d %H:%M %a %Z"
+        texts = format_mars_datetime_pattern(delta_ms, pattern, zone=zone)
+        expected = [MarsDateTime(x, zone).strftime(pattern) for x in delta_ms.tolist()]
+        assert(np.char.decode(texts, "utf-8").tolist()==expected)
+
+
+def run_iterators():
+    start = MarsDateTime.from_fields(38, 11, 50, SOL_LENGTH - 1000, zone="Gale")
+    end = MarsDateTime.from_fields(40, 2, 1, zone="Gale")
+    sols = list(iter_sols(start, end, step=3))
+    months = list(iter_months(start, end))
+    years = list(iter_years(start, end))
+    for values in [sols, months, years]:
+        for x in values:
+            assert(x.zone==start.zone)
+            assert(MarsDateTime(x.milliseconds, x.zone).isoformat()==x.isoformat())
+    assert(months[0].isoformat()=="0038-11-01 00:00:00.000 Gale")
+    assert(months[-1].isoformat()=="0040-01-01 00:00:00.000 Gale")
+    assert([x.year for x in years]==[38, 39, 40])
+
+
+def run_all_tests():
+    print("Running Mars zone tests")
+    run_zone_objects()
+    run_local_time()
+    run_round_trips()
+    run_batch()
+    run_iterators()
+    print("Finished Mars zone tests")
+
+
+run_all_tests()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+import sys, os
+import random
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exodus_calendar.utils import (
+    positive_dates_to_milliseconds,
+    negative_dates_to_milliseconds,
+    positive_milliseconds_to_date,
+    negative_milliseconds_to_date,
+    martian_time_to_millisec,
+    mars_datetime_to_solar_longitude_angle,
+    earth_datetime_to_mars_datetime,
+)
+from exodus_calendar.utils import YEAR_CYCLE, MONTH_LENGTH, MONTHS, SOL_LENGTH
+from exodus_calendar.utils import MS_PER_CYCLE, EPOCH, EPOCH_DATETIME
+
+SAMPLE_SIZE = 10000
+REPEATS = 5
+
+
+###############################################################################
+########################### REFERENCE IMPLEMENTATIONS #########################
+###############################################################################
+
+# Loop-based encoders as shipped in version 1.0, kept for comparison only
+def loop_positive_dates_to_milliseconds(input_date, p_mars_second_on=False):
+    datetimes = input_date.split()
+    date_split = [int(x) for x in datetimes[0].split('-')]
+    ms_total = 0
+    years_elapsed = date_split[0] - 1
+    total_cycles_passed = years_elapsed // len(YEAR_CYCLE)
+    ms_total = ms_total + MS_PER_CYCLE*total_cycles_passed
+    year_in_current_cycle = years_elapsed - total_cycles_passed*len(YEAR_CYCLE)
+    year_length = YEAR_CYCLE[year_in_current_cycle]
+    for i in range(0, year_in_current_cycle, 1):
+        ms_total = ms_total + YEAR_CYCLE[i]*SOL_LENGTH
+    months_elapsed = date_split[1] - 1
+    for i in range(0, months_elapsed, 1):
+        ms_total = ms_total + MONTH_LENGTH[year_length][i]*SOL_LENGTH
+    days_elapsed = date_split[2] - 1
+    for i in range(0, days_elapsed, 1):
+        ms_total = ms_total + SOL_LENGTH
+    ms_total = ms_total + martian_time_to_millisec(datetimes[1], p_mars_second_on)
+    return ms_total
+
+
+def loop_negative_dates_to_milliseconds(p_input_date, p_mars_second_on=False):
+    datetimes = p_input_date.split()
+    date_split = [int(x) for x in datetimes[0].split('-')]
+    ms_total = 0
+    years_elapsed = date_split[0] - 1
+    total_cycles_passed = years_elapsed // len(YEAR_CYCLE)
+    ms_total = ms_total + MS_PER_CYCLE*total_cycles_passed
+    year_in_current_cycle = years_elapsed - total_cycles_passed*len(YEAR_CYCLE)
+    year_len = YEAR_CYCLE[len(YEAR_CYCLE) - year_in_current_cycle-1]
+    for i in range(0, year_in_current_cycle,1):
+        ms_total = ms_total + YEAR_CYCLE[len(YEAR_CYCLE)-i-1]*SOL_LENGTH
+    months_elapsed = len(MONTHS) - date_split[1]
+    for i in range(0, months_elapsed, 1):
+        ms_total = ms_total + MONTH_LENGTH[year_len][len(MONTHS)-i-1]*SOL_LENGTH
+    days_elapsed = MONTH_LENGTH[year_len][date_split[1]-1] - date_split[2]
+    for i in range(0, days_elapsed, 1):
+        ms_total = ms_total + SOL_LENGTH
+    time_to_ms = martian_time_to_millisec(datetimes[1],p_mars_second_on)
+    ms_total = ms_total + (SOL_LENGTH - time_to_ms)
+    return -ms_total
+
+
+# String based conversion pipeline as shipped in version 1.0
+def string_earth_datetime_to_mars_datetime(input_dt, mars_sec_on=False):
+    epoch_date = datetime.fromisoformat(EPOCH)
+    diff = input_dt - epoch_date
+    ms_since_epoch = diff.total_seconds()*1000.0
+    if (epoch_date<=input_dt):
+        mars_dt = positive_milliseconds_to_date(ms_since_epoch, mars_sec_on)
+    else:
+        mars_dt = negative_milliseconds_to_date(ms_since_epoch, mars_sec_on)
+    Ls = mars_datetime_to_solar_longitude_angle(mars_dt[:23], mars_sec_on)
+    date = mars_dt.split(',')[0].split(' ')[0]
+    time = mars_dt.split(',')[0].split(' ')[1]
+    weekday = mars_dt.split(',')[1].strip(' ')
+    return (date, time, weekday, Ls)
+
+
+###############################################################################
+################################## BENCHMARKS #################################
+###############################################################################
+
+def random_mars_dates(p_count):
+    dates = []
+    for i in range(0, p_count, 1):
+        year = random.randint(1, 1000)
+        month = random.randint(1, 12)
+        # shortest month lengths, so that dates are valid for both signs
+        sol = random.randint(1, MONTH_LENGTH[min(YEAR_CYCLE)][month-1])
+        tt = "%02d:%02d:%02d.%03d" % (
+            random.randint(0, 23),
+            random.randint(0, 59),
+            random.randint(0, 59),
+            random.randint(0, 999)
+        )
+        dates.append("%04d-%02d-%02d %s" % (year, month, sol, tt))
+    return dates
+
+
+def best_time(p_function, p_inputs):
+    timer = timeit.Timer(lambda: [p_function(x) for x in p_inputs])
+    return min(timer.repeat(REPEATS, 1))
+
+
+def report(p_title, p_baseline, p_improved, p_count):
+    print(p_title)
+    print("  before: %8.3f us/call" % (p_baseline*1e6/p_count))
+    print("   after: %8.3f us/call" % (p_improved*1e6/p_count))
+    print(" speedup: %8.2fx" % (p_baseline/p_improved))
+
+
+def benchmark_encoders():
+    dates = random_mars_dates(SAMPLE_SIZE)
+    for x in dates:
+        assert(loop_positive_dates_to_milliseconds(x)==positive_dates_to_milliseconds(x))
+        assert(loop_negative_dates_to_milliseconds(x)==negative_dates_to_milliseconds(x))
+    t_before = best_time(loop_positive_dates_to_milliseconds, dates)
+    t_after = best_time(positive_dates_to_milliseconds, dates)
+    report("positive_dates_to_milliseconds", t_before, t_after, len(dates))
+    t_before = best_time(loop_negative_dates_to_milliseconds, dates)
+    t_after = best_time(negative_dates_to_milliseconds, dates)
+    report("negative_dates_to_milliseconds", t_before, t_after, len(dates))
+
+
+def random_earth_datetimes(p_count):
+    epoch_date = EPOCH_DATETIME
+    dates = []
+    for i in range(0, p_count, 1):
+        delta_ms = random.randint(-10*MS_PER_CYCLE, 10*MS_PER_CYCLE)
+        dates.append(epoch_date + timedelta(milliseconds=delta_ms))
+    return dates
+
+
+def benchmark_earth_to_mars():
+    dates = random_earth_datetimes(SAMPLE_SIZE)
+    for x in dates:
+        assert(string_earth_datetime_to_mars_datetime(x)[:3]==earth_datetime_to_mars_datetime(x)[:3])
+    t_before = best_time(string_earth_datetime_to_mars_datetime, dates)
+    t_after = best_time(earth_datetime_to_mars_datetime, dates)
+    report("earth_datetime_to_mars_datetime", t_before, t_after, len(dates))
+
+
+def benchmark_season_tables():
+    from exodus_calendar.vectorized import find_season_boundaries_batch
+    timer = timeit.Timer(lambda: find_season_boundaries_batch(-2000, 2000))
+    t_batch = min(timer.repeat(REPEATS, 1))
+    print("find_season_boundaries_batch")
+    print("   4000 years: %8.3f s" % t_batch)
+
+
+def benchmark_solar_longitude():
+    import numpy as np
+    from exodus_calendar.vectorized import earth_ms_to_solar_longitude_angle
+    from exodus_calendar.approximation import earth_ms_to_solar_longitude_angle_approx
+    # hourly instants over ~100 Mars years after 2000
+    start_ms = 946684800000
+    unix_ms = np.arange(start_ms, start_ms + 1600000*3600000, 3600000, dtype=np.int64)
+    exact = earth_ms_to_solar_longitude_angle(unix_ms)
+    approx = earth_ms_to_solar_longitude_angle_approx(unix_ms)
+    delta = np.abs(exact - approx)
+    error = np.minimum(delta, 360-delta).max()
+    timer = timeit.Timer(lambda: earth_ms_to_solar_longitude_angle(unix_ms))
+    t_before = min(timer.repeat(REPEATS, 1))
+    timer = timeit.Timer(lambda: earth_ms_to_solar_longitude_angle_approx(unix_ms))
+    t_after = min(timer.repeat(REPEATS, 1))
+    report("earth_ms_to_solar_longitude_angle_approx", t_before, t_after, len(unix_ms))
+    print("   error: %8.1e deg" % error)
+
+
+def random_log_timestamps(p_count):
+    # consecutive timestamps a few minutes apart, as found in log files
+    from exodus_calendar.utils import MarsDateTime
+    delta_ms = random.randint(0, 10*MS_PER_CYCLE)
+    timestamps = []
+    for i in range(0, p_count, 1):
+        delta_ms = delta_ms + random.randint(0, 600000)
+        timestamps.append(MarsDateTime(delta_ms).isoformat())
+    return timestamps
+
+
+def benchmark_parser():
+    from exodus_calendar.utils import mars_datetime_to_earth_datetime_as_ms
+    from exodus_calendar.parsing import parse_mars_datetime
+    from exodus_calendar.vectorized import parse_mars_datetime_array
+    for title, timestamps in [
+        ("parse_mars_datetime (log timestamps)", random_log_timestamps(SAMPLE_SIZE)),
+        ("parse_mars_datetime (random dates)", random_mars_dates(SAMPLE_SIZE)),
+    ]:
+        t_before = best_time(mars_datetime_to_earth_datetime_as_ms, timestamps)
+        t_after = best_time(parse_mars_datetime, timestamps)
+        report(title, t_before, t_after, len(timestamps))
+    timer = timeit.Timer(lambda: parse_mars_datetime_array(timestamps))
+    t_after = min(timer.repeat(REPEATS, 1))
+    report("parse_mars_datetime_array", t_before, t_after, len(timestamps))
+
+
+def benchmark_formatter():
+    import numpy as np
+    from exodus_calendar.utils import MarsDateTime, compile_mars_format
+    from exodus_calendar.vectorized import format_mars_datetime_array, format_mars_datetime_lines
+    values = [random.randint(-10**14, 10**14) for i in range(0, SAMPLE_SIZE, 1)]
+    t_before = best_time(lambda x: MarsDateTime(x).strftime("%Y-%m-%d %A"), values)
+    pattern = compile_mars_format("%Y-%m-%d %A")
+    t_after = best_time(pattern.format, values)
+    report("MarsFormat.format (compiled pattern)", t_before, t_after, len(values))
+    t_before = best_time(lambda x: MarsDateTime(x).isoformat(), values)
+    array = np.array(values, dtype=np.int64)
+    timer = timeit.Timer(lambda: format_mars_datetime_array(array))
+    t_after = min(timer.repeat(REPEATS, 1))
+    report("format_mars_datetime_array", t_before, t_after, len(values))
+    buffer = bytearray(len(values)*25)
+    timer = timeit.Timer(lambda: format_mars_datetime_lines(array, out=buffer))
+    t_after = min(timer.repeat(REPEATS, 1))
+    report("format_mars_datetime_lines (into buffer)", t_before, t_after, len(values))
+
+
+def benchmark_clock_service():
+    from exodus_calendar.utils import mars_datetime_now
+    from exodus_calendar.service import MarsClockService
+    service = MarsClockService()
+    inputs = [None]*SAMPLE_SIZE
+    t_before = best_time(lambda x: mars_datetime_now(), inputs)
+    t_after = best_time(lambda x: service.sync().now_record(), inputs)
+    report("MarsClockService now (per-tick cache)", t_before, t_after, len(inputs))
+
+
+def main():
+    random.seed(1955)
+    benchmark_encoders()
+    benchmark_earth_to_mars()
+    benchmark_season_tables()
+    benchmark_solar_longitude()
+    benchmark_parser()
+    benchmark_formatter()
+    benchmark_clock_service()
+
+
+main()
@@ -1,18 +1,104 @@
 #!/usr/bin/env python3
 import argparse
 import sys
+import time
 import os
 from datetime import datetime, timezone, timedelta
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from exodus_calendar.utils import (
-    earth_datetime_to_mars_datetime, 
-    mars_datetime_to_earth_datetime,
     mars_datetime_to_solar_longitude_angle,
     mars_datetime_now
 )
 from exodus_calendar.utils import WEEKDAYS, EARTH_TIMEZONE, EPOCH
+from exodus_calendar.batch import (
+    stream_convert,
+    parallel_convert_file,
+    BATCH_MODES,
+    CHUNK_SIZE,
+    CHUNK_BYTES,
+    CONVERSION_ERRORS,
+    OUTPUT_FORMATS,
+)
+# clock service itself (and asyncio) is imported only when serving
+from exodus_calendar.service_defaults import DEFAULT_HOST, DEFAULT_PORT, TICK_MS
+
+
+def run_single_value(p_mode, p_text, p_example):
+    # same conversion as batch mode, Mars to Earth results with weekday
+    convert, mars_sec_on = BATCH_MODES[p_mode]
+    try:
+        output = convert(p_text.strip(), mars_sec_on)
+    except CONVERSION_ERRORS:
+        print("Input date is not in the correct format!")
+        print("Correct example below:")
+        print("exodus.py %s" % p_example)
+        return
+    if p_mode.startswith("utc"):
+        print(output)
+    else:
+        weekday = datetime.fromisoformat(output).strftime("%A")
+        print("Earth DateTime: %s, %s" % (output, weekday))
+
+
+def run_batch(args):
+    if args.WORKERS is not None:
+        if args.INPUT_FILE is None or args.INPUT_FILE=="-":
+            sys.stderr.write("Parallel conversion (--workers) needs an input file (--input)\n")
+            return 2
+        lines, total_bytes, errors = parallel_convert_file(
+            args.INPUT_FILE, args.BATCH_MODE, sys.stdout, args.OUTPUT_FORMAT,
+            args.WORKERS or None, args.CHUNK_BYTES
+        )
+    elif args.INPUT_FILE is None or args.INPUT_FILE=="-":
+        errors = stream_convert(
+            sys.stdin, args.BATCH_MODE, sys.stdout, args.OUTPUT_FORMAT, args.CHUNK_SIZE
+        )
+    else:
+        with open(args.INPUT_FILE, encoding="utf-8") as input_file:
+            errors = stream_convert(
+                input_file, args.BATCH_MODE, sys.stdout, args.OUTPUT_FORMAT, args.CHUNK_SIZE
+            )
+    return 1 if errors>0 else 0
+
+
+def run_binary(args):
+    # NumPy is an optional dependency, needed for binary mode only
+    try:
+        from exodus_calendar.vectorized import convert_unix_ms_file, MARS_RECORD_DTYPE
+    except ImportError:
+        print("Binary mode requires NumPy: pip install exodus-calendar[numpy]")
+        return 2
+    if args.INPUT_FILE is None or args.INPUT_FILE=="-":
+        print("Binary mode (--to-records) needs an input file (--input)")
+        return 2
+    started = time.perf_counter()
+    try:
+        count = convert_unix_ms_file(args.INPUT_FILE, args.RECORDS_FILE)
+    except (OSError, ValueError) as e:
+        print("Binary conversion failed: %s" % e)
+        return 1
+    elapsed = time.perf_counter() - started
+    print("Converted %d records (%d bytes each) in %.2f s" % (
+        count, MARS_RECORD_DTYPE.itemsize, elapsed
+    ))
+    return 0
+
+
+def run_service(args):
+    import asyncio
+    from exodus_calendar.service import serve_mars_clock
+    if args.UNIX_SOCKET is not None:
+        print("Serving Mars clock on %s" % args.UNIX_SOCKET)
+    else:
+        print("Serving Mars clock on %s:%d" % (args.HOST, args.SERVE_PORT))
+    sys.stdout.flush()
+    try:
+        asyncio.run(serve_mars_clock(args.HOST, args.SERVE_PORT, args.UNIX_SOCKET, args.TICK_MS))
+    except KeyboardInterrupt:
+        pass
+    return 0
 
 
 def main():
@@ -48,47 +134,106 @@ def main():
         dest='MARS_DATETIME_RAW', 
         help='convert Mars datetime (with 1000ms seconds) to Earth one in UTC'
     )
+    parser.add_argument(
+        '-b',
+        "--batch",
+        choices=list(BATCH_MODES),
+        dest='BATCH_MODE',
+        help='convert timestamps read line by line from stdin (or --input file)'
+    )
+    parser.add_argument(
+        '-i',
+        "--input",
+        type=str,
+        dest='INPUT_FILE',
+        help='input file for batch mode, one timestamp per line (default: stdin)'
+    )
+    parser.add_argument(
+        '-f',
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="plain",
+        dest='OUTPUT_FORMAT',
+        help='batch mode output format (default: plain)'
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        dest='CHUNK_SIZE',
+        help='batch mode output lines per write (default: %d)' % CHUNK_SIZE
+    )
+    parser.add_argument(
+        '-w',
+        "--workers",
+        type=int,
+        dest='WORKERS',
+        help='convert --input file on given number of processes (0: one per CPU)'
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=CHUNK_BYTES,
+        dest='CHUNK_BYTES',
+        help='parallel mode input bytes per task (default: %d)' % CHUNK_BYTES
+    )
+
+    parser.add_argument(
+        "--to-records",
+        type=str,
+        dest='RECORDS_FILE',
+        help='convert --input file of little-endian int64 Unix ms to packed Mars '
+            'records (year int32, month, sol uint8, ms of sol uint32, weekday uint8)'
+    )
+
+    parser.add_argument(
+        '-s',
+        "--serve",
+        type=int,
+        nargs='?',
+        const=DEFAULT_PORT,
+        dest='SERVE_PORT',
+        help='run Mars clock service (now, convert, subscribe) on given port '
+            '(default: %d)' % DEFAULT_PORT
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=DEFAULT_HOST,
+        dest='HOST',
+        help='clock service address (default: %s)' % DEFAULT_HOST
+    )
+    parser.add_argument(
+        "--unix-socket",
+        type=str,
+        dest='UNIX_SOCKET',
+        help='serve clock service on Unix socket at given path instead'
+    )
+    parser.add_argument(
+        "--tick",
+        type=int,
+        default=TICK_MS,
+        dest='TICK_MS',
+        help='clock service tick in milliseconds (default: %d)' % TICK_MS
+    )
 
     args = parser.parse_args()
-    if args.EARTH_DATETIME_MTC is not None:
-        try:
-            input_date = datetime.fromisoformat(args.EARTH_DATETIME_MTC)
-            mars_date = earth_datetime_to_mars_datetime(input_date, True)
-            print(f"{mars_date[0]} {mars_date[1]}")
-        except:
-            print("Input date is not in the correct format!")
-            print("Correct example below:")
-            print("exodus.py -u '2025-01-01 00:00:01+00:00'")
+    if args.SERVE_PORT is not None or args.UNIX_SOCKET is not None:
+        if args.SERVE_PORT is None:
+            args.SERVE_PORT = DEFAULT_PORT
+        sys.exit(run_service(args))
+    elif args.RECORDS_FILE is not None:
+        sys.exit(run_binary(args))
+    elif args.BATCH_MODE is not None:
+        sys.exit(run_batch(args))
+    elif args.EARTH_DATETIME_MTC is not None:
+        run_single_value("utc_to_mtc", args.EARTH_DATETIME_MTC, "-u '2025-01-01 00:00:01+00:00'")
     elif args.MARS_DATETIME_UTC is not None:
-        try:
-            out_dt = mars_datetime_to_earth_datetime(args.MARS_DATETIME_UTC, True)
-            timedate_str = out_dt.strftime("%Y-%m-%d %H:%M:%S.%f+%Z, %A")
-            output_str = "%s, %s" % (timedate_str[:23], timedate_str[32:])
-            print("Earth DateTime: %s" % output_str)
-        except:
-            print("Input date is not in the correct format!")
-            print("Correct example below:")
-            print("exodus.py -m '0030-03-51 12:26:45.556'")
+        run_single_value("mtc_to_utc", args.MARS_DATETIME_UTC, "-m '0030-03-51 12:26:45.556'")
     elif args.EARTH_DATETIME_RAW is not None:
-        try:
-            input_date = datetime.fromisoformat(args.EARTH_DATETIME_RAW)
-            mars_date = earth_datetime_to_mars_datetime(input_date, False)
-            print(f"{mars_date[0]} {mars_date[1]}")
-        except:
-            print("Input date is not in the correct format!")
-            print("Correct example below:")
-            print("exodus.py -r '2025-01-01 00:00:01+00:00'")
+        run_single_value("utc_to_raw", args.EARTH_DATETIME_RAW, "-r '2025-01-01 00:00:01+00:00'")
     elif args.MARS_DATETIME_RAW is not None:
-        try:
-            out_dt = mars_datetime_to_earth_datetime(args.MARS_DATETIME_RAW, False)
-            timedate_str = out_dt.strftime("%Y-%m-%d %H:%M:%S.%f+%Z, %A")
-            output_str = "%s, %s" % (timedate_str[:23], timedate_str[32:])
-            print("Earth DateTime: %s" % output_str)
-        except:
-            print("Input date is not in the correct format!")
-            print("Correct example below:")
-            print("exodus.py -x '0030-03-51 12:26:45.556'")
-
+        run_single_value("raw_to_utc", args.MARS_DATETIME_RAW, "-x '0030-03-51 12:26:45.556'")
     else:
         timedate = datetime.now(timezone.utc)
         timedate_str = timedate.strftime("%Y-%m-%d %H:%M:%S.%f+%Z, %A")